@@ -4,17 +4,22 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from jwt import ExpiredSignatureError, DecodeError, InvalidTokenError
+from psycopg2.errors import QueryCanceled, LockNotAvailable
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 
 from src.domain.exceptions.exceptions import ResourceNotFoundException, BusinessException, ValidationException, \
     OperationUnauthorizedException, InvalidCredentials
+from src.infrastructure.adapters.databases.metered_pool import MeteredQueuePool
+from src.infrastructure.adapters.databases.routing_session import RoutingSession
 from src.infrastructure.utils.responses import error_response, validations_response
 
 # Initialize the Flask application
 app = Flask(__name__)
 app.config.from_object('src.application.config.config')
 
-# Initialize the SQLAlchemy database connection
-db = SQLAlchemy(app)
+# Initialize the SQLAlchemy database connection, with a session that can send reads to the read replicas and pools
+# that report their checkouts and waits
+db = SQLAlchemy(app, session_options={'class_': RoutingSession}, engine_options={'poolclass': MeteredQueuePool})
 
 # Initialize the Flask-JWT-Extended extension
 jwt = JWTManager(app)
@@ -33,8 +38,10 @@ CORS(app, resources={
 
 swagger = Swagger(app, template_file='static/oas.yaml')
 
-from src.infrastructure.entrypoints import auth_entry_point, country_entry_point
+from src.infrastructure.entrypoints import auth_entry_point, country_entry_point, database_entry_point
 from src.infrastructure.entrypoints import risk_entry_point, provider_entry_point
+from src.infrastructure.jobs.risk_commands import risks_cli
+from src.infrastructure.migrations.migration_commands import migrations_cli
 
 
 @app.after_request
@@ -160,8 +167,42 @@ def handle_unexpected_exception(e):
     return jsonify(response), 500
 
 
+@app.errorhandler(OperationalError)
+def handle_database_operational_error(error):
+    """
+    Handle database OperationalError. Statements cancelled by the statement or lock timeout return a JSON error
+    response with a 503 status code, any other error is handled as unexpected.
+
+    :param error: The OperationalError that occurred.
+    :return: JSON error response indicating a timeout (HTTP 503) or an internal server error (HTTP 500).
+    """
+    if not isinstance(error.orig, (QueryCanceled, LockNotAvailable)):
+        return handle_unexpected_exception(error)
+    print(error)
+    response = error_response(503, "La consulta excedió el tiempo máximo permitido")
+    return jsonify(response), 503
+
+
+@app.errorhandler(PoolTimeoutError)
+def handle_pool_timeout(error):
+    """
+    Handle the timeout of the connection pool and return a JSON error response with a 503 status code.
+
+    :param error: The TimeoutError raised when no database connection was available.
+    :return: JSON error response indicating the service is busy (HTTP 503).
+    """
+    print(error)
+    response = error_response(503, "Servicio ocupado, intente nuevamente")
+    return jsonify(response), 503
+
+
 # Register blueprints
 app.register_blueprint(risk_entry_point.bp)
 app.register_blueprint(provider_entry_point.bp)
 app.register_blueprint(country_entry_point.bp)
 app.register_blueprint(auth_entry_point.bp)
+app.register_blueprint(database_entry_point.bp)
+
+# Register CLI commands
+app.cli.add_command(migrations_cli)
+app.cli.add_command(risks_cli)
@@ -1,9 +1,64 @@
+import json
 import os
 from datetime import timedelta
 
 # Database connection string
 SQLALCHEMY_DATABASE_URI = os.environ.get('CONNECTION_STRING')
 
+# Connections kept open by the pool of every engine, and extra connections opened under load
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+
+# Seconds a request waits for a pooled connection before failing
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+# Seconds after which a pooled connection is replaced, -1 keeps connections forever
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+
+# Test every pooled connection before using it, discarding the ones closed by the server
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+SQLALCHEMY_ENGINE_OPTIONS = {
+    'pool_size': DB_POOL_SIZE,
+    'max_overflow': DB_MAX_OVERFLOW,
+    'pool_timeout': DB_POOL_TIMEOUT,
+    'pool_recycle': DB_POOL_RECYCLE,
+    'pool_pre_ping': DB_POOL_PRE_PING
+}
+
+# Milliseconds a statement or a lock wait of a request may last before it is cancelled, 0 disables the limit
+DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))
+DB_LOCK_TIMEOUT = int(os.environ.get('DB_LOCK_TIMEOUT', 5000))
+
+# Timeouts of specific endpoints as JSON, keyed by endpoint name with optional statement_timeout and lock_timeout
+DB_ENDPOINT_TIMEOUTS = json.loads(os.environ.get('DB_ENDPOINT_TIMEOUTS', json.dumps({
+    'risks.import_risks': {'statement_timeout': 300000}
+})))
+
+# Comma-separated connection strings of the read replicas, which serve the list and lookup reads of GET requests
+REPLICA_CONNECTION_STRINGS = [uri.strip() for uri in os.environ.get('REPLICA_CONNECTION_STRINGS', '').split(',')
+                              if uri.strip()]
+
+# Seconds to wait for a connection to a read replica before considering it down
+REPLICA_CONNECT_TIMEOUT = int(os.environ.get('REPLICA_CONNECT_TIMEOUT', 2))
+
+# Engines of the read replicas, by bind key, with the pool of the primary: Flask-SQLAlchemy only applies
+# SQLALCHEMY_ENGINE_OPTIONS to the default engine
+SQLALCHEMY_BINDS = {
+    f'replica_{position}': {**SQLALCHEMY_ENGINE_OPTIONS, 'url': uri,
+                            'connect_args': {'connect_timeout': REPLICA_CONNECT_TIMEOUT}}
+    for position, uri in enumerate(REPLICA_CONNECTION_STRINGS)
+}
+
+# Seconds the result of a replica health check is kept
+REPLICA_HEALTH_INTERVAL = int(os.environ.get('REPLICA_HEALTH_INTERVAL', 10))
+
+# Maximum replication lag in seconds of a replica that serves reads
+REPLICA_MAX_LAG = int(os.environ.get('REPLICA_MAX_LAG', 30))
+
+# Seconds the reads of a user stay on the primary after the user changes data
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
 # Enable or disable debugging mode
 DEBUG = True
 
@@ -28,6 +83,34 @@ JWT_REFRESH_TOKEN_EXPIRES = timedelta(hours=24)
 # Enable JWT token blacklist
 JWT_BLACKLIST_ENABLED = True
 
+# Global filter of risks: 'contains' uses ILIKE substring matching, backed by the trigram indexes,
+# 'fulltext' opts in to word prefix matching on the full-text index when it exists
+GLOBAL_SEARCH_MODE = os.environ.get('GLOBAL_SEARCH_MODE', 'contains')
+
+# Seconds the in-process country table is served before it is revalidated against Redis
+COUNTRY_CACHE_TTL = int(os.environ.get('COUNTRY_CACHE_TTL', 60))
+
+# Enable the background job that refreshes country data before its flag expires
+COUNTRY_REFRESH_JOB_ENABLED = os.environ.get('COUNTRY_REFRESH_JOB_ENABLED', 'true').lower() == 'true'
+
+# Seconds between checks of the country refresh job
+COUNTRY_REFRESH_INTERVAL = int(os.environ.get('COUNTRY_REFRESH_INTERVAL', 300))
+
+# Seconds before the country data flag expires in which the job refreshes it
+COUNTRY_REFRESH_THRESHOLD = int(os.environ.get('COUNTRY_REFRESH_THRESHOLD', 3600))
+
+# Enable the background job that rebuilds the risk summaries from the risks table
+RISK_SUMMARY_JOB_ENABLED = os.environ.get('RISK_SUMMARY_JOB_ENABLED', 'false').lower() == 'true'
+
+# Seconds between reconciliations of the risk summaries
+RISK_SUMMARY_RECONCILE_INTERVAL = int(os.environ.get('RISK_SUMMARY_RECONCILE_INTERVAL', 3600))
+
+# Seconds the results computed from the risks of a user, like the exposure matrix, are cached in Redis
+RISK_CACHE_TTL = int(os.environ.get('RISK_CACHE_TTL', 300))
+
+# Maximum number of processes a risk simulation may spread its trials across
+SIMULATION_MAX_WORKERS = int(os.environ.get('SIMULATION_MAX_WORKERS', 1))
+
 # Swagger config
 SWAGGER = {
     'title': 'API Documentation',
@@ -0,0 +1,6 @@
+-- The column is kept: it predates the migrations on existing databases, where the up script did not create it, and
+-- the Risk entity requires it.
+
+ALTER TABLE risks DROP CONSTRAINT IF EXISTS risks_provider_id_fkey;
+
+COMMENT ON COLUMN risks.provider_id IS NULL;
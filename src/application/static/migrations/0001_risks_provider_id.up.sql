@@ -0,0 +1,12 @@
+-- Declare the provider of each risk, mapped by the Risk entity and used by every risk list join
+
+ALTER TABLE risks ADD COLUMN IF NOT EXISTS provider_id INTEGER NOT NULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'risks_provider_id_fkey') THEN
+        ALTER TABLE risks ADD CONSTRAINT risks_provider_id_fkey FOREIGN KEY (provider_id) REFERENCES providers(id);
+    END IF;
+END $$;
+
+COMMENT ON COLUMN risks.provider_id IS 'Provider associated with the risk';
@@ -0,0 +1,8 @@
+DROP INDEX IF EXISTS idx_risks_user_id_id;
+DROP INDEX IF EXISTS idx_risks_user_id_title;
+DROP INDEX IF EXISTS idx_risks_user_id_description;
+DROP INDEX IF EXISTS idx_risks_user_id_impact;
+DROP INDEX IF EXISTS idx_risks_user_id_probability;
+DROP INDEX IF EXISTS idx_risks_user_id_country_code;
+DROP INDEX IF EXISTS idx_risks_provider_id;
+DROP INDEX IF EXISTS idx_providers_name;
@@ -0,0 +1,12 @@
+-- Indexes for the list endpoints. Risks are always filtered by user_id and sorted by one of the allowed sort fields
+-- with id as tie-breaker, so each sort gets a (user_id, field, id) index that serves both offset and cursor pages.
+
+CREATE INDEX IF NOT EXISTS idx_risks_user_id_id ON risks (user_id, id DESC);
+CREATE INDEX IF NOT EXISTS idx_risks_user_id_title ON risks (user_id, title, id);
+CREATE INDEX IF NOT EXISTS idx_risks_user_id_description ON risks (user_id, description, id);
+CREATE INDEX IF NOT EXISTS idx_risks_user_id_impact ON risks (user_id, impact, id);
+CREATE INDEX IF NOT EXISTS idx_risks_user_id_probability ON risks (user_id, probability, id);
+CREATE INDEX IF NOT EXISTS idx_risks_user_id_country_code ON risks (user_id, country_code);
+CREATE INDEX IF NOT EXISTS idx_risks_provider_id ON risks (provider_id);
+
+CREATE INDEX IF NOT EXISTS idx_providers_name ON providers (name, id);
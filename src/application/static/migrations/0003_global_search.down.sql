@@ -0,0 +1,6 @@
+DROP INDEX IF EXISTS idx_risks_search_vector;
+DROP INDEX IF EXISTS idx_risks_title_trgm;
+DROP INDEX IF EXISTS idx_risks_description_trgm;
+DROP INDEX IF EXISTS idx_providers_name_trgm;
+
+ALTER TABLE risks DROP COLUMN IF EXISTS search_vector;
@@ -0,0 +1,16 @@
+-- Global search of risks. The GIN index on search_vector serves the full-text filter and the trigram indexes serve
+-- ILIKE '%term%' filters.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE risks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('spanish'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('spanish'::regconfig, coalesce(description, '')), 'B')
+) STORED;
+
+COMMENT ON COLUMN risks.search_vector IS 'Weighted full-text vector of title and description for the global filter';
+
+CREATE INDEX IF NOT EXISTS idx_risks_search_vector ON risks USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_risks_title_trgm ON risks USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_risks_description_trgm ON risks USING GIN (description gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_providers_name_trgm ON providers USING GIN (name gin_trgm_ops);
@@ -0,0 +1 @@
+DROP INDEX IF EXISTS idx_providers_country_codes;
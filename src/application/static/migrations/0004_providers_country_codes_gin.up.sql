@@ -0,0 +1,3 @@
+-- GIN index for the provider country coverage filters, which compile to country_codes @> and && comparisons.
+
+CREATE INDEX IF NOT EXISTS idx_providers_country_codes ON providers USING GIN (country_codes);
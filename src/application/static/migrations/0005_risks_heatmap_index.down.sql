@@ -0,0 +1 @@
+DROP INDEX IF EXISTS idx_risks_user_id_heatmap;
@@ -0,0 +1,5 @@
+-- Covering index for the risk heat map, which counts the risks of a user by impact and probability, optionally broken
+-- down by provider or country, without reading the table rows.
+
+CREATE INDEX IF NOT EXISTS idx_risks_user_id_heatmap ON risks (user_id, impact, probability)
+    INCLUDE (provider_id, country_code);
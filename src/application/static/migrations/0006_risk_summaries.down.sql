@@ -0,0 +1 @@
+DROP TABLE IF EXISTS risk_summaries;
@@ -0,0 +1,24 @@
+-- Risk totals per user, maintained by the risk repository in the same transaction as every risk write and rebuilt by
+-- the reconciliation job. dimension is 'user' (empty key), 'provider' (provider id) or 'country' (country code).
+
+CREATE TABLE IF NOT EXISTS risk_summaries (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    dimension VARCHAR(20) NOT NULL,
+    dimension_key VARCHAR(20) NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, dimension, dimension_key)
+);
+
+COMMENT ON TABLE risk_summaries IS 'Risk totals per user, provider and country';
+COMMENT ON COLUMN risk_summaries.user_id IS 'User who owns the risks';
+COMMENT ON COLUMN risk_summaries.dimension IS 'Breakdown of the total: user, provider or country';
+COMMENT ON COLUMN risk_summaries.dimension_key IS 'Provider id or country code of the breakdown, empty for user totals';
+COMMENT ON COLUMN risk_summaries.total IS 'Number of risks';
+
+INSERT INTO risk_summaries (user_id, dimension, dimension_key, total)
+SELECT user_id, 'user', '', count(*) FROM risks WHERE user_id IS NOT NULL GROUP BY user_id
+UNION ALL
+SELECT user_id, 'provider', provider_id::text, count(*) FROM risks WHERE user_id IS NOT NULL GROUP BY user_id, provider_id
+UNION ALL
+SELECT user_id, 'country', country_code, count(*) FROM risks WHERE user_id IS NOT NULL GROUP BY user_id, country_code
+ON CONFLICT (user_id, dimension, dimension_key) DO UPDATE SET total = excluded.total;
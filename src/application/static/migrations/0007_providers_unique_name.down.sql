@@ -0,0 +1 @@
+DROP INDEX IF EXISTS uq_providers_name;
@@ -0,0 +1,4 @@
+-- Providers are matched by name by the bulk upsert, which needs a unique index as its conflict target.
+-- Duplicated names must be merged before applying this migration.
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_providers_name ON providers (name);
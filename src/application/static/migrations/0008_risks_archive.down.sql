@@ -0,0 +1,30 @@
+-- Archived risks become active again, so the risk summaries are rebuilt from every risk.
+
+DROP INDEX IF EXISTS idx_risks_user_id_archived;
+
+DROP INDEX IF EXISTS idx_risks_user_id_id;
+DROP INDEX IF EXISTS idx_risks_user_id_title;
+DROP INDEX IF EXISTS idx_risks_user_id_description;
+DROP INDEX IF EXISTS idx_risks_user_id_impact;
+DROP INDEX IF EXISTS idx_risks_user_id_probability;
+DROP INDEX IF EXISTS idx_risks_user_id_country_code;
+DROP INDEX IF EXISTS idx_risks_user_id_heatmap;
+
+ALTER TABLE risks DROP COLUMN IF EXISTS archived_at;
+
+CREATE INDEX idx_risks_user_id_id ON risks (user_id, id DESC);
+CREATE INDEX idx_risks_user_id_title ON risks (user_id, title, id);
+CREATE INDEX idx_risks_user_id_description ON risks (user_id, description, id);
+CREATE INDEX idx_risks_user_id_impact ON risks (user_id, impact, id);
+CREATE INDEX idx_risks_user_id_probability ON risks (user_id, probability, id);
+CREATE INDEX idx_risks_user_id_country_code ON risks (user_id, country_code);
+CREATE INDEX idx_risks_user_id_heatmap ON risks (user_id, impact, probability) INCLUDE (provider_id, country_code);
+
+DELETE FROM risk_summaries;
+
+INSERT INTO risk_summaries (user_id, dimension, dimension_key, total)
+SELECT user_id, 'user', '', count(*) FROM risks WHERE user_id IS NOT NULL GROUP BY user_id
+UNION ALL
+SELECT user_id, 'provider', provider_id::text, count(*) FROM risks WHERE user_id IS NOT NULL GROUP BY user_id, provider_id
+UNION ALL
+SELECT user_id, 'country', country_code, count(*) FROM risks WHERE user_id IS NOT NULL GROUP BY user_id, country_code;
@@ -0,0 +1,26 @@
+-- Archived risks stay in the risks table with their archive time, and are excluded from every list by default.
+-- The per-user list and heat map indexes become partial indexes over the active risks, so they only grow with the
+-- active register; archived risks get their own partial index for the queries that opt into the archive.
+
+ALTER TABLE risks ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP;
+
+COMMENT ON COLUMN risks.archived_at IS 'Time the risk was archived, NULL for active risks';
+
+DROP INDEX IF EXISTS idx_risks_user_id_id;
+DROP INDEX IF EXISTS idx_risks_user_id_title;
+DROP INDEX IF EXISTS idx_risks_user_id_description;
+DROP INDEX IF EXISTS idx_risks_user_id_impact;
+DROP INDEX IF EXISTS idx_risks_user_id_probability;
+DROP INDEX IF EXISTS idx_risks_user_id_country_code;
+DROP INDEX IF EXISTS idx_risks_user_id_heatmap;
+
+CREATE INDEX idx_risks_user_id_id ON risks (user_id, id DESC) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_title ON risks (user_id, title, id) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_description ON risks (user_id, description, id) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_impact ON risks (user_id, impact, id) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_probability ON risks (user_id, probability, id) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_country_code ON risks (user_id, country_code) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_heatmap ON risks (user_id, impact, probability)
+    INCLUDE (provider_id, country_code) WHERE archived_at IS NULL;
+
+CREATE INDEX idx_risks_user_id_archived ON risks (user_id, id DESC) WHERE archived_at IS NOT NULL;
@@ -0,0 +1,84 @@
+-- Hash partitioning of risks by user_id. Every risk query of the API is scoped to a single user, so the planner prunes
+-- the partitions of other users and the list, count and heat map queries only read one of the 16 partitions.
+-- The table is converted by copying the rows into a new partitioned table, under an exclusive lock held until the
+-- migration commits. The primary key of a partitioned table must include the partition key, so it becomes
+-- (user_id, id); ids keep coming from the same sequence, and lookups by id alone use idx_risks_id.
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM risks WHERE user_id IS NULL) THEN
+        RAISE EXCEPTION 'Risks without user_id must be assigned to a user or deleted before partitioning';
+    END IF;
+END $$;
+
+LOCK TABLE risks IN ACCESS EXCLUSIVE MODE;
+
+ALTER SEQUENCE risks_id_seq OWNED BY NONE;
+ALTER TABLE risks RENAME TO risks_unpartitioned;
+
+CREATE TABLE risks (
+    id INTEGER NOT NULL DEFAULT nextval('risks_id_seq'),
+    title VARCHAR(100) NOT NULL,
+    description TEXT,
+    impact INTEGER,
+    probability INTEGER,
+    user_id INTEGER NOT NULL,
+    country_code VARCHAR(2) NOT NULL,
+    provider_id INTEGER NOT NULL,
+    archived_at TIMESTAMP,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('spanish'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('spanish'::regconfig, coalesce(description, '')), 'B')
+    ) STORED,
+    PRIMARY KEY (user_id, id)
+) PARTITION BY HASH (user_id);
+
+DO $$
+BEGIN
+    FOR remainder IN 0..15 LOOP
+        EXECUTE format('CREATE TABLE risks_p%s PARTITION OF risks FOR VALUES WITH (MODULUS 16, REMAINDER %s)',
+                       lpad(remainder::text, 2, '0'), remainder);
+    END LOOP;
+END $$;
+
+INSERT INTO risks (id, title, description, impact, probability, user_id, country_code, provider_id, archived_at)
+SELECT id, title, description, impact, probability, user_id, country_code, provider_id, archived_at
+FROM risks_unpartitioned;
+
+DROP TABLE risks_unpartitioned;
+
+ALTER SEQUENCE risks_id_seq OWNED BY risks.id;
+
+ALTER TABLE risks ADD CONSTRAINT risks_user_id_fkey FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE;
+ALTER TABLE risks ADD CONSTRAINT risks_provider_id_fkey FOREIGN KEY (provider_id) REFERENCES providers(id);
+
+COMMENT ON TABLE risks IS 'Table to store information about cybersecurity risks';
+COMMENT ON COLUMN risks.id IS 'Unique risk ID';
+COMMENT ON COLUMN risks.title IS 'Risk title';
+COMMENT ON COLUMN risks.description IS 'Risk description';
+COMMENT ON COLUMN risks.impact IS 'Risk impact';
+COMMENT ON COLUMN risks.probability IS 'Risk probability';
+COMMENT ON COLUMN risks.user_id IS 'User who created the risk';
+COMMENT ON COLUMN risks.country_code IS 'Country code associated with the risk';
+COMMENT ON COLUMN risks.provider_id IS 'Provider associated with the risk';
+COMMENT ON COLUMN risks.search_vector IS 'Weighted full-text vector of title and description for the global filter';
+COMMENT ON COLUMN risks.archived_at IS 'Time the risk was archived, NULL for active risks';
+
+CREATE INDEX idx_risks_id ON risks (id);
+CREATE INDEX idx_risks_provider_id ON risks (provider_id);
+
+CREATE INDEX idx_risks_user_id_id ON risks (user_id, id DESC) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_title ON risks (user_id, title, id) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_description ON risks (user_id, description, id) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_impact ON risks (user_id, impact, id) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_probability ON risks (user_id, probability, id) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_country_code ON risks (user_id, country_code) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_heatmap ON risks (user_id, impact, probability)
+    INCLUDE (provider_id, country_code) WHERE archived_at IS NULL;
+CREATE INDEX idx_risks_user_id_archived ON risks (user_id, id DESC) WHERE archived_at IS NOT NULL;
+
+CREATE INDEX idx_risks_search_vector ON risks USING GIN (search_vector);
+CREATE INDEX idx_risks_title_trgm ON risks USING GIN (title gin_trgm_ops);
+CREATE INDEX idx_risks_description_trgm ON risks USING GIN (description gin_trgm_ops);
+
+ANALYZE risks;
@@ -1,5 +1,10 @@
 from abc import ABC, abstractmethod
 
+# Freshness of the country data returned by get_countries_data_with_status
+COUNTRY_DATA_FRESH = "fresh"
+COUNTRY_DATA_STALE = "stale"
+COUNTRY_DATA_MISSING = "missing"
+
 
 class ICountryGateway(ABC):
     """
@@ -31,13 +36,51 @@ class ICountryGateway(ABC):
         pass
 
     @abstractmethod
-    def set_countries_data(self, country_data_list):
+    def get_ttl(self, key):
+        """
+        Get the remaining time-to-live of a key in seconds.
+
+        :param key: The key to inspect.
+
+        :return: The remaining seconds, -1 if the key has no expiration, or -2 if the key does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def acquire_lock(self, lock_key, ttl):
+        """
+        Try to acquire a lock shared by every worker. The lock is released automatically after the TTL.
+
+        :param lock_key: The key of the lock.
+        :param ttl: Time-to-live of the lock in seconds.
+
+        :return: A token identifying the owner if the lock was acquired, None otherwise.
+        """
+        pass
+
+    @abstractmethod
+    def release_lock(self, lock_key, token):
         """
-        Set country-related data as a hash.
+        Release a lock only if it is still owned by the given token.
+
+        :param lock_key: The key of the lock.
+        :param token: The token returned by acquire_lock.
+
+        :return: None if the lock is released or was already lost.
+        """
+        pass
+
+    @abstractmethod
+    def set_countries_data(self, country_data_list, flag_key=None, ttl=86400):
+        """
+        Synchronize country-related data as a hash, writing only what changed. Readers must never see a partially
+        written hash.
 
         :param country_data_list: A list of country data objects to store.
+        :param flag_key: Optional flag to set in the same operation.
+        :param ttl: Time-to-live in seconds of the flag (default is 86400 seconds, or 24 hours).
 
-        :return: None if the data is successfully stored.
+        :return: The number of countries added, changed or removed.
         """
         pass
 
@@ -61,6 +104,28 @@ class ICountryGateway(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_countries_data_with_status(self, flag_key, country_codes=None):
+        """
+        Get country-related data together with its freshness in a single call.
+
+        :param flag_key: The flag whose existence marks the data as fresh.
+        :param country_codes: A list of country codes to retrieve data for, or None for all countries.
+
+        :return: A tuple with the dictionary of country data and its status: COUNTRY_DATA_FRESH if the flag exists,
+            COUNTRY_DATA_STALE if only the data exists, or COUNTRY_DATA_MISSING if there is no data.
+        """
+        pass
+
+    @abstractmethod
+    def get_version(self):
+        """
+        Get the version of the stored country data, which changes every time the data is rewritten.
+
+        :return: The current version as a string, or None if no version has been stored.
+        """
+        pass
+
     @abstractmethod
     def delete(self, key):
         """
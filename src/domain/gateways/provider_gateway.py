@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
 
+# Message of the error raised when a provider name is already taken by another provider
+PROVIDER_NAME_EXISTS = "Ya existe un proveedor con ese nombre"
+
 
 class IProviderGateway(ABC):
     """
@@ -29,6 +32,28 @@ class IProviderGateway(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_provider_by_name(self, name):
+        """
+        Get a provider by its unique name.
+
+        :param name: The name of the provider.
+
+        :return: Provider object or None if the provider is not found.
+        """
+        pass
+
+    @abstractmethod
+    def get_providers_by_ids(self, provider_ids):
+        """
+        Get the providers with the given unique identifiers.
+
+        :param provider_ids: The unique identifiers of the providers.
+
+        :return: A list of the providers found.
+        """
+        pass
+
     @abstractmethod
     def create_provider(self, data):
         """
@@ -37,6 +62,18 @@ class IProviderGateway(ABC):
         :param data: A dictionary of provider data.
 
         :return: The created provider.
+        :raise: BusinessException if the name is already taken by another provider.
+        """
+        pass
+
+    @abstractmethod
+    def upsert_providers(self, providers):
+        """
+        Create or update providers matched by name, in a single transaction.
+
+        :param providers: A list of dictionaries of provider data with unique names.
+
+        :return: A dictionary with the number of created, updated and unchanged providers.
         """
         pass
 
@@ -49,6 +86,7 @@ class IProviderGateway(ABC):
         :param data: A dictionary of provider data to update.
 
         :return: The updated provider.
+        :raise: BusinessException if the name is already taken by another provider.
         """
         pass
 
@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+
+
+class IRiskCacheGateway(ABC):
+    """
+    An abstract base class defining the interface for a cache of results computed from the risks of a user.
+    Implementing classes must provide methods to read and store results and to invalidate every result of a user.
+    """
+
+    @abstractmethod
+    def get_entry(self, user_id, key):
+        """
+        Get a cached result of a user, and the entry where a result computed afterwards must be stored, so a result is
+        never stored after an invalidation that happened while it was computed.
+
+        :param user_id: The user identifier.
+        :param key: The key of the result.
+
+        :return: A tuple with the cached result, or None if it is not cached, and the entry key, or None if the result
+            must not be cached.
+        """
+        pass
+
+    @abstractmethod
+    def set_entry(self, entry_key, value):
+        """
+        Cache a result.
+
+        :param entry_key: The entry key returned by get_entry before the result was computed.
+        :param value: The result, a JSON serializable object.
+        """
+        pass
+
+    @abstractmethod
+    def invalidate_user(self, user_id):
+        """
+        Invalidate every cached result of a user.
+
+        :param user_id: The user identifier.
+        """
+        pass
@@ -18,6 +18,55 @@ class IRiskGateway(ABC):
         """
         pass
 
+    @abstractmethod
+    def stream_risks_by_filter(self, req):
+        """
+        Get every risk matching the filtering criteria, sorted, as a lazy stream.
+
+        :param req: A request object containing filtering criteria.
+
+        :return: An iterator of risks with their provider.
+        """
+        pass
+
+    @abstractmethod
+    def get_risk_heatmap(self, req, group_by=None):
+        """
+        Count the risks matching the filtering criteria by impact and probability.
+
+        :param req: A request object containing filtering criteria.
+        :param group_by: Optional breakdown of the counts, 'provider' or 'country'.
+
+        :return: A list of rows with impact, probability and count, plus group_key (and group_name for providers) when
+            a breakdown is requested.
+        """
+        pass
+
+    @abstractmethod
+    def get_risk_scores(self, req):
+        """
+        Get the scores of the risks matching the filtering criteria.
+
+        :param req: A request object containing filtering criteria.
+
+        :return: A list of rows with impact, probability, provider_id, provider_name and country_code.
+        """
+        pass
+
+    @abstractmethod
+    def archive_risks(self, req, archive=True, max_batches=None):
+        """
+        Archive the active risks, or restore the archived risks, matching the filtering criteria, in batched
+        transactions.
+
+        :param req: A request object containing filtering criteria.
+        :param archive: True to archive active risks, False to restore archived risks.
+        :param max_batches: Maximum number of batches processed, or None to process every matching risk.
+
+        :return: A tuple with the number of archived or restored risks and True if matching risks are left.
+        """
+        pass
+
     @abstractmethod
     def get_risk_by_id(self, risk_id):
         """
@@ -29,6 +78,28 @@ class IRiskGateway(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_risks_by_ids(self, risk_ids):
+        """
+        Get the risks with the given unique identifiers.
+
+        :param risk_ids: The unique identifiers of the risks.
+
+        :return: A list of the risks found.
+        """
+        pass
+
+    @abstractmethod
+    def get_risk_texts(self, user_id):
+        """
+        Get the title and description of every risk of a user.
+
+        :param user_id: The user identifier.
+
+        :return: An iterator of rows with id, title and description.
+        """
+        pass
+
     @abstractmethod
     def create_risk(self, data):
         """
@@ -40,6 +111,30 @@ class IRiskGateway(ABC):
         """
         pass
 
+    @abstractmethod
+    def create_risks(self, items, user_id):
+        """
+        Create a batch of risks in a single transaction.
+
+        :param items: A list of dictionaries of risk data.
+        :param user_id: The user that owns the risks.
+
+        :return: The created risks.
+        """
+        pass
+
+    @abstractmethod
+    def import_risks(self, chunks, user_id):
+        """
+        Import chunks of risks in a single transaction.
+
+        :param chunks: An iterable of lists of dictionaries of risk data.
+        :param user_id: The user that owns the risks.
+
+        :return: The number of imported risks.
+        """
+        pass
+
     @abstractmethod
     def update_risk(self, risk, data):
         """
@@ -62,3 +157,23 @@ class IRiskGateway(ABC):
         :return: The unique identifier of the deleted risk.
         """
         pass
+
+    @abstractmethod
+    def get_risk_summary(self, user_id):
+        """
+        Get the risk totals of a user, overall and by provider and country.
+
+        :param user_id: The user identifier.
+
+        :return: A list of rows with dimension, dimension_key, total and provider_name.
+        """
+        pass
+
+    @abstractmethod
+    def rebuild_risk_summaries(self):
+        """
+        Rebuild the risk totals from the stored risks.
+
+        :return: True if the totals were rebuilt, False if another rebuild was running.
+        """
+        pass
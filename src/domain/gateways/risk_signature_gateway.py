@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+
+# Version returned by get_version when the signature store cannot be read
+SIGNATURES_UNAVAILABLE = -1
+
+
+class IRiskSignatureGateway(ABC):
+    """
+    An abstract base class defining the interface for the shared store of the MinHash signatures of the risks of every
+    user. Every change increments the version of the user, so in-memory copies can tell when they are outdated.
+    """
+
+    @abstractmethod
+    def get_version(self, user_id):
+        """
+        Get the version of the signatures of a user.
+
+        :param user_id: The user identifier.
+
+        :return: The version, None if the signatures of the user are not stored, or SIGNATURES_UNAVAILABLE if the
+            store cannot be read.
+        """
+        pass
+
+    @abstractmethod
+    def get_signatures(self, user_id):
+        """
+        Get the signatures of a user together with their version.
+
+        :param user_id: The user identifier.
+
+        :return: A tuple with a dictionary of signatures keyed by risk ID and the version, or None if the signatures
+            of the user are not stored.
+        """
+        pass
+
+    @abstractmethod
+    def begin_rebuild(self, user_id):
+        """
+        Start a rebuild of the signatures of a user, to be called before reading the risks the signatures are built
+        from. Any change to the signatures of the user before replace_signatures cancels the rebuild.
+
+        :param user_id: The user identifier.
+
+        :return: The token of the rebuild, or None if it could not be started.
+        """
+        pass
+
+    @abstractmethod
+    def replace_signatures(self, user_id, signatures, token):
+        """
+        Replace every signature of a user, only if the rebuild of the token was not cancelled.
+
+        :param user_id: The user identifier.
+        :param signatures: A dictionary of signatures keyed by risk ID.
+        :param token: The token returned by begin_rebuild.
+
+        :return: The new version, or None if the signatures were not stored.
+        """
+        pass
+
+    @abstractmethod
+    def set_signatures(self, user_id, signatures):
+        """
+        Add or replace signatures of a user, only if the signatures of the user are stored. Otherwise, cancels any
+        rebuild of the signatures of the user.
+
+        :param user_id: The user identifier.
+        :param signatures: A dictionary of signatures keyed by risk ID.
+
+        :return: The new version, or None if the signatures of the user are not stored.
+        """
+        pass
+
+    @abstractmethod
+    def delete_signatures(self, user_id, risk_ids):
+        """
+        Delete signatures of a user, only if the signatures of the user are stored. Otherwise, cancels any rebuild of
+        the signatures of the user.
+
+        :param user_id: The user identifier.
+        :param risk_ids: The risk IDs whose signatures are deleted.
+
+        :return: The new version, or None if the signatures of the user are not stored.
+        """
+        pass
+
+    @abstractmethod
+    def invalidate_user(self, user_id):
+        """
+        Drop every signature of a user, so they are rebuilt on the next use, and cancel any rebuild in progress.
+
+        :param user_id: The user identifier.
+        """
+        pass
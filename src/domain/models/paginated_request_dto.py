@@ -1,3 +1,79 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from src.domain.exceptions.exceptions import ValidationException
+
+# Strategies to compute the total number of records of a paginated list
+COUNT_MODE_EXACT = 'exact'
+COUNT_MODE_ESTIMATED = 'estimated'
+COUNT_MODE_NONE = 'none'
+COUNT_MODES = [COUNT_MODE_EXACT, COUNT_MODE_ESTIMATED, COUNT_MODE_NONE]
+
+# Archived records included in a list: only active records by default, only archived records, or both
+ARCHIVED_EXCLUDE = 'exclude'
+ARCHIVED_ONLY = 'only'
+ARCHIVED_INCLUDE = 'include'
+ARCHIVED_MODES = [ARCHIVED_EXCLUDE, ARCHIVED_ONLY, ARCHIVED_INCLUDE]
+
+# Coercion of filter values by the 'type' of the filter definition
+FILTER_TYPES = {
+    'number': int,
+    'string': str
+}
+
+# Operators whose value is a comma-separated list
+LIST_OPERATORS = ['in', 'between', 'hasAll', 'hasAny']
+
+
+def encode_cursor(order_by, order_type, value, identifier, direction):
+    """
+    Build an opaque cursor token pointing at a record of a sorted list.
+
+    :param order_by: The sorting field the cursor belongs to.
+    :param order_type: The order type ('asc' or 'desc') the cursor belongs to.
+    :param value: The value of the sorting field in the record.
+    :param identifier: The unique identifier of the record, used to break ties.
+    :param direction: 'next' to read the records after the cursor, 'prev' to read the records before it.
+
+    :return: The cursor token.
+    """
+    payload = json.dumps({'s': order_by, 'o': order_type, 'v': value, 'i': identifier, 'd': direction},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token built by encode_cursor.
+
+    :param token: The cursor token. An empty token means the first page.
+
+    :return: A dictionary with 'order_by', 'order_type', 'value', 'id' and 'direction', or None for the first page.
+    :raises ValidationException: If the token is not a valid cursor.
+    """
+    if not token:
+        return None
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        cursor = {
+            'order_by': payload['s'],
+            'order_type': payload['o'],
+            'value': payload['v'],
+            'id': int(payload['i']),
+            'direction': payload['d']
+        }
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        cursor = None
+
+    if cursor is None or cursor['direction'] not in ('next', 'prev') or cursor['order_type'] not in ('asc', 'desc'):
+        raise ValidationException("Error validating input data", [{"field": "cursor", "errors": "Cursor inválido"}])
+
+    return cursor
+
+
 def build_map_filter_from_request(params_request):
     """
     Build a dictionary of filters from the request parameters.
@@ -12,20 +88,44 @@ def build_map_filter_from_request(params_request):
     return filters
 
 
-def validate_data_type_param(filter_param, search_string):
+def compile_filter_registry(params_allowed):
+    """
+    Compile a list of allowed filter definitions into a registry keyed by param, with the coercion of its type resolved.
+
+    :param params_allowed: A list of allowed filter definitions.
+
+    :return: A dictionary of filter definitions keyed by param.
     """
-    Validate the data type of a filter parameter.
+    return {
+        param['param']: {**param, 'coerce': FILTER_TYPES[param.get('type', 'string')]}
+        for param in params_allowed
+    }
 
-    :param filter_param: The filter parameter definition.
-    :param search_string: The value to validate.
 
-    :return: True if the data type is valid, otherwise False.
+def coerce_filter_value(filter_param, search_string):
     """
-    if search_string is not None:
-        if filter_param.get('type', None) == 'number':
-            return search_string.isdigit()
-        return True
-    return False
+    Convert a filter value to the type of its filter definition. Values of list operators are split by commas and
+    every item is converted.
+
+    :param filter_param: The compiled filter definition.
+    :param search_string: The value to convert.
+
+    :return: The converted value, or None if the value is not valid for the filter.
+    """
+    if search_string is None:
+        return None
+
+    coerce = filter_param['coerce']
+    try:
+        if filter_param['operator'] not in LIST_OPERATORS:
+            return coerce(search_string)
+        values = [coerce(value.strip()) for value in str(search_string).split(',') if value.strip()]
+    except (TypeError, ValueError):
+        return None
+
+    if not values or (filter_param['operator'] == 'between' and len(values) != 2):
+        return None
+    return values
 
 
 class PaginatedRequestDto:
@@ -44,7 +144,15 @@ class PaginatedRequestDto:
         self.order_by = request.args.get('orderBy', None)
         self.order_type = request.args.get('orderType', 'desc')
         self.global_filter = request.args.get('globalFilter', None)
+        self.count_mode = request.args.get('countMode', COUNT_MODE_EXACT)
+        self.archived = request.args.get('archived', ARCHIVED_EXCLUDE)
         self.filters = build_map_filter_from_request(request.args.items())
+        self.cursor_mode = 'cursor' in request.args
+        self.cursor = decode_cursor(request.args.get('cursor', None))
+
+        if self.cursor is not None:
+            self.order_by = self.cursor['order_by']
+            self.order_type = self.cursor['order_type']
 
     def add_filter(self, key, value):
         """
@@ -57,31 +165,65 @@ class PaginatedRequestDto:
 
     def build_order_by(self, default, allowed_sorts):
         """
-        Build the 'order_by' field from available sorting options.
+        Build the 'order_by' field from available sorting options. A cursor must point to an allowed sorting field.
 
         :param default: The default sorting field.
         :param allowed_sorts: List of allowed sorting fields.
         """
         if self.order_by not in allowed_sorts:
+            if self.cursor is not None:
+                raise ValidationException("Error validating input data",
+                                          [{"field": "cursor", "errors": "Cursor inválido"}])
             self.order_by = default
 
-    def build_filter_values(self, params_allowed):
+    def build_count_mode(self):
+        """
+        Build the 'count_mode' field, falling back to an exact count for unknown values.
         """
-        Build filter values based on allowed parameters.
+        if self.count_mode not in COUNT_MODES:
+            self.count_mode = COUNT_MODE_EXACT
 
-        :param params_allowed: List of allowed filter parameters.
+    def build_archived_mode(self):
+        """
+        Build the 'archived' field, falling back to excluding archived records for unknown values.
+        """
+        if self.archived not in ARCHIVED_MODES:
+            self.archived = ARCHIVED_EXCLUDE
+
+    def build_filter_values(self, filter_registry):
+        """
+        Build filter values based on allowed parameters. Values that are not valid for their filter are ignored.
+
+        :param filter_registry: Registry of allowed filters, as built by compile_filter_registry.
         """
         allowed_filters = []
 
         for field, search_string in self.filters.items():
-            filter_param = next((param for param in params_allowed if param['param'] == field), None)
+            filter_param = filter_registry.get(field)
+            if filter_param is None:
+                continue
 
-            if filter_param and validate_data_type_param(filter_param, search_string):
+            value = coerce_filter_value(filter_param, search_string)
+            if value is not None:
                 allowed_filters.append({
-                    'value': search_string,
+                    'value': value,
                     'operator': filter_param['operator'],
                     'entity': filter_param['entity'],
                     'field': filter_param['field']
                 })
 
         self.filters = allowed_filters
+
+    def build_cache_key(self, name):
+        """
+        Build a key that identifies the result of an operation for the built filters and global filter, regardless of
+        the order of the request parameters.
+
+        :param name: The name of the operation.
+
+        :return: The cache key.
+        """
+        filters = sorted(json.dumps(filter_value, sort_keys=True) for filter_value in self.filters)
+        payload = json.dumps({'filters': filters, 'globalFilter': self.global_filter, 'archived': self.archived},
+                             separators=(',', ':'))
+        return f"{name}:{hashlib.sha256(payload.encode()).hexdigest()}"
@@ -1,5 +1,7 @@
 from marshmallow import Schema, fields, validate, validates_schema, ValidationError
 
+from src.domain.models.paginated_request_dto import compile_filter_registry
+
 
 class ProviderCreateSchema(Schema):
     """
@@ -9,6 +11,13 @@ class ProviderCreateSchema(Schema):
     countryCodes = fields.List(fields.String(), validate=validate.Length(min=1))
 
 
+class ProviderBulkUpsertSchema(Schema):
+    """
+    Schema for upserting a catalog of providers.
+    """
+    providers = fields.List(fields.Raw(), required=True, validate=validate.Length(min=1, max=5000))
+
+
 class ProviderUpdateSchema(Schema):
     """
     Schema for updating a provider's information.
@@ -94,7 +103,11 @@ def get_allowed_get_all_filters():
     """
     return [
         {'param': 'id', 'operator': 'equals', 'entity': 'Provider', 'field': 'id', 'type': 'number'},
-        {'param': 'name', 'operator': 'contains', 'entity': 'Provider', 'field': 'name'}
+        {'param': 'ids', 'operator': 'in', 'entity': 'Provider', 'field': 'id', 'type': 'number'},
+        {'param': 'name', 'operator': 'contains', 'entity': 'Provider', 'field': 'name'},
+        {'param': 'countryCode', 'operator': 'has', 'entity': 'Provider', 'field': 'country_codes'},
+        {'param': 'allCountryCodes', 'operator': 'hasAll', 'entity': 'Provider', 'field': 'country_codes'},
+        {'param': 'anyCountryCodes', 'operator': 'hasAny', 'entity': 'Provider', 'field': 'country_codes'}
     ]
 
 
@@ -105,3 +118,7 @@ def get_allowed_get_all_sort():
     :return: A list of allowed sorting fields.
     """
     return ['id', 'name']
+
+
+# Registry of the allowed filters for the 'get all' operation, compiled once at import
+GET_ALL_FILTER_REGISTRY = compile_filter_registry(get_allowed_get_all_filters())
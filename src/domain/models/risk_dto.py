@@ -1,4 +1,30 @@
-from marshmallow import Schema, fields, validate, ValidationError, validates_schema
+from marshmallow import Schema, fields, validate, ValidationError, validates_schema, validates
+
+from src.domain.models.paginated_request_dto import compile_filter_registry
+
+# Sorting by search relevance, only available when a global filter is provided
+RELEVANCE_SORT = 'relevance'
+
+# Breakdowns of the risk heat map
+HEATMAP_GROUP_PROVIDER = 'provider'
+HEATMAP_GROUP_COUNTRY = 'country'
+
+# Columns of the CSV files accepted by the risk import, named as the fields of RiskCreateSchema
+IMPORT_COLUMNS = ['title', 'description', 'impact', 'probability', 'countryCode', 'providerId']
+
+# Dimensions of the risk summaries
+SUMMARY_DIMENSION_USER = 'user'
+SUMMARY_DIMENSION_PROVIDER = 'provider'
+SUMMARY_DIMENSION_COUNTRY = 'country'
+
+# Default probability of a risk materializing in a simulated trial, by probability score from 1 to 5
+SIMULATION_PROBABILITIES = [0.05, 0.1, 0.25, 0.5, 0.8]
+
+# Default median loss of a materialized risk, by impact score from 1 to 5
+SIMULATION_LOSSES = [1000, 10000, 50000, 250000, 1000000]
+
+# Default loss percentiles reported by the simulation
+SIMULATION_PERCENTILES = [50, 90, 95, 99]
 
 
 class RiskCreateSchema(Schema):
@@ -13,6 +39,78 @@ class RiskCreateSchema(Schema):
     providerId = fields.Integer(required=True)
 
 
+class RiskBulkCreateSchema(Schema):
+    """
+    Schema for creating a batch of risks.
+    """
+    risks = fields.List(fields.Raw(), required=True, validate=validate.Length(min=1, max=1000))
+    allowPartial = fields.Boolean(load_default=False)
+
+
+def validate_numbers(values, minimum, maximum):
+    """
+    Validate that every value of a list is a number within a range.
+
+    :param values: The list to validate.
+    :param minimum: The minimum allowed value.
+    :param maximum: The maximum allowed value, or None.
+
+    :raises ValidationError: If any value is not a number or is out of range.
+    """
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValidationError("Todos los valores deben ser numéricos")
+        if value < minimum or (maximum is not None and value > maximum):
+            raise ValidationError(f"Los valores deben estar entre {minimum} y {maximum}" if maximum is not None
+                                  else f"Los valores deben ser mayores o iguales a {minimum}")
+
+
+class RiskSimulationSchema(Schema):
+    """
+    Schema for the configuration of a Monte Carlo simulation of risk losses.
+    """
+    trials = fields.Integer(load_default=10000, validate=validate.Range(min=100, max=100000))
+    probabilities = fields.List(fields.Raw(), load_default=lambda: list(SIMULATION_PROBABILITIES),
+                                validate=validate.Length(equal=5))
+    losses = fields.List(fields.Raw(), load_default=lambda: list(SIMULATION_LOSSES),
+                         validate=validate.Length(equal=5))
+    lossSigma = fields.Float(load_default=1.0, validate=validate.Range(min=0, max=5))
+    percentiles = fields.List(fields.Raw(), load_default=lambda: list(SIMULATION_PERCENTILES),
+                              validate=validate.Length(min=1, max=20))
+    seed = fields.Integer(load_default=None, allow_none=True, validate=validate.Range(min=0))
+    workers = fields.Integer(load_default=1, validate=validate.Range(min=1))
+
+    @validates('probabilities')
+    def validate_probabilities(self, values, **kwargs):
+        """
+        Validate the probabilities by probability score.
+
+        :param values: The probabilities to validate.
+        :param kwargs: Additional keyword arguments.
+        """
+        validate_numbers(values, 0, 1)
+
+    @validates('losses')
+    def validate_losses(self, values, **kwargs):
+        """
+        Validate the median losses by impact score.
+
+        :param values: The losses to validate.
+        :param kwargs: Additional keyword arguments.
+        """
+        validate_numbers(values, 0, None)
+
+    @validates('percentiles')
+    def validate_percentiles(self, values, **kwargs):
+        """
+        Validate the percentiles to report.
+
+        :param values: The percentiles to validate.
+        :param kwargs: Additional keyword arguments.
+        """
+        validate_numbers(values, 0, 100)
+
+
 class RiskUpdateSchema(Schema):
     """
     Schema for updating risk information.
@@ -49,27 +147,36 @@ def build_response_dto(risks, countries):
 
     :return: A list of DTOs for risks.
     """
-    results = []
-    for value in risks.items:
-        risk = value.Risk
-        provider = value.Provider
-        results.append({
-            'id': risk.id,
-            'title': risk.title,
-            'description': risk.description,
-            'impact': risk.impact,
-            'probability': risk.probability,
-            'country': {
-                'code': risk.country_code,
-                'name': countries[risk.country_code]['name'],
-                'flag': countries[risk.country_code]['flag'],
-            },
-            'provider': {
-                'id': provider.id,
-                'name': provider.name
-            }
-        })
-    return results
+    return [build_item_dto(value.Risk, value.Provider, countries) for value in risks.items]
+
+
+def build_item_dto(risk, provider, countries):
+    """
+    Build a DTO for a risk of a list.
+
+    :param risk: The risk object.
+    :param provider: The provider of the risk.
+    :param countries: Data about countries.
+
+    :return: A DTO for the risk.
+    """
+    return {
+        'id': risk.id,
+        'title': risk.title,
+        'description': risk.description,
+        'impact': risk.impact,
+        'probability': risk.probability,
+        'country': {
+            'code': risk.country_code,
+            'name': countries[risk.country_code]['name'],
+            'flag': countries[risk.country_code]['flag'],
+        },
+        'provider': {
+            'id': provider.id,
+            'name': provider.name
+        },
+        'archived': risk.archived_at is not None
+    }
 
 
 def build_response_basic_dto(risk):
@@ -91,6 +198,219 @@ def build_response_basic_dto(risk):
     }
 
 
+def build_heatmap_cells(rows):
+    """
+    Build the cells of a heat map.
+
+    :param rows: Rows with impact, probability and count.
+
+    :return: A list of DTOs for the heat map cells.
+    """
+    return [{'impact': row.impact, 'probability': row.probability, 'count': row.count} for row in rows]
+
+
+def build_heatmap_dto(rows, group_by, countries):
+    """
+    Build a DTO for a risk heat map, optionally broken down by provider or country.
+
+    :param rows: Rows with impact, probability and count, plus group_key and group_name when grouped, sorted by group.
+    :param group_by: The breakdown of the heat map, or None.
+    :param countries: Data about countries, used by the country breakdown.
+
+    :return: A DTO for the heat map.
+    """
+    if group_by is None:
+        return {
+            'total': sum(row.count for row in rows),
+            'cells': build_heatmap_cells(rows)
+        }
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(row.group_key, []).append(row)
+
+    results = []
+    for key, group_rows in groups.items():
+        if group_by == HEATMAP_GROUP_PROVIDER:
+            group = {'id': key, 'name': group_rows[0].group_name}
+        else:
+            group = {'code': key, 'name': countries[key]['name'], 'flag': countries[key]['flag']}
+        results.append({
+            group_by: group,
+            'total': sum(row.count for row in group_rows),
+            'cells': build_heatmap_cells(group_rows)
+        })
+
+    return {
+        'total': sum(row.count for row in rows),
+        'groupBy': group_by,
+        'groups': results
+    }
+
+
+def build_summary_dto(rows, countries):
+    """
+    Build a DTO for the risk summary of a user.
+
+    :param rows: Summary rows with dimension, dimension_key, total and provider_name.
+    :param countries: Data about countries.
+
+    :return: A DTO for the risk summary.
+    """
+    total = 0
+    providers = []
+    countries_results = []
+    for row in rows:
+        if row.dimension == SUMMARY_DIMENSION_USER:
+            total = row.total
+        elif row.dimension == SUMMARY_DIMENSION_PROVIDER:
+            providers.append({
+                'provider': {'id': int(row.dimension_key), 'name': row.provider_name},
+                'total': row.total
+            })
+        elif row.dimension == SUMMARY_DIMENSION_COUNTRY:
+            countries_results.append({
+                'country': {
+                    'code': row.dimension_key,
+                    'name': countries[row.dimension_key]['name'],
+                    'flag': countries[row.dimension_key]['flag'],
+                },
+                'total': row.total
+            })
+
+    return {
+        'total': total,
+        'providers': providers,
+        'countries': countries_results
+    }
+
+
+def build_loss_summary(mean, percentiles, values):
+    """
+    Build a DTO for simulated losses.
+
+    :param mean: The mean loss.
+    :param percentiles: The reported percentiles.
+    :param values: The loss at every percentile.
+
+    :return: A DTO for the losses.
+    """
+    return {
+        'mean': round(float(mean), 2),
+        'percentiles': [{'percentile': percentile, 'loss': round(float(value), 2)}
+                        for percentile, value in zip(percentiles, values)]
+    }
+
+
+def build_simulation_dto(config, risks, total, providers, countries_results, countries):
+    """
+    Build a DTO for a Monte Carlo simulation of risk losses.
+
+    :param config: The loaded simulation configuration.
+    :param risks: The number of simulated risks.
+    :param total: A tuple with the mean and the percentiles of the total loss.
+    :param providers: A list of tuples with the provider id, name, mean loss and percentiles.
+    :param countries_results: A list of tuples with the country code, mean loss and percentiles.
+    :param countries: Data about countries.
+
+    :return: A DTO for the simulation.
+    """
+    percentiles = config['percentiles']
+    return {
+        'trials': config['trials'],
+        'risks': risks,
+        'total': build_loss_summary(total[0], percentiles, total[1]),
+        'providers': [
+            {'provider': {'id': provider_id, 'name': name}, **build_loss_summary(mean, percentiles, values)}
+            for provider_id, name, mean, values in providers
+        ],
+        'countries': [
+            {
+                'country': {'code': code, 'name': countries[code]['name'], 'flag': countries[code]['flag']},
+                **build_loss_summary(mean, percentiles, values)
+            } for code, mean, values in countries_results
+        ]
+    }
+
+
+def build_exposure_dto(provider_ids, providers, country_codes, countries, scores, counts):
+    """
+    Build a DTO for a provider × country exposure matrix. Rows follow the order of the providers and columns the
+    order of the countries.
+
+    :param provider_ids: The provider of every row.
+    :param providers: Data about providers, keyed by ID.
+    :param country_codes: The country of every column.
+    :param countries: Data about countries.
+    :param scores: The matrix of added risk scores (impact × probability).
+    :param counts: The matrix of risk counts.
+
+    :return: A DTO for the exposure matrix.
+    """
+    return {
+        'providers': [{'id': provider_id, 'name': providers[provider_id].name} for provider_id in provider_ids],
+        'countries': [
+            {'code': code, 'name': countries[code]['name'], 'flag': countries[code]['flag']} for code in country_codes
+        ],
+        'scores': [[int(score) for score in row] for row in scores],
+        'counts': [[int(count) for count in row] for row in counts],
+        'coverage': [[code in providers[provider_id].country_codes for code in country_codes]
+                     for provider_id in provider_ids]
+    }
+
+
+def build_duplicate_dto(risk, similarity):
+    """
+    Build a DTO for a possible duplicate of a risk.
+
+    :param risk: The possible duplicate.
+    :param similarity: The estimated similarity of its title and description, between 0 and 1.
+
+    :return: A DTO for the possible duplicate.
+    """
+    return {
+        'id': risk.id,
+        'title': risk.title,
+        'providerId': risk.provider_id,
+        'country': risk.country_code,
+        'similarity': round(similarity, 2)
+    }
+
+
+def build_duplicate_groups_dto(groups, risks, limit):
+    """
+    Build a DTO for the groups of possible duplicates of a user.
+
+    :param groups: A list of tuples with the risk IDs of a group and the highest similarity of its pairs.
+    :param risks: The risks of the reported groups, keyed by ID.
+    :param limit: Maximum number of groups reported.
+
+    :return: A DTO for the groups of possible duplicates.
+    """
+    results = []
+    for risk_ids, similarity in groups[:limit]:
+        members = [risks[risk_id] for risk_id in risk_ids if risk_id in risks]
+        if len(members) > 1:
+            results.append({
+                'similarity': round(similarity, 2),
+                'risks': [build_response_basic_dto(risk) for risk in members]
+            })
+
+    return {
+        'total': len(groups),
+        'groups': results
+    }
+
+
+def get_allowed_heatmap_groups():
+    """
+    Get a list of allowed breakdowns for the heat map operation.
+
+    :return: A list of allowed breakdowns.
+    """
+    return [HEATMAP_GROUP_PROVIDER, HEATMAP_GROUP_COUNTRY]
+
+
 def get_allowed_get_all_filters():
     """
     Get a list of allowed filters for the 'get all' operation.
@@ -101,11 +421,20 @@ def get_allowed_get_all_filters():
         {'param': 'id', 'operator': 'equals', 'entity': 'Risk', 'field': 'id', 'type': 'number'},
         {'param': 'title', 'operator': 'contains', 'entity': 'Risk', 'field': 'title'},
         {'param': 'description', 'operator': 'contains', 'entity': 'Risk', 'field': 'description'},
-        {'param': 'impact', 'operator': 'equals', 'entity': 'Risk', 'field': 'impact'},
-        {'param': 'probability', 'operator': 'equals', 'entity': 'Risk', 'field': 'probability'},
-        {'param': 'user_id', 'operator': 'equals', 'entity': 'Risk', 'field': 'user_id'},
+        {'param': 'impact', 'operator': 'equals', 'entity': 'Risk', 'field': 'impact', 'type': 'number'},
+        {'param': 'minImpact', 'operator': 'gte', 'entity': 'Risk', 'field': 'impact', 'type': 'number'},
+        {'param': 'maxImpact', 'operator': 'lte', 'entity': 'Risk', 'field': 'impact', 'type': 'number'},
+        {'param': 'impactBetween', 'operator': 'between', 'entity': 'Risk', 'field': 'impact', 'type': 'number'},
+        {'param': 'probability', 'operator': 'equals', 'entity': 'Risk', 'field': 'probability', 'type': 'number'},
+        {'param': 'minProbability', 'operator': 'gte', 'entity': 'Risk', 'field': 'probability', 'type': 'number'},
+        {'param': 'maxProbability', 'operator': 'lte', 'entity': 'Risk', 'field': 'probability', 'type': 'number'},
+        {'param': 'probabilityBetween', 'operator': 'between', 'entity': 'Risk', 'field': 'probability',
+         'type': 'number'},
+        {'param': 'user_id', 'operator': 'equals', 'entity': 'Risk', 'field': 'user_id', 'type': 'number'},
         {'param': 'country.code', 'operator': 'equals', 'entity': 'Risk', 'field': 'country_code'},
-        {'param': 'provider.id', 'operator': 'equals', 'entity': 'Provider', 'field': 'id'},
+        {'param': 'country.codes', 'operator': 'in', 'entity': 'Risk', 'field': 'country_code'},
+        {'param': 'provider.id', 'operator': 'equals', 'entity': 'Provider', 'field': 'id', 'type': 'number'},
+        {'param': 'provider.ids', 'operator': 'in', 'entity': 'Provider', 'field': 'id', 'type': 'number'},
         {'param': 'provider.name', 'operator': 'contains', 'entity': 'Provider', 'field': 'name'}
     ]
 
@@ -117,3 +446,16 @@ def get_allowed_get_all_sort():
     :return: A list of allowed sorting fields.
     """
     return ['id', 'title', 'description', 'impact', 'probability']
+
+
+def get_allowed_search_sort():
+    """
+    Get a list of allowed sorting fields for the 'get all' operation when a global filter is provided.
+
+    :return: A list of allowed sorting fields.
+    """
+    return get_allowed_get_all_sort() + [RELEVANCE_SORT]
+
+
+# Registry of the allowed filters for the 'get all' operation, compiled once at import
+GET_ALL_FILTER_REGISTRY = compile_filter_registry(get_allowed_get_all_filters())
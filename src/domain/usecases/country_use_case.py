@@ -1,7 +1,20 @@
+import threading
+import time
+
 from src.domain.gateways.country_client import ICountryClient
-from src.domain.gateways.country_gateway import ICountryGateway
+from src.domain.gateways.country_gateway import ICountryGateway, COUNTRY_DATA_STALE, COUNTRY_DATA_MISSING
 from src.domain.models.country_dto import build_country_dto
 
+COUNTRY_DATA_FLAG = "exist_country_data"
+COUNTRY_DATA_KEY = "countries"
+COUNTRY_DATA_TTL = 86400
+COUNTRY_RETRY_TTL = 300
+COUNTRY_REFRESH_LOCK = "countries_refresh_lock"
+COUNTRY_REFRESH_LOCK_TTL = 60
+COUNTRY_COLD_START_WAIT = 10
+
+background_refresh_guard = threading.Lock()
+
 
 def transform_data(country_data):
     """
@@ -23,15 +36,19 @@ class CountryUseCase:
     Use case for managing country data.
     """
 
-    def __init__(self, country_client: ICountryClient, country_gateway: ICountryGateway):
+    def __init__(self, country_client: ICountryClient, country_gateway: ICountryGateway,
+                 snapshot_client: ICountryClient = None):
         """
         Initialize the CountryUseCase.
 
         :param country_client: The country data client.
         :param country_gateway: The country data gateway.
+        :param snapshot_client: Optional client with bundled country data, used to seed the cache on a cold start and
+            as a fallback when the country data client fails.
         """
         self.country_client = country_client
         self.country_gateway = country_gateway
+        self.snapshot_client = snapshot_client
 
     def get_all_countries(self):
         """
@@ -39,9 +56,7 @@ class CountryUseCase:
 
         :return: A dictionary of country data.
         """
-        self.verify_countries_in_redis()
-        countries = self.country_gateway.get_all_countries_data()
-        return countries
+        return self.read_countries(None)
 
     def get_countries_by_codes(self, country_codes):
         """
@@ -51,16 +66,130 @@ class CountryUseCase:
 
         :return: A dictionary of country data for the specified country codes.
         """
-        self.verify_countries_in_redis()
-        country_data = self.country_gateway.get_countries_data_by_codes(country_codes)
-        return country_data
+        return self.read_countries(list(country_codes))
+
+    def read_countries(self, country_codes):
+        """
+        Read country data and its freshness from the cache in a single call, then act on the freshness.
 
-    def verify_countries_in_redis(self):
+        While the data flag is valid the data is returned as is. Once it expires, the existing (stale) data keeps being
+        served and a single worker refreshes it in the background. Only when there is no data at all the request seeds
+        it, or waits for the worker that holds the refresh lock, and reads again.
+
+        :param country_codes: List of country codes to fetch, or None for all countries.
+
+        :return: A dictionary of country data.
         """
-        Verify if country data is available in the cache. If not, fetch data from the client and store it in the gateway.
+        countries, status = self.country_gateway.get_countries_data_with_status(COUNTRY_DATA_FLAG, country_codes)
+
+        if status == COUNTRY_DATA_STALE:
+            self.refresh_countries_in_background()
+        elif status == COUNTRY_DATA_MISSING:
+            if not self.seed_countries():
+                self.wait_for_countries(COUNTRY_COLD_START_WAIT)
+            countries, _ = self.country_gateway.get_countries_data_with_status(COUNTRY_DATA_FLAG, country_codes)
+
+        return countries
+
+    def refresh_countries_in_background(self):
+        """
+        Start a background refresh of the country data, unless this worker is already running one.
+        """
+        if background_refresh_guard.acquire(blocking=False):
+            threading.Thread(target=self.run_background_refresh, daemon=True).start()
+
+    def seed_countries(self):
+        """
+        Store country data on a cold start. The snapshot client is used when available, so the request does not wait
+        for the country data client; its flag is short-lived so the live data replaces it soon after.
+
+        :return: True if this call held the refresh lock, False if another worker is already refreshing.
+        """
+        if self.snapshot_client is None:
+            return self.refresh_countries()
+
+        token = self.country_gateway.acquire_lock(COUNTRY_REFRESH_LOCK, COUNTRY_REFRESH_LOCK_TTL)
+        if token is None:
+            return False
+
+        try:
+            self.store_countries(self.snapshot_client, COUNTRY_RETRY_TTL)
+        finally:
+            self.country_gateway.release_lock(COUNTRY_REFRESH_LOCK, token)
+
+        return True
+
+    def refresh_countries(self):
+        """
+        Fetch country data from the client and replace it in the gateway. Only the worker that acquires the refresh
+        lock performs the fetch. If the client fails, the existing data is kept and retried later, or the snapshot
+        client data is stored when there is nothing to keep.
+
+        :return: True if this call held the refresh lock, False if another worker is already refreshing.
+        """
+        token = self.country_gateway.acquire_lock(COUNTRY_REFRESH_LOCK, COUNTRY_REFRESH_LOCK_TTL)
+        if token is None:
+            return False
+
+        try:
+            if not self.store_countries(self.country_client, COUNTRY_DATA_TTL):
+                if self.country_gateway.check_flag(COUNTRY_DATA_KEY):
+                    self.country_gateway.set_flag(COUNTRY_DATA_FLAG, COUNTRY_RETRY_TTL)
+                elif self.snapshot_client is not None:
+                    self.store_countries(self.snapshot_client, COUNTRY_RETRY_TTL)
+        finally:
+            self.country_gateway.release_lock(COUNTRY_REFRESH_LOCK, token)
+
+        return True
+
+    def store_countries(self, client, ttl):
+        """
+        Fetch country data from a client and store it in the gateway with a data flag.
+
+        :param client: The country data client to fetch from.
+        :param ttl: Time-to-live in seconds of the data flag.
+
+        :return: True if the data was stored, False if the client returned no data.
+        """
+        country_data = client.fetch_data_from_api()
+        if not country_data:
+            return False
+
+        self.country_gateway.set_countries_data(transform_data(country_data), COUNTRY_DATA_FLAG, ttl)
+        return True
+
+    def run_background_refresh(self):
+        """
+        Refresh country data from a background thread, releasing the in-process guard when done.
+        """
+        try:
+            self.refresh_countries()
+        except Exception as e:
+            print(e)  # Log the refresh error, stale data keeps being served.
+        finally:
+            background_refresh_guard.release()
+
+    def refresh_countries_if_expiring(self, threshold):
+        """
+        Refresh country data ahead of time when the data flag is about to expire, so no request has to pay for it.
+
+        :param threshold: Seconds before the flag expiration in which the refresh is triggered.
+
+        :return: True if a refresh was performed by this call, False otherwise.
+        """
+        ttl = self.country_gateway.get_ttl(COUNTRY_DATA_FLAG)
+        if 0 <= ttl <= threshold or ttl == -2:
+            return self.refresh_countries()
+        return False
+
+    def wait_for_countries(self, timeout):
+        """
+        Wait until another worker has stored the country data.
+
+        :param timeout: Maximum seconds to wait.
         """
-        if not self.country_gateway.check_flag("exist_country_data"):
-            self.country_gateway.delete("countries")
-            countries = transform_data(self.country_client.fetch_data_from_api())
-            self.country_gateway.set_countries_data(countries)
-            self.country_gateway.set_flag("exist_country_data")
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.country_gateway.check_flag(COUNTRY_DATA_KEY):
+                return
+            time.sleep(0.1)
@@ -1,12 +1,14 @@
-from src.domain.exceptions.exceptions import ResourceNotFoundException, BusinessException
+from marshmallow import ValidationError
+
+from src.domain.exceptions.exceptions import ResourceNotFoundException, BusinessException, ValidationException
 from src.domain.gateways.country_client import ICountryClient
 from src.domain.gateways.country_gateway import ICountryGateway
-from src.domain.gateways.provider_gateway import IProviderGateway
+from src.domain.gateways.provider_gateway import IProviderGateway, PROVIDER_NAME_EXISTS
 from src.domain.models.provider_dto import get_allowed_get_all_sort, ProviderCreateSchema, ProviderUpdateSchema, \
-    build_response_dto, get_allowed_get_all_filters, build_response_basic_dto
+    build_response_dto, GET_ALL_FILTER_REGISTRY, build_response_basic_dto, ProviderBulkUpsertSchema
 from src.domain.usecases.country_use_case import CountryUseCase
-from src.domain.utils.responses import response_paginated
-from src.domain.utils.validations import validate_input
+from src.domain.utils.responses import response_paginated, response_cursor_paginated
+from src.domain.utils.validations import validate_input, build_bulk_errors
 
 
 def get_country_codes_from_providers(providers):
@@ -30,16 +32,17 @@ class ProviderUseCase:
     """
 
     def __init__(self, provider_gateway: IProviderGateway, country_client: ICountryClient,
-                 country_gateway: ICountryGateway):
+                 country_gateway: ICountryGateway, snapshot_client: ICountryClient = None):
         """
         Initialize the ProviderUseCase.
 
         :param provider_gateway: The provider data gateway.
         :param country_client: The country data client.
         :param country_gateway: The country data gateway.
+        :param snapshot_client: Optional client with bundled country data.
         """
         self.provider_gateway = provider_gateway
-        self.country_service = CountryUseCase(country_client, country_gateway)
+        self.country_service = CountryUseCase(country_client, country_gateway, snapshot_client)
 
     def get_filtered_providers(self, req):
         """
@@ -49,14 +52,19 @@ class ProviderUseCase:
 
         :return: Paginated response with a list of filtered providers.
         """
-        req.build_filter_values(get_allowed_get_all_filters())
+        req.build_filter_values(GET_ALL_FILTER_REGISTRY)
         req.build_order_by('id', get_allowed_get_all_sort())
+        req.build_count_mode()
 
         providers = self.provider_gateway.get_providers_by_filter(req)
         countries_data = self.get_countries_data(providers.items)
 
         results = build_response_dto(providers, countries_data)
-        return response_paginated(providers.total, req.page, req.per_page, providers.pages, results)
+
+        if req.cursor_mode:
+            return response_cursor_paginated(req.per_page, providers.next_cursor, providers.prev_cursor, results)
+        return response_paginated(providers.total, providers.page, providers.per_page, providers.pages, results,
+                                  providers.has_next, providers.count_mode)
 
     def get_provider_by_id(self, provider_id):
         """
@@ -77,6 +85,7 @@ class ProviderUseCase:
         :return: Basic information about the created provider.
         """
         validate_input(ProviderCreateSchema(), data)
+        self.validate_unique_name(data['name'])
 
         country_codes = set(data.get('countryCodes', []))
         self.validate_existence_all_country_codes(country_codes)
@@ -96,12 +105,53 @@ class ProviderUseCase:
         validate_input(ProviderUpdateSchema(), data)
 
         provider_to_update = self.find_provider_by_id(provider_id)
+        if 'name' in data:
+            self.validate_unique_name(data['name'], provider_to_update.id)
         country_codes = set(data.get('countryCodes', provider_to_update.country_codes))
         self.validate_existence_all_country_codes(country_codes)
 
         update_provider = self.provider_gateway.update_provider(provider_to_update, data)
         return build_response_basic_dto(update_provider)
 
+    def upsert_providers(self, data):
+        """
+        Create or update a catalog of providers, matched by name, in a single transaction. The country codes of the
+        whole catalog are validated with a single lookup.
+
+        :param data: The catalog, with the list of providers.
+
+        :raise: ValidationException if the catalog or any of its providers is invalid.
+        :raise: BusinessException if some country codes do not exist.
+
+        :return: The number of created, updated and unchanged providers.
+        """
+        validate_input(ProviderBulkUpsertSchema(), data)
+
+        schema = ProviderCreateSchema()
+        errors = []
+        providers = []
+        names = set()
+        for index, item in enumerate(data['providers']):
+            try:
+                provider = schema.load(item)
+            except ValidationError as e:
+                errors.extend(build_bulk_errors(index, e.messages, 'providers'))
+                continue
+
+            if provider['name'] in names:
+                errors.extend(build_bulk_errors(index, {'name': ["Proveedor duplicado"]}, 'providers'))
+                continue
+
+            names.add(provider['name'])
+            providers.append({'name': provider['name'], 'countryCodes': sorted(set(provider.get('countryCodes', [])))})
+
+        if errors:
+            raise ValidationException("Error validating input data", errors)
+
+        self.validate_existence_all_country_codes({code for provider in providers for code in provider['countryCodes']})
+
+        return self.provider_gateway.upsert_providers(providers)
+
     def delete_provider(self, provider_id):
         """
         Delete a provider by its ID.
@@ -129,6 +179,29 @@ class ProviderUseCase:
 
         return provider
 
+    def find_providers_by_ids(self, provider_ids):
+        """
+        Find the providers with the given IDs.
+
+        :param provider_ids: The IDs of the providers to find.
+
+        :return: A dictionary of the providers found, keyed by ID.
+        """
+        return {provider.id: provider for provider in self.provider_gateway.get_providers_by_ids(provider_ids)}
+
+    def validate_unique_name(self, name, provider_id=None):
+        """
+        Validate that no other provider has the given name.
+
+        :param name: The name of the provider.
+        :param provider_id: The ID of the provider being updated, or None for a new provider.
+
+        :raise: BusinessException if another provider has the name.
+        """
+        provider = self.provider_gateway.get_provider_by_name(name)
+        if provider is not None and provider.id != provider_id:
+            raise BusinessException(PROVIDER_NAME_EXISTS)
+
     def validate_existence_all_country_codes(self, country_codes):
         """
         Validate the existence of all provided country codes.
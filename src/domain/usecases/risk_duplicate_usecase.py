@@ -0,0 +1,216 @@
+import threading
+from collections import OrderedDict
+
+from src.domain.gateways.risk_gateway import IRiskGateway
+from src.domain.gateways.risk_signature_gateway import IRiskSignatureGateway, SIGNATURES_UNAVAILABLE
+from src.domain.utils.minhash import MinHashIndex, build_signature
+
+# Minimum estimated similarity between two risks to report them as possible duplicates
+DUPLICATE_THRESHOLD = 0.5
+
+# Maximum number of possible duplicates suggested for a risk
+DUPLICATE_SUGGESTIONS_LIMIT = 5
+
+# Maximum number of user indexes held in memory by a process
+DUPLICATE_INDEXES_LIMIT = 100
+
+
+def build_risk_text(title, description):
+    """
+    Build the text of a risk compared by the duplicate detection.
+
+    :param title: The title of the risk.
+    :param description: The description of the risk.
+
+    :return: The text of the risk.
+    """
+    return f"{title or ''} {description or ''}"
+
+
+def group_pairs(pairs):
+    """
+    Group the risks of similar pairs into connected groups.
+
+    :param pairs: A dictionary of similarities keyed by pairs of risk IDs.
+
+    :return: A list of tuples with the sorted risk IDs of a group and the highest similarity of its pairs, from the
+        most to the least similar group.
+    """
+    parents = {}
+
+    def find(risk_id):
+        parents.setdefault(risk_id, risk_id)
+        while parents[risk_id] != risk_id:
+            parents[risk_id] = parents[parents[risk_id]]
+            risk_id = parents[risk_id]
+        return risk_id
+
+    for first, second in pairs:
+        parents[find(first)] = find(second)
+
+    groups = {}
+    for (first, second), similarity in pairs.items():
+        group = groups.setdefault(find(first), [set(), 0.0])
+        group[0].update((first, second))
+        group[1] = max(group[1], similarity)
+
+    return sorted(((sorted(risk_ids), similarity) for risk_ids, similarity in groups.values()),
+                  key=lambda group: (-group[1], group[0][0]))
+
+
+class RiskDuplicateUseCase:
+    """
+    Suggests possible duplicates among the risks of a user with a MinHash LSH index over their title and description.
+    The signatures are stored in the signature gateway, shared by every process, and every process keeps an in-memory
+    index per user that is reloaded when the stored version changes.
+    """
+
+    def __init__(self, risk_gateway: IRiskGateway, signature_gateway: IRiskSignatureGateway):
+        """
+        Initializes a RiskDuplicateUseCase instance.
+
+        :param risk_gateway: The risk gateway providing access to risk data.
+        :param signature_gateway: The gateway storing the signatures of the risks.
+        """
+        self.risk_gateway = risk_gateway
+        self.signature_gateway = signature_gateway
+        self.lock = threading.Lock()
+        self.indexes = OrderedDict()
+
+    def get_index(self, user_id):
+        """
+        Gets the index of a user, reloading it from the signature gateway if it changed, or rebuilding it from the
+        stored risks if the gateway has no signatures for the user. While the gateway is unavailable, the index kept in
+        memory is used as is and no index is rebuilt, so the risks of the user are not read on every call.
+
+        :param user_id: The user identifier.
+
+        :return: The MinHash index of the risks of the user, or None if the gateway is unavailable and there is no
+            index of the user in memory.
+        """
+        version = self.signature_gateway.get_version(user_id)
+        with self.lock:
+            cached = self.indexes.get(user_id)
+            if cached is not None and version is not None and version in (cached[0], SIGNATURES_UNAVAILABLE):
+                self.indexes.move_to_end(user_id)
+                return cached[1]
+        if version == SIGNATURES_UNAVAILABLE:
+            return None
+
+        stored = self.signature_gateway.get_signatures(user_id) if version is not None else None
+        if stored is not None:
+            signatures, version = stored
+        else:
+            token = self.signature_gateway.begin_rebuild(user_id)
+            if token is None:
+                return None
+            signatures = {row.id: build_signature(build_risk_text(row.title, row.description))
+                          for row in self.risk_gateway.get_risk_texts(user_id)}
+            version = self.signature_gateway.replace_signatures(user_id, signatures, token)
+
+        index = MinHashIndex(signatures)
+        if version is not None:
+            self.store_index(user_id, version, index)
+        return index
+
+    def store_index(self, user_id, version, index):
+        """
+        Keeps the index of a user in memory, evicting the least recently used index if the limit is reached.
+
+        :param user_id: The user identifier.
+        :param version: The version of the signatures in the index.
+        :param index: The MinHash index.
+        """
+        with self.lock:
+            self.indexes[user_id] = (version, index)
+            self.indexes.move_to_end(user_id)
+            while len(self.indexes) > DUPLICATE_INDEXES_LIMIT:
+                self.indexes.popitem(last=False)
+
+    def apply_change(self, user_id, version, change):
+        """
+        Applies a change to the in-memory index of a user if the stored version only moved by that change, or drops
+        the index so it is reloaded on the next use.
+
+        :param user_id: The user identifier.
+        :param version: The version returned by the signature gateway for the change.
+        :param change: A function that applies the change to a MinHash index.
+        """
+        with self.lock:
+            cached = self.indexes.get(user_id)
+            if cached is None:
+                return
+            if version is not None and cached[0] == version - 1:
+                change(cached[1])
+                self.indexes[user_id] = (version, cached[1])
+            else:
+                del self.indexes[user_id]
+
+    def find_similar(self, user_id, title, description, exclude=None):
+        """
+        Finds the risks of a user similar to a title and description.
+
+        :param user_id: The user identifier.
+        :param title: The title to compare.
+        :param description: The description to compare.
+        :param exclude: Optional risk ID to leave out of the results.
+
+        :return: A list of tuples with risk ID and similarity, from the most to the least similar, empty if the index
+            is unavailable.
+        """
+        index = self.get_index(user_id)
+        if index is None:
+            return []
+        signature = build_signature(build_risk_text(title, description))
+        return index.query(signature, DUPLICATE_THRESHOLD, exclude)[:DUPLICATE_SUGGESTIONS_LIMIT]
+
+    def find_duplicate_groups(self, user_id, threshold=DUPLICATE_THRESHOLD):
+        """
+        Finds the groups of possible duplicates among every risk of a user.
+
+        :param user_id: The user identifier.
+        :param threshold: The minimum estimated similarity of a pair of duplicates.
+
+        :return: A list of tuples with the risk IDs of a group and the highest similarity of its pairs, or None if the
+            index is unavailable.
+        """
+        index = self.get_index(user_id)
+        return group_pairs(index.find_pairs(threshold)) if index is not None else None
+
+    def index_risks(self, user_id, risks):
+        """
+        Adds or replaces the signatures of created or updated risks.
+
+        :param user_id: The user identifier.
+        :param risks: The risks to index.
+        """
+        if not risks:
+            return
+        signatures = {risk.id: build_signature(build_risk_text(risk.title, risk.description)) for risk in risks}
+        version = self.signature_gateway.set_signatures(user_id, signatures)
+
+        def change(index):
+            for risk_id, signature in signatures.items():
+                index.add(risk_id, signature)
+
+        self.apply_change(user_id, version, change)
+
+    def remove_risk(self, user_id, risk_id):
+        """
+        Removes the signature of a deleted risk.
+
+        :param user_id: The user identifier.
+        :param risk_id: The deleted risk ID.
+        """
+        version = self.signature_gateway.delete_signatures(user_id, [risk_id])
+        self.apply_change(user_id, version, lambda index: index.remove(risk_id))
+
+    def invalidate_user(self, user_id):
+        """
+        Drops the signatures of a user, so they are rebuilt from the stored risks on the next use.
+
+        :param user_id: The user identifier.
+        """
+        self.signature_gateway.invalidate_user(user_id)
+        with self.lock:
+            self.indexes.pop(user_id, None)
@@ -1,16 +1,40 @@
+from itertools import islice
+
+from marshmallow import ValidationError
+
 from src.domain.exceptions.exceptions import ResourceNotFoundException, BusinessException, \
-    OperationUnauthorizedException
+    OperationUnauthorizedException, ValidationException
 from src.domain.gateways.country_client import ICountryClient
 from src.domain.gateways.country_gateway import ICountryGateway
 from src.domain.gateways.provider_gateway import IProviderGateway
+from src.domain.gateways.risk_cache_gateway import IRiskCacheGateway
 from src.domain.gateways.risk_gateway import IRiskGateway
-from src.domain.models.risk_dto import get_allowed_get_all_filters, RiskUpdateSchema, RiskCreateSchema, \
+from src.domain.gateways.risk_signature_gateway import IRiskSignatureGateway
+from src.domain.models.risk_dto import GET_ALL_FILTER_REGISTRY, RiskUpdateSchema, RiskCreateSchema, \
     build_response_dto, \
-    get_allowed_get_all_sort, build_response_basic_dto
+    get_allowed_get_all_sort, build_response_basic_dto, get_allowed_search_sort, build_heatmap_dto, \
+    get_allowed_heatmap_groups, HEATMAP_GROUP_COUNTRY, build_summary_dto, SUMMARY_DIMENSION_COUNTRY, \
+    RiskBulkCreateSchema, build_item_dto, RiskSimulationSchema, build_simulation_dto, build_exposure_dto, \
+    build_duplicate_dto, build_duplicate_groups_dto
 from src.domain.usecases.country_use_case import CountryUseCase
 from src.domain.usecases.provider_usecase import ProviderUseCase
-from src.domain.utils.responses import response_paginated
-from src.domain.utils.validations import validate_input
+from src.domain.usecases.risk_duplicate_usecase import RiskDuplicateUseCase, DUPLICATE_THRESHOLD
+from src.domain.utils.exposure import build_exposure_matrix
+from src.domain.utils.responses import response_paginated, response_cursor_paginated
+from src.domain.utils.simulation import build_groups, run_simulation, summarize_losses
+from src.domain.utils.validations import validate_input, build_bulk_errors
+
+# Number of rows validated and staged together by the risk import
+IMPORT_CHUNK_SIZE = 1000
+
+# Maximum number of row errors reported by the risk import
+IMPORT_MAX_ERRORS = 1000
+
+# Maximum number of groups of possible duplicates reported
+DUPLICATE_GROUPS_LIMIT = 100
+
+# Batches archived or restored by a single API request, so it ends well within the worker timeout
+ARCHIVE_REQUEST_BATCHES = 10
 
 
 def validate_risk_belongs_to_user(risk, user_id):
@@ -67,7 +91,9 @@ class RiskUseCase:
     """
 
     def __init__(self, risk_gateway: IRiskGateway, provider_gateway: IProviderGateway,
-                 country_client: ICountryClient, country_gateway: ICountryGateway):
+                 country_client: ICountryClient, country_gateway: ICountryGateway,
+                 snapshot_client: ICountryClient = None, cache_gateway: IRiskCacheGateway = None,
+                 signature_gateway: IRiskSignatureGateway = None):
         """
         Initializes a RiskUseCase instance.
 
@@ -75,10 +101,16 @@ class RiskUseCase:
         :param provider_gateway: The provider gateway providing access to provider data.
         :param country_client: The country client for fetching country data.
         :param country_gateway: The country gateway providing access to country data.
+        :param snapshot_client: Optional country client with bundled country data.
+        :param cache_gateway: Optional cache of the results computed from the risks of a user.
+        :param signature_gateway: Optional store of the signatures used to suggest duplicate risks.
         """
         self.risk_gateway = risk_gateway
-        self.provider_service = ProviderUseCase(provider_gateway, country_client, country_gateway)
-        self.country_service = CountryUseCase(country_client, country_gateway)
+        self.cache_gateway = cache_gateway
+        self.duplicate_service = RiskDuplicateUseCase(risk_gateway, signature_gateway) \
+            if signature_gateway is not None else None
+        self.provider_service = ProviderUseCase(provider_gateway, country_client, country_gateway, snapshot_client)
+        self.country_service = CountryUseCase(country_client, country_gateway, snapshot_client)
 
     def get_filtered_risks(self, req):
         """
@@ -88,15 +120,186 @@ class RiskUseCase:
 
         :return: A paginated list of risk data based on the provided request.
         """
-        req.build_filter_values(get_allowed_get_all_filters())
-        req.build_order_by('id', get_allowed_get_all_sort())
+        req.build_filter_values(GET_ALL_FILTER_REGISTRY)
+        req.build_archived_mode()
+        if req.global_filter and not req.cursor_mode:
+            req.build_order_by('id', get_allowed_search_sort())
+        else:
+            req.build_order_by('id', get_allowed_get_all_sort())
+        req.build_count_mode()
 
         risks = self.risk_gateway.get_risks_by_filter(req)
 
         countries = self.get_countries_data(risks.items)
         results = build_response_dto(risks, countries)
 
-        return response_paginated(risks.total, req.page, req.per_page, risks.pages, results)
+        if req.cursor_mode:
+            return response_cursor_paginated(req.per_page, risks.next_cursor, risks.prev_cursor, results)
+        return response_paginated(risks.total, risks.page, risks.per_page, risks.pages, results, risks.has_next,
+                                  risks.count_mode)
+
+    def export_risks(self, req):
+        """
+        Retrieves every risk matching the provided request, with the filters and sorting of get_filtered_risks, as a
+        lazy stream. Risks are read with a server-side cursor and country data is resolved once for the whole export.
+
+        :param req: The request containing filter criteria and sorting details. Pagination is ignored.
+
+        :return: A generator of risk data.
+        """
+        req.build_filter_values(GET_ALL_FILTER_REGISTRY)
+        req.build_archived_mode()
+        if req.global_filter:
+            req.build_order_by('id', get_allowed_search_sort())
+        else:
+            req.build_order_by('id', get_allowed_get_all_sort())
+
+        countries = self.country_service.get_all_countries()
+
+        return (build_item_dto(value.Risk, value.Provider, countries)
+                for value in self.risk_gateway.stream_risks_by_filter(req))
+
+    def get_risk_heatmap(self, req, group_by=None):
+        """
+        Counts the risks matching the provided request by impact and probability, optionally broken down by provider
+        or country. Uses the same filters as get_filtered_risks.
+
+        :param req: The request containing filter criteria.
+        :param group_by: Optional breakdown of the heat map, 'provider' or 'country'.
+
+        :raises ValidationException: If the breakdown is not allowed.
+
+        :return: The heat map of the risks.
+        """
+        if group_by is not None and group_by not in get_allowed_heatmap_groups():
+            raise ValidationException("Error validating input data",
+                                      [{"field": "groupBy", "errors": "Agrupación inválida"}])
+
+        req.build_filter_values(GET_ALL_FILTER_REGISTRY)
+        req.build_archived_mode()
+
+        rows = self.risk_gateway.get_risk_heatmap(req, group_by)
+
+        countries = {}
+        if group_by == HEATMAP_GROUP_COUNTRY and rows:
+            countries = self.country_service.get_countries_by_codes({row.group_key for row in rows})
+
+        return build_heatmap_dto(rows, group_by, countries)
+
+    def simulate_risks(self, req, data, max_workers=1):
+        """
+        Runs a Monte Carlo simulation of the losses of the risks matching the provided request. The scores of every
+        risk are mapped to a probability of materializing and a median loss, and the trials are vectorized over all
+        the risks. Uses the same filters as get_filtered_risks.
+
+        :param req: The request containing filter criteria.
+        :param data: The simulation configuration.
+        :param max_workers: Maximum number of processes the trials may be spread across.
+
+        :raises ValidationException: If the configuration is invalid.
+
+        :return: The mean and percentiles of the simulated losses, in total and by provider and country.
+        """
+        validate_input(RiskSimulationSchema(), data)
+        config = RiskSimulationSchema().load(data)
+        if config['workers'] > max_workers:
+            raise ValidationException("Error validating input data",
+                                      [{"field": "workers", "errors": f"El máximo de procesos es {max_workers}"}])
+
+        req.build_filter_values(GET_ALL_FILTER_REGISTRY)
+        req.build_archived_mode()
+
+        rows = self.risk_gateway.get_risk_scores(req)
+
+        probabilities = [config['probabilities'][row.probability - 1] for row in rows]
+        medians = [config['losses'][row.impact - 1] for row in rows]
+        provider_ids, provider_index = build_groups([row.provider_id for row in rows])
+        country_codes, country_index = build_groups([row.country_code for row in rows])
+        provider_names = {row.provider_id: row.provider_name for row in rows}
+
+        totals, (provider_losses, country_losses) = run_simulation(
+            probabilities, medians, config['lossSigma'],
+            [(len(provider_ids), provider_index), (len(country_codes), country_index)],
+            config['trials'], config['seed'], config['workers'])
+
+        total_mean, total_percentiles = summarize_losses(totals, config['percentiles'])
+        provider_means, provider_percentiles = summarize_losses(provider_losses, config['percentiles'])
+        country_means, country_percentiles = summarize_losses(country_losses, config['percentiles'])
+
+        provider_ids = provider_ids.tolist()
+        country_codes = country_codes.tolist()
+        countries = self.country_service.get_countries_by_codes(set(country_codes)) if country_codes else {}
+
+        return build_simulation_dto(
+            config, len(rows), (total_mean, total_percentiles),
+            [(provider_id, provider_names[provider_id], provider_means[position], provider_percentiles[:, position])
+             for position, provider_id in enumerate(provider_ids)],
+            [(code, country_means[position], country_percentiles[:, position])
+             for position, code in enumerate(country_codes)],
+            countries)
+
+    def get_risk_exposure(self, req, user_id):
+        """
+        Computes the provider × country matrix of the added scores (impact × probability) of the risks matching the
+        provided request. The matrix includes every country where the providers operate and is cached per user and
+        filters until the risks of the user change. Uses the same filters as get_filtered_risks.
+
+        :param req: The request containing filter criteria.
+        :param user_id: The user identifier owning the risks.
+
+        :return: The exposure matrix of the risks.
+        """
+        req.build_filter_values(GET_ALL_FILTER_REGISTRY)
+        req.build_archived_mode()
+
+        entry_key = None
+        if self.cache_gateway is not None:
+            cached, entry_key = self.cache_gateway.get_entry(user_id, req.build_cache_key('exposure'))
+            if cached is not None:
+                return cached
+
+        rows = self.risk_gateway.get_risk_scores(req)
+        providers = self.provider_service.find_providers_by_ids({row.provider_id for row in rows})
+
+        provider_ids, country_codes, scores, counts = build_exposure_matrix(
+            [row.provider_id for row in rows], [row.country_code for row in rows],
+            [row.impact * row.probability for row in rows],
+            {code for provider in providers.values() for code in provider.country_codes or []})
+
+        country_codes = country_codes.tolist()
+        countries = self.country_service.get_countries_by_codes(set(country_codes)) if country_codes else {}
+
+        result = build_exposure_dto(provider_ids.tolist(), providers, country_codes, countries, scores, counts)
+
+        if self.cache_gateway is not None:
+            self.cache_gateway.set_entry(entry_key, result)
+
+        return result
+
+    def get_risk_summary(self, user_id):
+        """
+        Retrieves the risk totals of a user, overall and by provider and country, from the maintained summaries.
+
+        :param user_id: The user identifier.
+
+        :return: The risk summary of the user.
+        """
+        rows = self.risk_gateway.get_risk_summary(user_id)
+
+        country_codes = {row.dimension_key for row in rows if row.dimension == SUMMARY_DIMENSION_COUNTRY}
+        countries = {}
+        if country_codes:
+            countries = self.country_service.get_countries_by_codes(country_codes)
+
+        return build_summary_dto(rows, countries)
+
+    def reconcile_risk_summaries(self):
+        """
+        Rebuilds the risk summaries from the stored risks, correcting any drift.
+
+        :return: True if the summaries were rebuilt, False if another reconciliation was running.
+        """
+        return self.risk_gateway.rebuild_risk_summaries()
 
     def create_risk(self, data, user_id):
         """
@@ -115,10 +318,151 @@ class RiskUseCase:
         country_code = data.get('countryCode')
         validate_provider_has_country(provider, country_code)
 
+        duplicates = self.suggest_duplicates(user_id, data.get('title'), data.get('description'))
+
         data['userId'] = user_id
         new_risk = self.risk_gateway.create_risk(data)
+        self.invalidate_cache(user_id)
+        if self.duplicate_service is not None:
+            self.duplicate_service.index_risks(user_id, [new_risk])
+
+        return self.with_duplicates(build_response_basic_dto(new_risk), duplicates)
+
+    def create_risks(self, data, user_id):
+        """
+        Creates a batch of risks. Every item is validated, the referenced providers are resolved with a single query
+        and the valid risks are inserted in a single statement.
+
+        :param data: The batch, with the list of risks and whether invalid items may be skipped (allowPartial).
+        :param user_id: The user identifier creating the risks.
+
+        :raises ValidationException: If the batch is invalid, or any item is invalid and allowPartial is not set.
+
+        :return: Basic information about the created risks and the errors of the skipped items.
+        """
+        validate_input(RiskBulkCreateSchema(), data)
+
+        valid_items, errors = self.validate_risk_items(enumerate(data['risks']), {})
 
-        return build_response_basic_dto(new_risk)
+        if errors and not data.get('allowPartial', False):
+            raise ValidationException("Error validating input data", errors)
+
+        created = self.risk_gateway.create_risks(valid_items, user_id) if valid_items else []
+        if created:
+            self.invalidate_cache(user_id)
+            if self.duplicate_service is not None:
+                self.duplicate_service.index_risks(user_id, created)
+
+        return {
+            'created': [build_response_basic_dto(risk) for risk in created],
+            'errors': errors
+        }
+
+    def import_risks(self, rows, user_id, chunk_size=IMPORT_CHUNK_SIZE):
+        """
+        Imports a stream of risk rows. Rows are validated in chunks as they are read and the valid ones are handed to
+        the gateway, which stages and merges them in a single transaction, so the whole import is never held in memory.
+        Invalid rows are rejected and reported by their position, starting at 1.
+
+        :param rows: An iterable of dictionaries with the fields of RiskCreateSchema.
+        :param user_id: The user identifier importing the risks.
+        :param chunk_size: Number of rows validated and staged together.
+
+        :return: The number of processed, imported and rejected rows, and the errors of the rejected rows.
+        """
+        progress = {'processed': 0, 'imported': 0, 'rejected': 0}
+        errors = []
+        providers = {}
+
+        def valid_chunks():
+            indexed_rows = enumerate(rows, start=1)
+            while True:
+                chunk = list(islice(indexed_rows, chunk_size))
+                if not chunk:
+                    return
+                valid_items, chunk_errors = self.validate_risk_items(chunk, providers, 'rows')
+                progress['processed'] += len(chunk)
+                progress['rejected'] += len(chunk) - len(valid_items)
+                errors.extend(chunk_errors[:IMPORT_MAX_ERRORS - len(errors)])
+                yield valid_items
+
+        progress['imported'] = self.risk_gateway.import_risks(valid_chunks(), user_id)
+        if progress['imported']:
+            self.invalidate_cache(user_id)
+            if self.duplicate_service is not None:
+                self.duplicate_service.invalidate_user(user_id)
+        progress['errors'] = errors
+
+        return progress
+
+    def archive_risks(self, req, user_id, archive=True, archive_all=False, max_batches=ARCHIVE_REQUEST_BATCHES):
+        """
+        Archives the active risks, or restores the archived risks, matching the provided request. Archived risks are
+        left out of every list unless requested, and out of the summaries, duplicate suggestions and cached results.
+        Uses the same filters as get_filtered_risks. Archiving every risk of the user must be requested explicitly.
+
+        :param req: The request containing filter criteria.
+        :param user_id: The user identifier owning the risks.
+        :param archive: True to archive active risks, False to restore archived risks.
+        :param archive_all: True to archive every active risk of the user when the request has no other filter.
+        :param max_batches: Maximum number of batches processed, or None to process every matching risk.
+
+        :raises ValidationException: If archiving without filters and without archive_all.
+
+        :return: The number of archived or restored risks, and whether matching risks are left to process.
+        """
+        req.build_filter_values(GET_ALL_FILTER_REGISTRY)
+        if archive and not archive_all and not (req.global_filter or '').strip() \
+                and all(item['field'] == 'user_id' for item in req.filters):
+            raise ValidationException("Error validating input data",
+                                      [{"field": "all", "errors": "Indique al menos un filtro, o all=true para "
+                                                                  "archivar todos los riesgos"}])
+
+        processed, pending = self.risk_gateway.archive_risks(req, archive, max_batches)
+        if processed:
+            self.invalidate_cache(user_id)
+            if self.duplicate_service is not None:
+                self.duplicate_service.invalidate_user(user_id)
+
+        return {'archived' if archive else 'restored': processed, 'pending': pending}
+
+    def validate_risk_items(self, indexed_items, providers, prefix='risks'):
+        """
+        Validates a batch of risk items against RiskCreateSchema and the countries of their providers. Providers not
+        yet in the given cache are resolved with a single query and added to it.
+
+        :param indexed_items: An iterable of (index, item) pairs.
+        :param providers: A dictionary of known providers keyed by ID, None for IDs that do not exist.
+        :param prefix: The name of the batch in the error fields.
+
+        :return: A tuple with the list of valid items, loaded by the schema, and the list of errors sorted by index.
+        """
+        schema = RiskCreateSchema()
+        errors = {}
+        items = []
+        for index, item in indexed_items:
+            try:
+                items.append((index, schema.load(item)))
+            except ValidationError as e:
+                errors[index] = build_bulk_errors(index, e.messages, prefix)
+
+        missing_ids = {item['providerId'] for _, item in items} - providers.keys()
+        if missing_ids:
+            found = self.provider_service.find_providers_by_ids(missing_ids)
+            providers.update({provider_id: found.get(provider_id) for provider_id in missing_ids})
+
+        valid_items = []
+        for index, item in items:
+            provider = providers.get(item['providerId'])
+            if provider is None:
+                errors[index] = build_bulk_errors(index, {'providerId': ["Proveedor no encontrado"]}, prefix)
+            elif item['countryCode'] not in provider.country_codes:
+                errors[index] = build_bulk_errors(index, {'countryCode': ["Pais no encontrado para este proveedor"]},
+                                                  prefix)
+            else:
+                valid_items.append(item)
+
+        return valid_items, [error for index in sorted(errors) for error in errors[index]]
 
     def update_risk(self, data, risk_id, user_id):
         """
@@ -142,8 +486,14 @@ class RiskUseCase:
         validate_provider_has_country(provider, country_code)
 
         updated_risk = self.risk_gateway.update_risk(risk_to_update, data)
+        self.invalidate_cache(user_id)
+        if self.duplicate_service is not None and updated_risk.archived_at is None \
+                and ('title' in data or 'description' in data):
+            self.duplicate_service.index_risks(user_id, [updated_risk])
+
+        duplicates = self.suggest_duplicates(user_id, updated_risk.title, updated_risk.description, updated_risk.id)
 
-        return build_response_basic_dto(updated_risk)
+        return self.with_duplicates(build_response_basic_dto(updated_risk), duplicates)
 
     def delete_risk(self, risk_id, user_id):
         """
@@ -157,7 +507,85 @@ class RiskUseCase:
         risk_to_delete = self.find_risk_by_id(risk_id)
         validate_risk_belongs_to_user(risk_to_delete, user_id)
 
-        return self.risk_gateway.delete_risk(risk_to_delete)
+        result = self.risk_gateway.delete_risk(risk_to_delete)
+        self.invalidate_cache(user_id)
+        if self.duplicate_service is not None:
+            self.duplicate_service.remove_risk(user_id, risk_id)
+
+        return result
+
+    def suggest_duplicates(self, user_id, title, description, exclude=None):
+        """
+        Suggests the risks of a user that may duplicate a title and description.
+
+        :param user_id: The user identifier.
+        :param title: The title of the risk.
+        :param description: The description of the risk.
+        :param exclude: Optional risk ID to leave out of the suggestions.
+
+        :return: A list of possible duplicates, or None if duplicate detection is not available.
+        """
+        if self.duplicate_service is None:
+            return None
+
+        matches = self.duplicate_service.find_similar(user_id, title, description, exclude)
+        risks = {risk.id: risk for risk in self.risk_gateway.get_risks_by_ids([risk_id for risk_id, _ in matches])}
+        return [build_duplicate_dto(risks[risk_id], similarity) for risk_id, similarity in matches
+                if risk_id in risks]
+
+    @staticmethod
+    def with_duplicates(response, duplicates):
+        """
+        Adds the suggested duplicates to the response of a risk, if duplicate detection is available.
+
+        :param response: The response DTO of the risk.
+        :param duplicates: The possible duplicates, or None.
+
+        :return: The response DTO.
+        """
+        if duplicates is not None:
+            response['duplicates'] = duplicates
+        return response
+
+    def get_risk_duplicates(self, user_id, threshold=None):
+        """
+        Finds the groups of possible duplicates among every risk of a user.
+
+        :param user_id: The user identifier.
+        :param threshold: Optional minimum similarity between two duplicates, between 0 and 1.
+
+        :raises ValidationException: If the threshold is not valid.
+        :raises BusinessException: If duplicate detection is not available.
+
+        :return: The groups of possible duplicates, from the most to the least similar.
+        """
+        try:
+            threshold = DUPLICATE_THRESHOLD if threshold is None else float(threshold)
+        except ValueError:
+            threshold = -1.0
+        if not 0 < threshold <= 1:
+            raise ValidationException("Error validating input data",
+                                      [{"field": "threshold", "errors": "Umbral inválido"}])
+
+        if self.duplicate_service is None:
+            raise BusinessException("Detección de duplicados no disponible")
+
+        groups = self.duplicate_service.find_duplicate_groups(user_id, threshold)
+        if groups is None:
+            raise BusinessException("Detección de duplicados no disponible")
+        risk_ids = [risk_id for risk_ids, _ in groups[:DUPLICATE_GROUPS_LIMIT] for risk_id in risk_ids]
+        risks = {risk.id: risk for risk in self.risk_gateway.get_risks_by_ids(risk_ids)}
+
+        return build_duplicate_groups_dto(groups, risks, DUPLICATE_GROUPS_LIMIT)
+
+    def invalidate_cache(self, user_id):
+        """
+        Invalidates the cached results computed from the risks of a user.
+
+        :param user_id: The user identifier whose risks changed.
+        """
+        if self.cache_gateway is not None:
+            self.cache_gateway.invalidate_user(user_id)
 
     def find_risk_by_id(self, risk_id):
         """
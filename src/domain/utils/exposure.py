@@ -0,0 +1,27 @@
+import numpy as np
+
+
+def build_exposure_matrix(provider_keys, country_keys, scores, extra_countries=()):
+    """
+    Aggregate risk scores into a dense provider × country matrix. Providers and countries are indexed by their sorted
+    unique keys and the scores are added to their cells with a single scatter-add.
+
+    :param provider_keys: A sequence with the provider of every risk.
+    :param country_keys: A sequence with the country of every risk.
+    :param scores: A sequence with the score of every risk.
+    :param extra_countries: Countries to include as columns even if no risk references them.
+
+    :return: A tuple with the provider keys, the country keys, the matrix of added scores and the matrix of risk
+        counts.
+    """
+    providers, provider_index = np.unique(np.asarray(provider_keys, dtype=np.int64), return_inverse=True)
+    country_keys = np.asarray(country_keys, dtype=str)
+    countries = np.union1d(country_keys, np.asarray(list(extra_countries), dtype=str))
+    country_index = np.searchsorted(countries, country_keys)
+
+    shape = (len(providers), len(countries))
+    cells = provider_index.reshape(-1) * shape[1] + country_index
+    score_matrix = np.bincount(cells, weights=np.asarray(scores, dtype=np.float64), minlength=shape[0] * shape[1])
+    count_matrix = np.bincount(cells, minlength=shape[0] * shape[1])
+
+    return providers, countries, score_matrix.reshape(shape), count_matrix.reshape(shape)
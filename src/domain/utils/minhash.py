@@ -0,0 +1,179 @@
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+# Number of hash permutations of a signature, split in MINHASH_BANDS bands of MINHASH_ROWS rows for LSH. Texts with a
+# similarity around (1 / bands) ** (1 / rows), 0.42, have an even chance of sharing a band.
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 32
+MINHASH_ROWS = 4
+
+# Length of the character shingles of a text
+MINHASH_SHINGLE_SIZE = 3
+
+# Mersenne prime of the universal hash functions, any 32-bit shingle hash times a coefficient fits in 64 bits
+MINHASH_PRIME = (1 << 31) - 1
+
+# Coefficients of the permutations, fixed so signatures are comparable across processes and restarts
+MINHASH_COEFFICIENTS = np.random.default_rng(20240101).integers(1, MINHASH_PRIME, size=(2, MINHASH_PERMUTATIONS),
+                                                                dtype=np.uint64)
+
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(text):
+    """
+    Normalize a text for comparison, removing accents, case and punctuation.
+
+    :param text: The text to normalize.
+
+    :return: The normalized text, with words separated by a single space.
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return NON_ALPHANUMERIC.sub(' ', stripped.lower()).strip()
+
+
+def build_shingles(text):
+    """
+    Build the set of character shingles of a text.
+
+    :param text: The text.
+
+    :return: A set with the shingles of the normalized text.
+    """
+    normalized = normalize_text(text)
+    if len(normalized) <= MINHASH_SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + MINHASH_SHINGLE_SIZE] for i in range(len(normalized) - MINHASH_SHINGLE_SIZE + 1)}
+
+
+def build_signature(text):
+    """
+    Build the MinHash signature of a text: for every permutation, the minimum hash of its shingles.
+
+    :param text: The text.
+
+    :return: An array of MINHASH_PERMUTATIONS unsigned 32-bit values.
+    """
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in build_shingles(text)), dtype=np.uint64)
+    multipliers, increments = MINHASH_COEFFICIENTS
+    permuted = (multipliers[:, None] * hashes[None, :] + increments[:, None]) % MINHASH_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def build_band_keys(signature):
+    """
+    Build the LSH bucket keys of a signature, one per band.
+
+    :param signature: A MinHash signature.
+
+    :return: A list of MINHASH_BANDS keys.
+    """
+    return [(band, signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS].tobytes())
+            for band in range(MINHASH_BANDS)]
+
+
+def estimate_similarities(signatures, signature):
+    """
+    Estimate the Jaccard similarity between a signature and a stack of signatures.
+
+    :param signatures: A 2-dimensional array with a signature per row.
+    :param signature: A MinHash signature.
+
+    :return: An array with the estimated similarity of every row.
+    """
+    return (signatures == signature).mean(axis=1)
+
+
+class MinHashIndex:
+    """
+    In-memory LSH index of MinHash signatures. Every signature is stored in one bucket per band, and two signatures
+    are candidates when they share a bucket, so lookups only compare against a small set of signatures.
+    """
+
+    def __init__(self, signatures=None):
+        """
+        Initialize the MinHashIndex.
+
+        :param signatures: Optional dictionary of signatures keyed by identifier.
+        """
+        self.signatures = {}
+        self.buckets = {}
+        for identifier, signature in (signatures or {}).items():
+            self.add(identifier, signature)
+
+    def add(self, identifier, signature):
+        """
+        Add or replace the signature of an identifier.
+
+        :param identifier: The identifier.
+        :param signature: The MinHash signature.
+        """
+        self.remove(identifier)
+        self.signatures[identifier] = signature
+        for key in build_band_keys(signature):
+            self.buckets.setdefault(key, set()).add(identifier)
+
+    def remove(self, identifier):
+        """
+        Remove the signature of an identifier, if present.
+
+        :param identifier: The identifier.
+        """
+        signature = self.signatures.pop(identifier, None)
+        if signature is None:
+            return
+        for key in build_band_keys(signature):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(identifier)
+                if not bucket:
+                    del self.buckets[key]
+
+    def query(self, signature, threshold, exclude=None):
+        """
+        Find the identifiers whose signature is similar to a signature.
+
+        :param signature: The MinHash signature to look up.
+        :param threshold: The minimum estimated similarity.
+        :param exclude: Optional identifier to leave out of the results.
+
+        :return: A list of tuples with identifier and similarity, from the most to the least similar.
+        """
+        candidates = set()
+        for key in build_band_keys(signature):
+            candidates |= self.buckets.get(key, set())
+        candidates.discard(exclude)
+        if not candidates:
+            return []
+
+        candidates = sorted(candidates)
+        similarities = estimate_similarities(np.stack([self.signatures[candidate] for candidate in candidates]),
+                                             signature)
+        matches = [(candidate, float(similarity)) for candidate, similarity in zip(candidates, similarities)
+                   if similarity >= threshold]
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def find_pairs(self, threshold):
+        """
+        Find every pair of similar signatures, comparing only the pairs that share a bucket.
+
+        :param threshold: The minimum estimated similarity.
+
+        :return: A dictionary of similarities keyed by pairs of identifiers, the smallest identifier first.
+        """
+        pairs = {}
+        for members in self.buckets.values():
+            if len(members) < 2:
+                continue
+            members = sorted(members)
+            signatures = np.stack([self.signatures[member] for member in members])
+            for position, member in enumerate(members[:-1]):
+                similarities = estimate_similarities(signatures[position + 1:], signatures[position])
+                for other, similarity in zip(members[position + 1:], similarities):
+                    if similarity >= threshold:
+                        pairs[(member, other)] = float(similarity)
+        return pairs
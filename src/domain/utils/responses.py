@@ -1,12 +1,14 @@
-def response_paginated(total, page, per_page, pages, results):
+def response_paginated(total, page, per_page, pages, results, has_next=None, count_mode='exact'):
     """
     Create a paginated response dictionary.
 
-    :param total: Total number of records.
+    :param total: Total number of records, or None if it was not computed.
     :param page: Current page number.
     :param per_page: Number of records per page.
-    :param pages: Total number of pages.
+    :param pages: Total number of pages, or None if it was not computed.
     :param results: List of results to be included in the response.
+    :param has_next: True if there are records after this page.
+    :param count_mode: Strategy used to compute the total ('exact', 'estimated' or 'none').
 
     :return: A dictionary containing paginated response information.
     """
@@ -15,5 +17,26 @@ def response_paginated(total, page, per_page, pages, results):
         'pageNumber': page,
         'pageSize': per_page,
         'totalPages': pages,
+        'hasNext': has_next,
+        'countMode': count_mode,
+        'content': results
+    }
+
+
+def response_cursor_paginated(per_page, next_cursor, prev_cursor, results):
+    """
+    Create a cursor-paginated response dictionary.
+
+    :param per_page: Number of records per page.
+    :param next_cursor: Cursor of the following page, or None if this is the last page.
+    :param prev_cursor: Cursor of the preceding page, or None if this is the first page.
+    :param results: List of results to be included in the response.
+
+    :return: A dictionary containing cursor-paginated response information.
+    """
+    return {
+        'pageSize': per_page,
+        'nextCursor': next_cursor,
+        'prevCursor': prev_cursor,
         'content': results
     }
@@ -0,0 +1,106 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Trials × risks simulated together in every block, bounds the memory of a block to a few tens of megabytes
+SIMULATION_BLOCK_CELLS = 2000000
+
+
+def build_groups(keys):
+    """
+    Index the risks by group.
+
+    :param keys: A sequence with the group key of every risk.
+
+    :return: A tuple with the sorted unique keys and the position of the group of every risk in them.
+    """
+    unique_keys, index = np.unique(np.asarray(keys), return_inverse=True)
+    return unique_keys, index.reshape(-1)
+
+
+def build_group_matrix(index, size):
+    """
+    Build the matrix that adds the losses of the risks by group.
+
+    :param index: The position of the group of every risk.
+    :param size: The number of groups.
+
+    :return: A risks × groups matrix with a 1 in the group of every risk.
+    """
+    matrix = np.zeros((len(index), size), dtype=np.float32)
+    matrix[np.arange(len(index)), index] = 1
+    return matrix
+
+
+def simulate_block(task):
+    """
+    Simulate a block of trials. In every trial each risk materializes with its probability, and when it does its loss
+    is drawn from a lognormal distribution with its median loss.
+
+    :param task: A tuple with the probability and median loss of every risk, the lognormal shape, the group matrices,
+        the number of trials and the seed of the block.
+
+    :return: A tuple with the total loss of every trial and the loss of every trial by group, for every grouping.
+    """
+    probabilities, medians, sigma, group_matrices, trials, seed = task
+    rng = np.random.default_rng(seed)
+
+    occurred = rng.random((trials, len(probabilities)), dtype=np.float32) < probabilities
+    losses = np.zeros(occurred.shape, dtype=np.float32)
+    trial_index, risk_index = np.nonzero(occurred)
+    losses[trial_index, risk_index] = medians[risk_index]
+    if sigma > 0:
+        losses[trial_index, risk_index] *= np.exp(sigma * rng.standard_normal(len(risk_index), dtype=np.float32))
+
+    return losses.sum(axis=1, dtype=np.float64), [losses @ matrix for matrix in group_matrices]
+
+
+def run_simulation(probabilities, medians, sigma, group_indexes, trials, seed=None, workers=1):
+    """
+    Run a Monte Carlo simulation of the losses of a set of risks. Trials are vectorized over every risk and split
+    in blocks of fixed size, each with its own random stream, so the result for a seed does not depend on the number
+    of workers.
+
+    :param probabilities: Array with the probability of every risk materializing in a trial.
+    :param medians: Array with the median loss of every risk.
+    :param sigma: Shape of the lognormal loss distribution, 0 makes every loss equal to its median.
+    :param group_indexes: A list of tuples with the number of groups and the group position of every risk, for every
+        grouping of the losses.
+    :param trials: The number of trials.
+    :param seed: Optional seed of the simulation.
+    :param workers: Number of processes the blocks are spread across.
+
+    :return: A tuple with the total loss of every trial and, for every grouping, a trials × groups array of losses.
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float32)
+    medians = np.asarray(medians, dtype=np.float32)
+    group_matrices = [build_group_matrix(index, size) for size, index in group_indexes]
+
+    block_trials = max(1, SIMULATION_BLOCK_CELLS // max(1, len(probabilities)))
+    sizes = [min(block_trials, trials - start) for start in range(0, trials, block_trials)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(probabilities, medians, sigma, group_matrices, size, block_seed)
+             for size, block_seed in zip(sizes, seeds)]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(simulate_block, tasks))
+    else:
+        results = [simulate_block(task) for task in tasks]
+
+    totals = np.concatenate([result[0] for result in results])
+    group_losses = [np.concatenate([result[1][position] for result in results])
+                    for position in range(len(group_matrices))]
+    return totals, group_losses
+
+
+def summarize_losses(losses, percentiles):
+    """
+    Summarize simulated losses.
+
+    :param losses: An array of losses by trial, or a trials × groups array.
+    :param percentiles: The percentiles to compute, between 0 and 100.
+
+    :return: A tuple with the mean loss and the array of percentiles, by group when the losses are grouped.
+    """
+    return losses.mean(axis=0), np.percentile(losses, percentiles, axis=0)
@@ -18,3 +18,17 @@ def validate_input(schema, data):
         transformed_errors = [{"field": field, "errors": error_message} for field, errors in errors.items()
                               for error_message in errors]
         raise ValidationException("Error validating input data", transformed_errors)
+
+
+def build_bulk_errors(index, errors, prefix):
+    """
+    Build the errors of an item of a batch.
+
+    :param index: The position of the item in the batch.
+    :param errors: A dictionary of error messages keyed by field.
+    :param prefix: The name of the batch.
+
+    :return: A list of errors with the field prefixed by the batch name and the item position.
+    """
+    return [{'field': f'{prefix}[{index}].{field}', 'errors': message}
+            for field, messages in errors.items() for message in messages]
@@ -13,6 +13,7 @@ class CountryClient(ICountryClient):
         Initialize the CountryClient with the API URL for fetching country data.
         """
         self.api_url = 'https://restcountries.com/v3.1/all'
+        self.timeout = 10
 
     def fetch_data_from_api(self):
         """
@@ -20,7 +21,11 @@ class CountryClient(ICountryClient):
 
         :return: A dictionary containing country data if the request is successful, or None if there's an error.
         """
-        response = requests.get(self.api_url)
+        try:
+            response = requests.get(self.api_url, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(e)  # Log the connection error, the caller falls back to other data.
+            return None
 
         if response.status_code == 200:
             data = response.json()
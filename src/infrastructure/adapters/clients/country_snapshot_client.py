@@ -0,0 +1,121 @@
+import json
+import os
+from datetime import date
+
+from src.domain.gateways.country_client import ICountryClient
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'application', 'static',
+                             'countries_snapshot.json')
+
+SNAPSHOT_FIELDS = ['cca2', 'ccn3', 'flag', 'name', 'spa']
+
+
+def to_snapshot_row(country):
+    """
+    Reduce a raw country, as returned by the country API, to the snapshot row with the fields used by
+    build_country_dto.
+
+    :param country: A dictionary containing raw country data.
+
+    :return: A list with the values of SNAPSHOT_FIELDS.
+    """
+    common_name = country.get('name', {}).get('common', None)
+    return [
+        country.get('cca2', None),
+        country.get('ccn3', None),
+        country.get('flag', None),
+        common_name,
+        country.get('translations', {}).get('spa', {}).get('common', common_name)
+    ]
+
+
+def from_snapshot_row(row):
+    """
+    Rebuild a raw country, with only the fields used by build_country_dto, from a snapshot row.
+
+    :param row: A list with the values of SNAPSHOT_FIELDS.
+
+    :return: A dictionary containing raw country data.
+    """
+    code, country_id, flag, common_name, common_sp_name = row
+    return {
+        'cca2': code,
+        'ccn3': country_id,
+        'flag': flag,
+        'name': {'common': common_name},
+        'translations': {'spa': {'common': common_sp_name}}
+    }
+
+
+def write_snapshot(country_data, path=SNAPSHOT_PATH, version=None):
+    """
+    Write a compact snapshot of the given raw country data.
+
+    :param country_data: List of raw country data, as returned by the country API.
+    :param path: The file to write.
+    :param version: The snapshot version, defaults to the current date.
+    """
+    rows = sorted((to_snapshot_row(country) for country in country_data), key=lambda row: row[0] or '')
+    snapshot = {
+        'version': version or date.today().isoformat(),
+        'fields': SNAPSHOT_FIELDS,
+        'countries': rows
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(snapshot, file, ensure_ascii=False, separators=(',', ':'))
+        file.write('\n')
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """
+    Read a snapshot file.
+
+    :param path: The file to read.
+
+    :return: The decoded snapshot.
+    """
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+class CountrySnapshotClient(ICountryClient):
+    """
+    Implementation of the ICountryClient interface that serves country data from the snapshot bundled with the service.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        """
+        Initialize the CountrySnapshotClient. The snapshot is loaded on first use and kept in memory.
+
+        :param path: The snapshot file.
+        """
+        self.path = path
+        self.version = None
+        self.data = None
+
+    def fetch_data_from_api(self):
+        """
+        Fetch country data from the bundled snapshot.
+
+        :return: A list containing country data if the snapshot can be read, or None if there's an error.
+        """
+        if self.data is None:
+            try:
+                snapshot = read_snapshot(self.path)
+            except (OSError, ValueError) as e:
+                print(e)  # Log the snapshot error.
+                return None
+            self.version = snapshot['version']
+            self.data = [from_snapshot_row(row) for row in snapshot['countries']]
+        return self.data
+
+
+if __name__ == '__main__':
+    from src.infrastructure.adapters.clients.country_client import CountryClient
+
+    data = CountryClient().fetch_data_from_api()
+    if data:
+        write_snapshot(data)
+        print(f'Snapshot written with {len(data)} countries')
+    else:
+        print('Country API unreachable, snapshot not written')
@@ -0,0 +1,214 @@
+import threading
+import time
+
+from src.domain.gateways.country_gateway import ICountryGateway, COUNTRY_DATA_FRESH
+
+COUNTRY_DATA_FLAG = "exist_country_data"
+
+
+class CountryCacheRepository(ICountryGateway):
+    """
+    Implementation of the ICountryGateway interface that keeps an in-process copy of the country table in front of
+    another country gateway (usually the Redis repository).
+
+    The local table is served without touching the delegate until its TTL expires. After that, the delegate is asked
+    for the data flag and version: if both are unchanged the table is kept for another TTL, otherwise it is reloaded.
+    """
+
+    def __init__(self, delegate: ICountryGateway, ttl=60):
+        """
+        Initialize the CountryCacheRepository.
+
+        :param delegate: The country gateway that holds the shared country data.
+        :param ttl: Seconds the local table is served before it is revalidated against the delegate.
+        """
+        self.delegate = delegate
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.countries = None
+        self.version = None
+        self.expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def set_flag(self, flag_key, ttl=86400):
+        """
+        Set a flag in the delegate gateway and invalidate the local table.
+
+        :param flag_key: The key to set as a flag.
+        :param ttl: Optional time-to-live in seconds (default is 86400 seconds, or 24 hours).
+        """
+        self.delegate.set_flag(flag_key, ttl)
+        self.invalidate()
+
+    def check_flag(self, flag_key):
+        """
+        Check if a flag exists. The country data flag is answered locally while the local table is valid.
+
+        :param flag_key: The key to check as a flag.
+
+        :return: True if the flag exists, False otherwise.
+        """
+        if flag_key == COUNTRY_DATA_FLAG:
+            return self.get_table() is not None
+        return self.delegate.check_flag(flag_key)
+
+    def get_ttl(self, key):
+        """
+        Get the remaining time-to-live of a key from the delegate gateway.
+
+        :param key: The key to inspect.
+
+        :return: The remaining seconds, -1 if the key has no expiration, or -2 if the key does not exist.
+        """
+        return self.delegate.get_ttl(key)
+
+    def acquire_lock(self, lock_key, ttl):
+        """
+        Try to acquire a lock through the delegate gateway.
+
+        :param lock_key: The key of the lock.
+        :param ttl: Time-to-live of the lock in seconds.
+
+        :return: A token identifying the owner if the lock was acquired, None otherwise.
+        """
+        return self.delegate.acquire_lock(lock_key, ttl)
+
+    def release_lock(self, lock_key, token):
+        """
+        Release a lock through the delegate gateway.
+
+        :param lock_key: The key of the lock.
+        :param token: The token returned by acquire_lock.
+        """
+        self.delegate.release_lock(lock_key, token)
+
+    def set_countries_data(self, country_data_list, flag_key=None, ttl=86400):
+        """
+        Store country data in the delegate gateway and invalidate the local table if anything changed.
+
+        :param country_data_list: A list of country data objects to store.
+        :param flag_key: Optional flag to set in the same operation.
+        :param ttl: Time-to-live in seconds of the flag (default is 86400 seconds, or 24 hours).
+
+        :return: The number of countries added, changed or removed.
+        """
+        changed = self.delegate.set_countries_data(country_data_list, flag_key, ttl)
+        if changed:
+            self.invalidate()
+        return changed
+
+    def get_all_countries_data(self):
+        """
+        Get all country data from the local table, loading it from the delegate if needed.
+
+        :return: A dictionary of country data where the keys are country codes and values are country data objects.
+        """
+        table = self.get_table()
+        if table is None:
+            return self.delegate.get_all_countries_data()
+        return dict(table)
+
+    def get_countries_data_by_codes(self, country_codes):
+        """
+        Get country data for specified country codes from the local table, loading it from the delegate if needed.
+
+        :param country_codes: A list of country codes to retrieve data for.
+
+        :return: A dictionary of country data where the keys are country codes and values are country data objects.
+        """
+        table = self.get_table()
+        if table is None:
+            return self.delegate.get_countries_data_by_codes(country_codes)
+        return {code: table[code] for code in country_codes if code in table}
+
+    def get_countries_data_with_status(self, flag_key, country_codes=None):
+        """
+        Get country data and its freshness. The country data flag is answered from the local table while it is valid.
+
+        :param flag_key: The flag whose existence marks the data as fresh.
+        :param country_codes: A list of country codes to retrieve data for, or None for all countries.
+
+        :return: A tuple with the dictionary of country data and its status.
+        """
+        if flag_key == COUNTRY_DATA_FLAG:
+            table = self.get_table()
+            if table is not None:
+                if country_codes is None:
+                    return dict(table), COUNTRY_DATA_FRESH
+                return {code: table[code] for code in country_codes if code in table}, COUNTRY_DATA_FRESH
+        return self.delegate.get_countries_data_with_status(flag_key, country_codes)
+
+    def get_version(self):
+        """
+        Get the version of the country data held by the delegate gateway.
+
+        :return: The current version as a string, or None if no version has been stored.
+        """
+        return self.delegate.get_version()
+
+    def delete(self, key):
+        """
+        Delete a key from the delegate gateway and invalidate the local table.
+
+        :param key: The key to delete.
+        """
+        self.delegate.delete(key)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop the local table so the next read reloads it from the delegate.
+        """
+        with self.lock:
+            self.countries = None
+            self.version = None
+            self.expires_at = 0.0
+
+    def get_table(self):
+        """
+        Get the local country table, revalidating or reloading it from the delegate once its TTL has expired.
+
+        :return: A dictionary of country data, or None if the delegate has no valid country data.
+        """
+        countries = self.countries
+        if countries is not None and time.monotonic() < self.expires_at:
+            self.hits += 1
+            return countries
+
+        with self.lock:
+            if self.countries is not None and time.monotonic() < self.expires_at:
+                self.hits += 1
+                return self.countries
+
+            self.misses += 1
+
+            if not self.delegate.check_flag(COUNTRY_DATA_FLAG):
+                self.countries = None
+                self.version = None
+                self.expires_at = 0.0
+                return None
+
+            version = self.delegate.get_version()
+            if self.countries is None or version is None or version != self.version:
+                self.countries = self.delegate.get_all_countries_data()
+                self.version = version
+                self.reloads += 1
+
+            self.expires_at = time.monotonic() + self.ttl
+            return self.countries
+
+    def get_stats(self):
+        """
+        Get the counters of the local table.
+
+        :return: A dictionary with hits, misses, reloads, number of cached countries and the cached version.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'size': len(self.countries) if self.countries is not None else 0,
+            'version': self.version
+        }
@@ -1,8 +1,67 @@
+import hashlib
+import uuid
+
 from flask import json
 
 from src.domain.gateways.country_gateway import ICountryGateway
 from src.infrastructure.adapters.databases import redis_db
 
+COUNTRIES_KEY = "countries"
+COUNTRIES_DIGEST_KEY = "countries_digest"
+COUNTRIES_VERSION_KEY = "countries_version"
+
+# KEYS: countries hash, flag key
+# ARGV: country codes, none for the whole hash
+READ_COUNTRIES_SCRIPT = """
+local status = 'missing'
+if redis.call('exists', KEYS[2]) == 1 then
+    status = 'fresh'
+elseif redis.call('exists', KEYS[1]) == 1 then
+    status = 'stale'
+end
+if #ARGV == 0 then
+    return {status, redis.call('hgetall', KEYS[1])}
+end
+return {status, redis.call('hmget', KEYS[1], unpack(ARGV))}
+"""
+
+# KEYS: countries hash, digest hash, version key, flag key (may be empty)
+# ARGV: flag ttl, then code, digest and payload for every country
+SYNC_COUNTRIES_SCRIPT = """
+local incoming = {}
+local changed = 0
+for i = 2, #ARGV, 3 do
+    local code = ARGV[i]
+    incoming[code] = true
+    if redis.call('hget', KEYS[2], code) ~= ARGV[i + 1] or redis.call('hexists', KEYS[1], code) == 0 then
+        redis.call('hset', KEYS[1], code, ARGV[i + 2])
+        redis.call('hset', KEYS[2], code, ARGV[i + 1])
+        changed = changed + 1
+    end
+end
+for _, code in ipairs(redis.call('hkeys', KEYS[1])) do
+    if not incoming[code] then
+        redis.call('hdel', KEYS[1], code)
+        redis.call('hdel', KEYS[2], code)
+        changed = changed + 1
+    end
+end
+if changed > 0 then
+    redis.call('incr', KEYS[3])
+end
+if KEYS[4] ~= '' then
+    redis.call('set', KEYS[4], 1, 'EX', ARGV[1])
+end
+return changed
+"""
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 
 class CountryRepository(ICountryGateway):
     """
@@ -14,6 +73,9 @@ class CountryRepository(ICountryGateway):
         Initialize the CountryRepository with a connection to the Redis database.
         """
         self.redis = redis_db
+        self.release_lock_script = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        self.sync_countries_script = self.redis.register_script(SYNC_COUNTRIES_SCRIPT)
+        self.read_countries_script = self.redis.register_script(READ_COUNTRIES_SCRIPT)
 
     def set_flag(self, flag_key, ttl=86400):
         """
@@ -34,16 +96,62 @@ class CountryRepository(ICountryGateway):
         """
         return self.redis.exists(flag_key)
 
-    def set_countries_data(self, country_data_list):
+    def get_ttl(self, key):
+        """
+        Get the remaining time-to-live of a key in Redis.
+
+        :param key: The key to inspect in Redis.
+
+        :return: The remaining seconds, -1 if the key has no expiration, or -2 if the key does not exist.
         """
-        Set country data in Redis as a hash.
+        return self.redis.ttl(key)
+
+    def acquire_lock(self, lock_key, ttl):
+        """
+        Try to acquire a lock in Redis with SET NX and an expiration.
+
+        :param lock_key: The key of the lock in Redis.
+        :param ttl: Time-to-live of the lock in seconds.
+
+        :return: A token identifying the owner if the lock was acquired, None otherwise.
+        """
+        token = uuid.uuid4().hex
+        if self.redis.set(lock_key, token, nx=True, ex=ttl):
+            return token
+        return None
+
+    def release_lock(self, lock_key, token):
+        """
+        Release a lock in Redis only if it is still owned by the given token.
+
+        :param lock_key: The key of the lock in Redis.
+        :param token: The token returned by acquire_lock.
+        """
+        self.release_lock_script(keys=[lock_key], args=[token])
+
+    def set_countries_data(self, country_data_list, flag_key=None, ttl=86400):
+        """
+        Synchronize country data in Redis with the given list. A content digest is kept per country, so only the
+        countries that changed are written and the ones that disappeared are removed. Everything, including the version
+        bump and the optional flag, runs in a single atomic script, so readers never see a partial or empty hash.
 
         :param country_data_list: A list of country data objects to store in Redis.
+        :param flag_key: Optional flag to set in the same operation.
+        :param ttl: Time-to-live in seconds of the flag (default is 86400 seconds, or 24 hours).
+
+        :return: The number of countries added, changed or removed.
         """
-        data = {}
+        args = [ttl]
         for country in country_data_list:
-            data[country.country_code] = json.dumps(country.to_dict())
-        self.redis.hmset("countries", data)
+            payload = json.dumps(country.to_dict())
+            digest = hashlib.sha1(payload.encode()).hexdigest()
+            args.extend([country.country_code, digest, payload])
+
+        if len(args) == 1:
+            return 0
+
+        keys = [COUNTRIES_KEY, COUNTRIES_DIGEST_KEY, COUNTRIES_VERSION_KEY, flag_key or '']
+        return self.sync_countries_script(keys=keys, args=args)
 
     def get_all_countries_data(self):
         """
@@ -51,7 +159,7 @@ class CountryRepository(ICountryGateway):
 
         :return: A dictionary of country data where the keys are country codes and values are country data objects.
         """
-        country_data = self.redis.hgetall("countries")
+        country_data = self.redis.hgetall(COUNTRIES_KEY)
         result = {}
         for code, data in country_data.items():
             result[code.decode()] = json.loads(data)
@@ -65,13 +173,45 @@ class CountryRepository(ICountryGateway):
 
         :return: A dictionary of country data where the keys are country codes and values are country data objects.
         """
-        country_data = self.redis.hmget("countries", country_codes)
+        country_data = self.redis.hmget(COUNTRIES_KEY, country_codes)
         result = {}
         for code, data in zip(country_codes, country_data):
             if data:
                 result[code] = json.loads(data)
         return result
 
+    def get_countries_data_with_status(self, flag_key, country_codes=None):
+        """
+        Get country data and its freshness from Redis in a single round trip.
+
+        :param flag_key: The flag whose existence marks the data as fresh.
+        :param country_codes: A list of country codes to retrieve data for, or None for all countries.
+
+        :return: A tuple with the dictionary of country data and its status ('fresh', 'stale' or 'missing').
+        """
+        country_codes = list(country_codes) if country_codes is not None else []
+        status, country_data = self.read_countries_script(keys=[COUNTRIES_KEY, flag_key], args=country_codes)
+
+        if country_codes:
+            pairs = zip(country_codes, country_data)
+        else:
+            pairs = ((code.decode(), data) for code, data in zip(country_data[::2], country_data[1::2]))
+
+        result = {}
+        for code, data in pairs:
+            if data:
+                result[code] = json.loads(data)
+        return result, status.decode()
+
+    def get_version(self):
+        """
+        Get the version of the country data stored in Redis.
+
+        :return: The current version as a string, or None if no version has been stored.
+        """
+        version = self.redis.get(COUNTRIES_VERSION_KEY)
+        return version.decode() if version is not None else None
+
     def delete(self, key):
         """
         Delete a key from Redis.
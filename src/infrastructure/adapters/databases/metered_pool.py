@@ -0,0 +1,74 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool that counts the checkouts of the process and measures the time spent waiting for a connection, including
+    the time to open a new one, so the pool size can be tuned from the observed wait.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the MeteredQueuePool with the arguments of QueuePool.
+        """
+        super().__init__(*args, **kwargs)
+        self.metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        """
+        Get a connection from the pool, recording how long it took and whether the pool timed out.
+
+        :return: The pooled connection record.
+        """
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.record_wait(time.perf_counter() - start)
+        return record
+
+    def record_wait(self, seconds, timed_out=False):
+        """
+        Record a wait for a connection.
+
+        :param seconds: The time waited.
+        :param timed_out: True if no connection was available within the pool timeout.
+        """
+        with self.metrics_lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def get_stats(self):
+        """
+        Get the state and counters of the pool.
+
+        :return: A dictionary with the pool size, the connections checked in and out, the overflow in use, and the
+            number of checkouts and timeouts with the total, average and maximum wait in milliseconds.
+        """
+        with self.metrics_lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                'size': self.size(),
+                'checkedIn': self.checkedin(),
+                'checkedOut': self.checkedout(),
+                'overflow': max(self.overflow(), 0),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'waitTotalMs': round(self.wait_total * 1000, 3),
+                'waitAvgMs': round(self.wait_total * 1000 / waits, 3) if waits else 0.0,
+                'waitMaxMs': round(self.wait_max * 1000, 3)
+            }
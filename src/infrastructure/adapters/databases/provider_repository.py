@@ -1,8 +1,15 @@
-from sqlalchemy import and_
+from psycopg2.errors import UniqueViolation
+from sqlalchemy import and_, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 
 from src.application.app import db
-from src.domain.gateways.provider_gateway import IProviderGateway
+from src.domain.exceptions.exceptions import BusinessException
+from src.domain.gateways.provider_gateway import IProviderGateway, PROVIDER_NAME_EXISTS
+from src.infrastructure.decorators.replica_read import replica_read
 from src.infrastructure.entities.provider import Provider
+from src.infrastructure.utils.keyset_pagination import paginate_keyset
+from src.infrastructure.utils.offset_pagination import paginate_offset
 from src.infrastructure.utils.query_filters import filter_entities
 
 
@@ -50,15 +57,20 @@ class ProviderRepository(IProviderGateway):
     Implementation of the IProviderGateway interface using SQLAlchemy to manage provider data.
     """
 
-    def __init__(self):
+    def __init__(self, replica_router=None):
         """
         Initialize the ProviderRepository with a connection to the database.
+
+        :param replica_router: Optional router that sends the list and lookup reads to the read replicas.
         """
         self.db = db
+        self.replica_router = replica_router
 
+    @replica_read
     def get_providers_by_filter(self, req):
         """
-        Get a paginated list of providers based on filtering criteria.
+        Get a paginated list of providers based on filtering criteria. Uses keyset pagination when the request is in
+        cursor mode, otherwise offset pagination with the requested count mode.
 
         :param req: A request object containing filtering criteria.
 
@@ -67,12 +79,17 @@ class ProviderRepository(IProviderGateway):
         query = self.db.session.query(Provider)
 
         query = apply_conditions(query, req.filters)
+
+        if req.cursor_mode:
+            return paginate_keyset(query, Provider, req.order_by, req.order_type, req.cursor, req.per_page)
+
         query = apply_sorting(query, req.order_by, req.order_type)
 
-        providers = query.paginate(page=req.page, per_page=req.per_page, error_out=False)
+        providers = paginate_offset(query, req.page, req.per_page, req.count_mode)
 
         return providers
 
+    @replica_read
     def get_provider_by_id(self, provider_id):
         """
         Get a provider by their unique identifier.
@@ -83,24 +100,75 @@ class ProviderRepository(IProviderGateway):
         """
         return Provider.query.get(provider_id)
 
+    def get_provider_by_name(self, name):
+        """
+        Get a provider by its unique name.
+
+        :param name: The name of the provider.
+
+        :return: Provider object or None if the provider is not found.
+        """
+        return self.db.session.query(Provider).filter(Provider.name == name).first()
+
+    def get_providers_by_ids(self, provider_ids):
+        """
+        Get the providers with the given unique identifiers in a single query.
+
+        :param provider_ids: The unique identifiers of the providers.
+
+        :return: A list of the providers found.
+        """
+        if not provider_ids:
+            return []
+        return self.db.session.query(Provider).filter(Provider.id.in_(provider_ids)).all()
+
     def create_provider(self, data):
         """
-        Create a new provider with the provided data.
+        Create a new provider with the provided data. Country codes are stored sorted, as the bulk upsert stores them.
 
         :param data: A dictionary of provider data.
 
         :return: The created provider.
+        :raise: BusinessException if the name is already taken by another provider.
         """
         new_provider = Provider(
             name=data['name'],
-            country_codes=set(data['countryCodes'])
+            country_codes=sorted(set(data['countryCodes']))
         )
 
         self.db.session.add(new_provider)
-        self.db.session.commit()
+        self.commit_provider()
 
         return new_provider
 
+    def upsert_providers(self, providers):
+        """
+        Create or update providers matched by name with a single INSERT ... ON CONFLICT. Providers whose country codes
+        did not change are not written; the system column xmax tells inserted rows from updated ones.
+
+        :param providers: A list of dictionaries of provider data with unique names.
+
+        :return: A dictionary with the number of created, updated and unchanged providers.
+        """
+        statement = insert(Provider).values([
+            {'name': provider['name'], 'country_codes': provider['countryCodes']} for provider in providers
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Provider.name],
+            set_={'country_codes': statement.excluded.country_codes},
+            where=Provider.country_codes.is_distinct_from(statement.excluded.country_codes)
+        ).returning(literal_column('xmax = 0').label('inserted'))
+
+        rows = self.db.session.execute(statement).all()
+        self.db.session.commit()
+
+        created = sum(1 for row in rows if row.inserted)
+        return {
+            'created': created,
+            'updated': len(rows) - created,
+            'unchanged': len(providers) - len(rows)
+        }
+
     def update_provider(self, provider, data):
         """
         Update an existing provider with the provided data.
@@ -109,14 +177,30 @@ class ProviderRepository(IProviderGateway):
         :param data: A dictionary of provider data to update.
 
         :return: The updated provider.
+        :raise: BusinessException if the name is already taken by another provider.
         """
         provider.name = data.get('name', provider.name)
-        provider.country_codes = set(data.get('countryCodes', provider.country_codes))
+        provider.country_codes = sorted(set(data.get('countryCodes', provider.country_codes)))
 
-        self.db.session.commit()
+        self.commit_provider()
 
         return provider
 
+    def commit_provider(self):
+        """
+        Commit the creation or update of a provider, turning a violation of the unique provider name into a business
+        error.
+
+        :raise: BusinessException if the name is already taken by another provider.
+        """
+        try:
+            self.db.session.commit()
+        except IntegrityError as e:
+            self.db.session.rollback()
+            if isinstance(e.orig, UniqueViolation):
+                raise BusinessException(PROVIDER_NAME_EXISTS)
+            raise
+
     def delete_provider(self, provider):
         """
         Delete a provider.
@@ -0,0 +1,201 @@
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.infrastructure.adapters.databases import redis_db
+
+REPLICA_STICKY_KEY = "replica_sticky"
+
+# HTTP methods that never change data, the only ones whose reads may be served by a replica
+READ_METHODS = ('GET', 'HEAD')
+
+# Current WAL position of the primary
+PRIMARY_LSN = text("SELECT pg_current_wal_lsn()::text")
+
+# Seconds a replica is behind the primary: 0 when it has replayed the WAL the primary had written when it was checked,
+# otherwise the age of the last replayed transaction, and NULL if the server is not replaying WAL
+REPLICA_LAG = text(
+    "SELECT CASE WHEN pg_wal_lsn_diff(CAST(:primary_lsn AS pg_lsn), pg_last_wal_replay_lsn()) <= 0 THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+# Sets the statement timeout of the transaction of a health check
+HEALTH_CHECK_TIMEOUT = text("SELECT set_config('statement_timeout', :timeout, true)")
+
+# Health check intervals after which the last result of a replica is no longer trusted
+HEALTH_STALE_INTERVALS = 3
+
+
+def get_request_user_id():
+    """
+    Get the user of the current request from its JWT.
+
+    :return: The user identifier, or None if the request has no verified JWT.
+    """
+    try:
+        return (get_jwt().get('user') or {}).get('userId')
+    except RuntimeError:
+        return None
+
+
+class ReplicaRouter:
+    """
+    Chooses the read replica that serves the reads of a GET request, in round-robin among the healthy replicas.
+
+    A replica is healthy when it answers and its replication lag is under max_lag. The lag is measured against the WAL
+    position of the primary, so a replica that stopped receiving WAL falls behind even if it replayed everything it
+    received. The replicas are checked every health_interval seconds by a daemon thread of each process, off the
+    request path; until the first check, or if the checks stop, the reads stay on the primary. After a user changes
+    data, the reads of that user stay on the primary for sticky_seconds, so a mutation is always visible to the next
+    requests of its author. The window is kept in Redis, shared by every process; Redis errors are logged and keep the
+    reads on the primary.
+    """
+
+    def __init__(self, db, bind_keys, health_interval=10, max_lag=30, sticky_seconds=5):
+        """
+        Initialize the ReplicaRouter.
+
+        :param db: The Flask-SQLAlchemy extension holding the engines.
+        :param bind_keys: The bind keys of the replica engines.
+        :param health_interval: Seconds the result of a health check is kept.
+        :param max_lag: Maximum replication lag in seconds of a healthy replica.
+        :param sticky_seconds: Seconds the reads of a user stay on the primary after a mutation.
+        """
+        self.db = db
+        self.bind_keys = list(bind_keys)
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.redis = redis_db
+        self.lock = threading.Lock()
+        self.position = 0
+        self.health = {}
+        self.checker = None
+
+    def choose_engine(self, session):
+        """
+        Choose the replica engine that serves a read, if the read may leave the primary.
+
+        :param session: The session that runs the read, which must have no pending changes.
+
+        :return: The engine of a healthy replica, or None to read from the primary.
+        """
+        if not self.bind_keys or not has_request_context() or request.method not in READ_METHODS:
+            return None
+        if session.new or session.dirty or session.deleted or self.is_sticky():
+            return None
+
+        self.start_health_checks()
+        with self.lock:
+            start = self.position
+            self.position = (self.position + 1) % len(self.bind_keys)
+
+        for offset in range(len(self.bind_keys)):
+            bind_key = self.bind_keys[(start + offset) % len(self.bind_keys)]
+            if self.is_healthy(bind_key):
+                return self.db.engines[bind_key]
+        return None
+
+    def is_healthy(self, bind_key):
+        """
+        Check if a replica passed its last health check, and that check is recent.
+
+        :param bind_key: The bind key of the replica.
+
+        :return: True if the replica answered the last check and its lag was under max_lag.
+        """
+        healthy, checked_at = self.health.get(bind_key, (False, None))
+        return healthy and time.monotonic() - checked_at < HEALTH_STALE_INTERVALS * self.health_interval
+
+    def start_health_checks(self):
+        """
+        Start the thread that checks the replicas, once per process, or again if it stopped.
+        """
+        with self.lock:
+            if self.checker is not None and self.checker.is_alive():
+                return
+            replicas = {bind_key: self.db.engines[bind_key] for bind_key in self.bind_keys}
+            self.checker = threading.Thread(target=self.run_health_checks, args=(self.db.engine, replicas),
+                                            daemon=True)
+            self.checker.start()
+
+    def run_health_checks(self, primary, replicas):
+        """
+        Check the replicas every health_interval seconds. Runs forever.
+
+        :param primary: The engine of the primary.
+        :param replicas: The engines of the replicas, by bind key.
+        """
+        while True:
+            self.check_health(primary, replicas)
+            time.sleep(self.health_interval)
+
+    def check_health(self, primary, replicas):
+        """
+        Check the replication lag of every replica against the current WAL position of the primary. Every query is
+        limited to health_interval seconds; errors are logged and mark the replicas unhealthy.
+
+        :param primary: The engine of the primary.
+        :param replicas: The engines of the replicas, by bind key.
+        """
+        timeout = f'{self.health_interval}s'
+        try:
+            with primary.connect() as connection:
+                connection.execute(HEALTH_CHECK_TIMEOUT, {'timeout': timeout})
+                primary_lsn = connection.execute(PRIMARY_LSN).scalar()
+        except SQLAlchemyError as e:
+            print(e)
+            primary_lsn = None
+
+        for bind_key, engine in replicas.items():
+            healthy = False
+            if primary_lsn is not None:
+                try:
+                    with engine.connect() as connection:
+                        connection.execute(HEALTH_CHECK_TIMEOUT, {'timeout': timeout})
+                        lag = connection.execute(REPLICA_LAG, {'primary_lsn': primary_lsn}).scalar()
+                    healthy = lag is not None and float(lag) <= self.max_lag
+                except SQLAlchemyError as e:
+                    print(e)
+            self.health[bind_key] = (healthy, time.monotonic())
+
+    def is_sticky(self):
+        """
+        Check if the reads of the user of the current request must stay on the primary, once per request.
+
+        :return: True if the user changed data in the last sticky_seconds or the check failed.
+        """
+        if 'replica_sticky' not in g:
+            user_id = get_request_user_id()
+            try:
+                g.replica_sticky = user_id is not None and bool(
+                    self.redis.exists(f"{REPLICA_STICKY_KEY}:{user_id}"))
+            except RedisError as e:
+                print(e)
+                g.replica_sticky = True
+        return g.replica_sticky
+
+    def track_writes(self, response):
+        """
+        Keep the reads of the user on the primary for sticky_seconds after a successful request that may change data.
+        Registered as an after_request handler.
+
+        :param response: The Flask HTTP response.
+
+        :return: The same response.
+        """
+        if not self.bind_keys or request.method in READ_METHODS + ('OPTIONS',) or response.status_code >= 400:
+            return response
+
+        user_id = get_request_user_id()
+        if user_id is not None:
+            try:
+                self.redis.set(f"{REPLICA_STICKY_KEY}:{user_id}", 1, px=int(self.sticky_seconds * 1000))
+            except RedisError as e:
+                print(e)
+        return response
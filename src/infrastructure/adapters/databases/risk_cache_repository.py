@@ -0,0 +1,83 @@
+from flask import json
+from redis.exceptions import RedisError
+
+from src.domain.gateways.risk_cache_gateway import IRiskCacheGateway
+from src.infrastructure.adapters.databases import redis_db
+
+RISK_CACHE_KEY = "risk_cache"
+RISK_CACHE_VERSION_KEY = "risk_cache_version"
+
+
+class RiskCacheRepository(IRiskCacheGateway):
+    """
+    Implementation of the IRiskCacheGateway interface using a Redis database.
+
+    Entries are stored under the cache version of their user read before the result was computed, so invalidating a
+    user only increments the version: the outdated entries, and the results computed from the risks read before the
+    invalidation, are left under the old version to expire with their TTL. The cache is best effort: Redis errors are
+    logged and treated as a miss.
+    """
+
+    def __init__(self, ttl=300):
+        """
+        Initialize the RiskCacheRepository with a connection to the Redis database.
+
+        :param ttl: Seconds a result is cached.
+        """
+        self.redis = redis_db
+        self.ttl = ttl
+
+    def build_key(self, user_id, key):
+        """
+        Build the Redis key of an entry under the current cache version of its user.
+
+        :param user_id: The user identifier.
+        :param key: The key of the result.
+
+        :return: The Redis key.
+        """
+        version = self.redis.get(f"{RISK_CACHE_VERSION_KEY}:{user_id}")
+        return f"{RISK_CACHE_KEY}:{user_id}:{int(version or 0)}:{key}"
+
+    def get_entry(self, user_id, key):
+        """
+        Get a cached result of a user under its current cache version.
+
+        :param user_id: The user identifier.
+        :param key: The key of the result.
+
+        :return: A tuple with the cached result, or None if it is not cached, and the Redis key of the entry, or None
+            if Redis failed.
+        """
+        try:
+            entry_key = self.build_key(user_id, key)
+            value = self.redis.get(entry_key)
+        except RedisError as e:
+            print(e)  # Log the cache error.
+            return None, None
+        return (json.loads(value) if value is not None else None), entry_key
+
+    def set_entry(self, entry_key, value):
+        """
+        Cache a result for the configured TTL.
+
+        :param entry_key: The Redis key returned by get_entry before the result was computed, or None to skip caching.
+        :param value: The result, a JSON serializable object.
+        """
+        if entry_key is None:
+            return
+        try:
+            self.redis.setex(entry_key, self.ttl, json.dumps(value))
+        except RedisError as e:
+            print(e)  # Log the cache error.
+
+    def invalidate_user(self, user_id):
+        """
+        Invalidate every cached result of a user by incrementing its cache version.
+
+        :param user_id: The user identifier.
+        """
+        try:
+            self.redis.incr(f"{RISK_CACHE_VERSION_KEY}:{user_id}")
+        except RedisError as e:
+            print(e)  # Log the cache error.
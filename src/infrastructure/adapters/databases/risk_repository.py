@@ -1,11 +1,101 @@
-from sqlalchemy import and_, or_
+import csv
+import io
+import re
+
+from sqlalchemy import and_, or_, func, select, literal_column, text, cast, String, delete, update
+from sqlalchemy.dialects.postgresql import TSVECTOR, insert
 
 from src.application.app import db
 from src.domain.gateways.risk_gateway import IRiskGateway
+from src.domain.models.paginated_request_dto import COUNT_MODE_EXACT, ARCHIVED_EXCLUDE, ARCHIVED_ONLY, \
+    ARCHIVED_INCLUDE
+from src.domain.models.risk_dto import RELEVANCE_SORT, HEATMAP_GROUP_PROVIDER, HEATMAP_GROUP_COUNTRY, \
+    SUMMARY_DIMENSION_USER, SUMMARY_DIMENSION_PROVIDER, SUMMARY_DIMENSION_COUNTRY
 from src.infrastructure.entities.provider import Provider
 from src.infrastructure.entities.risk import Risk
+from src.infrastructure.entities.risk_summary import RiskSummary
+from src.infrastructure.decorators.replica_read import replica_read
+from src.infrastructure.utils.keyset_pagination import paginate_keyset
+from src.infrastructure.utils.offset_pagination import paginate_offset
 from src.infrastructure.utils.query_filters import filter_entities
 
+SEARCH_MODE_FULL_TEXT = 'fulltext'
+SEARCH_MODE_CONTAINS = 'contains'
+
+# Text search configuration used by the risks.search_vector generated column
+SEARCH_CONFIG = 'spanish'
+
+search_vector = literal_column('risks.search_vector', type_=TSVECTOR)
+
+# Rows fetched per round trip by the server-side cursor of the risk export
+EXPORT_BATCH_SIZE = 1000
+
+# Risks archived or restored per transaction
+ARCHIVE_BATCH_SIZE = 1000
+
+# Key of the advisory lock that keeps a single reconciliation of the risk summaries running at a time
+RISK_SUMMARY_LOCK_KEY = 4726102
+
+REBUILD_RISK_SUMMARIES = """
+INSERT INTO risk_summaries (user_id, dimension, dimension_key, total)
+SELECT user_id, 'user', '', count(*) FROM risks
+WHERE user_id IS NOT NULL AND archived_at IS NULL GROUP BY user_id
+UNION ALL
+SELECT user_id, 'provider', provider_id::text, count(*) FROM risks
+WHERE user_id IS NOT NULL AND archived_at IS NULL GROUP BY user_id, provider_id
+UNION ALL
+SELECT user_id, 'country', country_code, count(*) FROM risks
+WHERE user_id IS NOT NULL AND archived_at IS NULL GROUP BY user_id, country_code
+"""
+
+# Staging table of the risk import, dropped when the import transaction ends
+CREATE_IMPORT_TABLE = """
+CREATE TEMPORARY TABLE risk_import (
+    title VARCHAR(100),
+    description TEXT,
+    impact INTEGER,
+    probability INTEGER,
+    country_code VARCHAR(2),
+    provider_id INTEGER
+) ON COMMIT DROP
+"""
+
+COPY_IMPORT = ("COPY risk_import (title, description, impact, probability, country_code, provider_id) "
+               "FROM STDIN WITH (FORMAT csv)")
+
+MERGE_IMPORT = """
+INSERT INTO risks (title, description, impact, probability, country_code, provider_id, user_id)
+SELECT title, description, impact, probability, country_code, provider_id, %(user_id)s FROM risk_import
+"""
+
+SUMMARIZE_IMPORT = """
+INSERT INTO risk_summaries (user_id, dimension, dimension_key, total)
+SELECT %(user_id)s, 'user', '', count(*) FROM risk_import
+UNION ALL
+SELECT %(user_id)s, 'provider', provider_id::text, count(*) FROM risk_import GROUP BY provider_id
+UNION ALL
+SELECT %(user_id)s, 'country', country_code, count(*) FROM risk_import GROUP BY country_code
+ORDER BY 2, 3
+ON CONFLICT (user_id, dimension, dimension_key) DO UPDATE SET total = risk_summaries.total + excluded.total
+"""
+
+
+def build_copy_buffer(items):
+    """
+    Write risk items as CSV in memory, in the column order of COPY_IMPORT.
+
+    :param items: A list of dictionaries of risk data.
+
+    :return: A buffer positioned at its start.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for item in items:
+        writer.writerow([item['title'], item.get('description', None), item.get('impact', None),
+                         item.get('probability', None), item['countryCode'], item['providerId']])
+    buffer.seek(0)
+    return buffer
+
 
 def apply_global_filter(query, search_string):
     """
@@ -31,6 +121,58 @@ def apply_global_filter(query, search_string):
     return query
 
 
+def build_prefix_tsquery(search_string):
+    """
+    Build a full-text query that matches every word of the search string as a prefix, so partial words typed in the
+    UI still match.
+
+    :param search_string: The search string.
+
+    :return: A tsquery expression, or None if the search string has no words.
+    """
+    words = re.findall(r'\w+', search_string)
+    if not words:
+        return None
+    return func.to_tsquery(SEARCH_CONFIG, ' & '.join(f'{word}:*' for word in words))
+
+
+def apply_full_text_filter(query, search_string):
+    """
+    Apply a global filter backed by the full-text and trigram indexes. Risks match on their title and description
+    through risks.search_vector, or on their provider name through a provider id subquery, so both branches of the
+    condition are on the risks table and can use its indexes.
+
+    :param query: The SQLAlchemy query to which the filter is applied.
+    :param search_string: The search string to filter by.
+
+    :return: A tuple with the filtered query and the relevance expression, or None if the contains filter was used.
+    """
+    ts_query = build_prefix_tsquery(search_string)
+    if ts_query is None:
+        return apply_global_filter(query, search_string), None
+
+    provider_ids = select(Provider.id).where(Provider.name.ilike(f"%{search_string}%"))
+    query = query.filter(or_(search_vector.op('@@')(ts_query), Risk.provider_id.in_(provider_ids)))
+
+    relevance = func.ts_rank_cd(search_vector, ts_query) + func.similarity(Provider.name, search_string)
+    return query, relevance
+
+
+def apply_relevance_sorting(query, relevance):
+    """
+    Sort a SQLAlchemy query by search relevance, most relevant first. Without a relevance expression, the newest
+    risks come first.
+
+    :param query: The SQLAlchemy query to which sorting is to be applied.
+    :param relevance: The relevance expression, or None.
+
+    :return: The sorted query.
+    """
+    if relevance is None:
+        return query.order_by(Risk.id.desc())
+    return query.order_by(relevance.desc(), Risk.id.desc())
+
+
 def apply_sorting(query, order_by, order_type):
     """
     Apply sorting to a SQLAlchemy query.
@@ -49,6 +191,97 @@ def apply_sorting(query, order_by, order_type):
     return query
 
 
+def build_summary_deltas(user_id, provider_id, country_code, delta):
+    """
+    Build the changes to the risk summaries caused by adding or removing a risk.
+
+    :param user_id: The user that owns the risk.
+    :param provider_id: The provider of the risk.
+    :param country_code: The country code of the risk.
+    :param delta: 1 when the risk is added, -1 when it is removed.
+
+    :return: A dictionary of total changes keyed by (user_id, dimension, dimension_key).
+    """
+    if user_id is None:
+        return {}
+    return {
+        (user_id, SUMMARY_DIMENSION_USER, ''): delta,
+        (user_id, SUMMARY_DIMENSION_PROVIDER, str(provider_id)): delta,
+        (user_id, SUMMARY_DIMENSION_COUNTRY, country_code): delta
+    }
+
+
+def merge_summary_deltas(*deltas):
+    """
+    Merge several summary changes, dropping the ones that cancel out.
+
+    :param deltas: Dictionaries of total changes, as built by build_summary_deltas.
+
+    :return: A dictionary with the net total changes.
+    """
+    merged = {}
+    for changes in deltas:
+        for key, delta in changes.items():
+            merged[key] = merged.get(key, 0) + delta
+    return {key: delta for key, delta in merged.items() if delta != 0}
+
+
+def apply_summary_deltas(session, deltas):
+    """
+    Add the total changes to the risk summaries in the current transaction. Rows are upserted in key order so
+    concurrent writers lock them in the same order.
+
+    :param session: The SQLAlchemy session of the risk write.
+    :param deltas: A dictionary of total changes keyed by (user_id, dimension, dimension_key).
+    """
+    if not deltas:
+        return
+
+    rows = [
+        {'user_id': user_id, 'dimension': dimension, 'dimension_key': dimension_key, 'total': delta}
+        for (user_id, dimension, dimension_key), delta in sorted(deltas.items())
+    ]
+    statement = insert(RiskSummary).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[RiskSummary.user_id, RiskSummary.dimension, RiskSummary.dimension_key],
+        set_={'total': RiskSummary.total + statement.excluded.total}
+    )
+    session.execute(statement)
+
+
+def apply_archived_filter(query, archived):
+    """
+    Restrict a risk query to the active risks, the archived risks or both. Active risks are matched with the same
+    condition as the partial list indexes, so those indexes can be used.
+
+    :param query: The SQLAlchemy query over risks.
+    :param archived: 'exclude' for active risks only, 'only' for archived risks only, or 'include' for both.
+
+    :return: The filtered query.
+    """
+    if archived == ARCHIVED_INCLUDE:
+        return query
+    if archived == ARCHIVED_ONLY:
+        return query.filter(Risk.archived_at.isnot(None))
+    return query.filter(Risk.archived_at.is_(None))
+
+
+def get_unfiltered_user_id(req):
+    """
+    Get the user of a risk list request filtered only by its owner, whose total is kept in the risk summaries.
+
+    :param req: A request object containing filtering criteria.
+
+    :return: The user identifier, or None if the request has other filters or includes archived risks.
+    """
+    if req.global_filter is not None or len(req.filters) != 1 or req.archived != ARCHIVED_EXCLUDE:
+        return None
+    item = req.filters[0]
+    if item['entity'] == 'Risk' and item['field'] == 'user_id' and item['operator'] == 'equals':
+        return item['value']
+    return None
+
+
 def apply_conditions(query, filters):
     """
     Apply filtering conditions to a SQLAlchemy query.
@@ -76,29 +309,152 @@ class RiskRepository(IRiskGateway):
     Implementation of the IRiskGateway interface using SQLAlchemy to manage risk data.
     """
 
-    def __init__(self):
+    def __init__(self, search_mode=SEARCH_MODE_CONTAINS, replica_router=None):
         """
         Initialize the RiskRepository with a connection to the database.
+
+        :param search_mode: 'contains' to match the global filter as a substring with ILIKE, or 'fulltext' to match
+            its words as prefixes with the full-text and trigram indexes when they exist.
+        :param replica_router: Optional router that sends the list and lookup reads to the read replicas.
         """
         self.db = db
+        self.search_mode = search_mode
+        self.replica_router = replica_router
+        self.full_text_available = None
 
+    @replica_read
     def get_risks_by_filter(self, req):
         """
-        Get a paginated list of risks based on filtering criteria.
+        Get a paginated list of risks based on filtering criteria. Uses keyset pagination when the request is in
+        cursor mode, otherwise offset pagination with the requested count mode. The exact total of lists filtered only
+        by their owner is read from the risk summaries.
 
         :param req: A request object containing filtering criteria.
 
         :return: A paginated list of risks.
         """
+        if req.cursor_mode:
+            query, _ = self.apply_filters(self.db.session.query(Risk, Provider).join(Provider), req)
+            return paginate_keyset(query, Risk, req.order_by, req.order_type, req.cursor, req.per_page,
+                                   lambda row: row.Risk)
+
+        query = self.build_list_query(req)
+
+        total = None
+        user_id = get_unfiltered_user_id(req)
+        if user_id is not None and req.count_mode == COUNT_MODE_EXACT:
+            total = self.get_user_risk_total(user_id)
+
+        risks = paginate_offset(query, req.page, req.per_page, req.count_mode, total)
+
+        return risks
+
+    def stream_risks_by_filter(self, req):
+        """
+        Get every risk matching the filtering criteria, sorted, through a server-side cursor that fetches
+        EXPORT_BATCH_SIZE rows at a time.
+
+        :param req: A request object containing filtering criteria.
+
+        :return: An iterator of rows with the risk and its provider.
+        """
+        return self.build_list_query(req).yield_per(EXPORT_BATCH_SIZE)
+
+    def build_list_query(self, req):
+        """
+        Build the filtered and sorted query of the risks of an offset paginated list or an export.
+
+        :param req: A request object containing filtering criteria.
+
+        :return: The SQLAlchemy query of rows with the risk and its provider.
+        """
         query = self.db.session.query(Risk, Provider).join(Provider)
 
-        query = apply_global_filter(query, req.global_filter)
+        query, relevance = self.apply_filters(query, req)
+
+        if req.order_by == RELEVANCE_SORT:
+            return apply_relevance_sorting(query, relevance)
+        return apply_sorting(query, req.order_by, req.order_type)
+
+    def get_risk_heatmap(self, req, group_by=None):
+        """
+        Count the risks matching the filtering criteria by impact and probability in a single GROUP BY query.
+
+        :param req: A request object containing filtering criteria.
+        :param group_by: Optional breakdown of the counts, 'provider' or 'country'.
+
+        :return: A list of rows with impact, probability and count, plus group_key (and group_name for providers) when
+            a breakdown is requested.
+        """
+        group_columns = []
+        columns = [Risk.impact, Risk.probability]
+        if group_by == HEATMAP_GROUP_PROVIDER:
+            group_columns = [Provider.id, Provider.name]
+            columns += [Provider.id.label('group_key'), Provider.name.label('group_name')]
+        elif group_by == HEATMAP_GROUP_COUNTRY:
+            group_columns = [Risk.country_code]
+            columns += [Risk.country_code.label('group_key')]
+        group_columns += [Risk.impact, Risk.probability]
+
+        query = self.db.session.query(*columns, func.count(Risk.id).label('count')).select_from(Risk).join(Provider)
+        query, _ = self.apply_filters(query, req)
+
+        return query.group_by(*group_columns).order_by(*group_columns).all()
+
+    def get_risk_scores(self, req):
+        """
+        Get the scores of the risks matching the filtering criteria, selecting only the columns used by the simulation.
+
+        :param req: A request object containing filtering criteria.
+
+        :return: A list of rows with impact, probability, provider_id, provider_name and country_code.
+        """
+        query = self.db.session.query(Risk.impact, Risk.probability, Risk.provider_id,
+                                      Provider.name.label('provider_name'), Risk.country_code) \
+            .select_from(Risk).join(Provider)
+        query, _ = self.apply_filters(query, req)
+
+        return query.all()
+
+    def apply_filters(self, query, req):
+        """
+        Apply the global filter and the filtering conditions of a request to a risk query.
+
+        :param query: The SQLAlchemy query over risks joined with their provider.
+        :param req: A request object containing filtering criteria.
+
+        :return: A tuple with the filtered query and the relevance expression of the global filter, or None.
+        """
+        relevance = None
+        if req.global_filter is not None and not req.global_filter.isdigit() and self.is_full_text_available():
+            query, relevance = apply_full_text_filter(query, req.global_filter)
+        else:
+            query = apply_global_filter(query, req.global_filter)
         query = apply_conditions(query, req.filters)
-        query = apply_sorting(query, req.order_by, req.order_type)
-        risks = query.paginate(page=req.page, per_page=req.per_page, error_out=False)
+        query = apply_archived_filter(query, req.archived)
 
-        return risks
+        return query, relevance
+
+    def is_full_text_available(self):
+        """
+        Check, once per process, if the database has the pg_trgm extension and the risks.search_vector column needed
+        by the full-text global filter.
+
+        :return: True if the full-text global filter can be used, False to fall back to ILIKE.
+        """
+        if self.search_mode != SEARCH_MODE_FULL_TEXT:
+            return False
 
+        if self.full_text_available is None:
+            self.full_text_available = bool(self.db.session.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') "
+                "AND EXISTS (SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'risks' AND column_name = 'search_vector')"
+            )).scalar())
+
+        return self.full_text_available
+
+    @replica_read
     def get_risk_by_id(self, risk_id):
         """
         Get a risk by its unique identifier.
@@ -109,6 +465,29 @@ class RiskRepository(IRiskGateway):
         """
         return Risk.query.get(risk_id)
 
+    def get_risks_by_ids(self, risk_ids):
+        """
+        Get the risks with the given unique identifiers in a single query.
+
+        :param risk_ids: The unique identifiers of the risks.
+
+        :return: A list of the risks found.
+        """
+        if not risk_ids:
+            return []
+        return self.db.session.query(Risk).filter(Risk.id.in_(risk_ids)).all()
+
+    def get_risk_texts(self, user_id):
+        """
+        Get the title and description of every active risk of a user, fetched EXPORT_BATCH_SIZE rows at a time.
+
+        :param user_id: The user identifier.
+
+        :return: An iterator of rows with id, title and description.
+        """
+        return self.db.session.query(Risk.id, Risk.title, Risk.description) \
+            .filter(Risk.user_id == user_id, Risk.archived_at.is_(None)).yield_per(EXPORT_BATCH_SIZE)
+
     def create_risk(self, data):
         """
         Create a new risk with the provided data.
@@ -128,10 +507,69 @@ class RiskRepository(IRiskGateway):
         )
 
         self.db.session.add(new_risk)
+        apply_summary_deltas(self.db.session, build_summary_deltas(
+            new_risk.user_id, new_risk.provider_id, new_risk.country_code, 1))
         self.db.session.commit()
 
         return new_risk
 
+    def create_risks(self, items, user_id):
+        """
+        Create a batch of risks with a single multi-row INSERT ... RETURNING, updating the risk summaries in the same
+        transaction.
+
+        :param items: A list of dictionaries of risk data.
+        :param user_id: The user that owns the risks.
+
+        :return: The created risks, as rows with the columns of the risk.
+        """
+        values = [{
+            'title': item['title'],
+            'description': item.get('description', None),
+            'impact': item.get('impact', None),
+            'probability': item.get('probability', None),
+            'user_id': user_id,
+            'country_code': item['countryCode'],
+            'provider_id': item['providerId']
+        } for item in items]
+
+        statement = insert(Risk.__table__).values(values).returning(*Risk.__table__.c)
+        created = self.db.session.execute(statement).all()
+
+        apply_summary_deltas(self.db.session, merge_summary_deltas(*(
+            build_summary_deltas(user_id, risk.provider_id, risk.country_code, 1) for risk in created)))
+        self.db.session.commit()
+
+        return created
+
+    def import_risks(self, chunks, user_id):
+        """
+        Import chunks of risks in a single transaction. Every chunk is streamed with COPY into a temporary staging
+        table, which is then merged into risks and summarized into the risk summaries with one statement each.
+
+        :param chunks: An iterable of lists of dictionaries of risk data.
+        :param user_id: The user that owns the risks.
+
+        :return: The number of imported risks.
+        """
+        connection = self.db.session.connection()
+        connection.exec_driver_sql(CREATE_IMPORT_TABLE)
+
+        cursor = connection.connection.cursor()
+        try:
+            for items in chunks:
+                if items:
+                    cursor.copy_expert(COPY_IMPORT, build_copy_buffer(items))
+        finally:
+            cursor.close()
+
+        imported = connection.exec_driver_sql(MERGE_IMPORT, {'user_id': user_id}).rowcount
+        if imported:
+            connection.exec_driver_sql(SUMMARIZE_IMPORT, {'user_id': user_id})
+        self.db.session.commit()
+
+        return imported
+
     def update_risk(self, risk, data):
         """
         Update an existing risk with the provided data.
@@ -141,6 +579,8 @@ class RiskRepository(IRiskGateway):
 
         :return: The updated risk.
         """
+        previous = build_summary_deltas(risk.user_id, risk.provider_id, risk.country_code, -1)
+
         risk.title = data.get('title', risk.title)
         risk.description = data.get('description', risk.description)
         risk.impact = data.get('impact', risk.impact)
@@ -148,6 +588,9 @@ class RiskRepository(IRiskGateway):
         risk.country_code = data.get('countryCode', risk.country_code)
         risk.provider_id = data.get('providerId', risk.provider_id)
 
+        if risk.archived_at is None:
+            apply_summary_deltas(self.db.session, merge_summary_deltas(
+                previous, build_summary_deltas(risk.user_id, risk.provider_id, risk.country_code, 1)))
         self.db.session.commit()
 
         return risk
@@ -161,6 +604,104 @@ class RiskRepository(IRiskGateway):
         :return: The unique identifier of the deleted risk.
         """
         self.db.session.delete(risk)
+        if risk.archived_at is None:
+            apply_summary_deltas(self.db.session, build_summary_deltas(
+                risk.user_id, risk.provider_id, risk.country_code, -1))
         self.db.session.commit()
 
         return risk.id
+
+    def archive_risks(self, req, archive=True, max_batches=None, batch_size=ARCHIVE_BATCH_SIZE):
+        """
+        Archive the active risks, or restore the archived risks, matching the filtering criteria. Risks are processed
+        in batches of batch_size, each in its own transaction together with the changes to the risk summaries, which
+        only count active risks, so locks are held briefly and a failure keeps the batches already committed. The
+        updates are also filtered by the owners of the batch, so only their partitions of the risks table are read.
+
+        :param req: A request object containing filtering criteria.
+        :param archive: True to archive active risks, False to restore archived risks.
+        :param max_batches: Maximum number of batches processed, or None to process every matching risk.
+        :param batch_size: Number of risks processed per transaction.
+
+        :return: A tuple with the number of archived or restored risks and True if matching risks are left.
+        """
+        req.archived = ARCHIVED_EXCLUDE if archive else ARCHIVED_ONLY
+        processed = 0
+        batches = 0
+        while True:
+            query = self.db.session.query(Risk.id, Risk.user_id).select_from(Risk).join(Provider)
+            query, _ = self.apply_filters(query, req)
+            if max_batches is not None and batches >= max_batches:
+                pending = query.limit(1).first() is not None
+                self.db.session.commit()
+                return processed, pending
+
+            rows = query.order_by(Risk.id).limit(batch_size).with_for_update(of=Risk).all()
+            if not rows:
+                self.db.session.commit()
+                return processed, False
+
+            statement = update(Risk) \
+                .where(Risk.user_id.in_(sorted({row.user_id for row in rows})), Risk.id.in_([row.id for row in rows])) \
+                .execution_options(synchronize_session=False) \
+                .values(archived_at=func.now() if archive else None) \
+                .returning(Risk.user_id, Risk.provider_id, Risk.country_code)
+            changed = self.db.session.execute(statement).all()
+
+            apply_summary_deltas(self.db.session, merge_summary_deltas(*(
+                build_summary_deltas(risk.user_id, risk.provider_id, risk.country_code, -1 if archive else 1)
+                for risk in changed)))
+            self.db.session.commit()
+            processed += len(changed)
+            batches += 1
+
+    def get_risk_summary(self, user_id):
+        """
+        Get the risk totals of a user from the risk summaries.
+
+        :param user_id: The user identifier.
+
+        :return: A list of rows with dimension, dimension_key, total and provider_name, largest totals first.
+        """
+        provider_join = and_(RiskSummary.dimension == SUMMARY_DIMENSION_PROVIDER,
+                             cast(Provider.id, String) == RiskSummary.dimension_key)
+        return (self.db.session.query(RiskSummary.dimension, RiskSummary.dimension_key, RiskSummary.total,
+                                      Provider.name.label('provider_name'))
+                .outerjoin(Provider, provider_join)
+                .filter(RiskSummary.user_id == user_id, RiskSummary.total > 0)
+                .order_by(RiskSummary.total.desc(), RiskSummary.dimension_key)
+                .all())
+
+    def get_user_risk_total(self, user_id):
+        """
+        Get the number of risks of a user from the risk summaries.
+
+        :param user_id: The user identifier.
+
+        :return: The number of risks, or None if the user has no summary.
+        """
+        return self.db.session.query(RiskSummary.total).filter(
+            RiskSummary.user_id == user_id,
+            RiskSummary.dimension == SUMMARY_DIMENSION_USER,
+            RiskSummary.dimension_key == ''
+        ).scalar()
+
+    def rebuild_risk_summaries(self):
+        """
+        Rebuild the risk summaries from the risks table. The summaries are locked against concurrent risk writes
+        while they are rebuilt, and an advisory lock skips the rebuild if another one is already running.
+
+        :return: True if the summaries were rebuilt, False if another rebuild was running.
+        """
+        session = self.db.session
+        locked = session.execute(text('SELECT pg_try_advisory_xact_lock(:key)'),
+                                 {'key': RISK_SUMMARY_LOCK_KEY}).scalar()
+        if not locked:
+            session.rollback()
+            return False
+
+        session.execute(text('LOCK TABLE risk_summaries IN EXCLUSIVE MODE'))
+        session.execute(delete(RiskSummary))
+        session.execute(text(REBUILD_RISK_SUMMARIES))
+        session.commit()
+        return True
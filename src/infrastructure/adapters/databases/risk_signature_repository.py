@@ -0,0 +1,197 @@
+import uuid
+
+import numpy as np
+from redis.exceptions import RedisError
+
+from src.domain.gateways.risk_signature_gateway import IRiskSignatureGateway, SIGNATURES_UNAVAILABLE
+from src.infrastructure.adapters.databases import redis_db
+
+RISK_SIGNATURES_KEY = "risk_signatures"
+RISK_SIGNATURES_VERSION_KEY = "risk_signatures_version"
+RISK_SIGNATURES_REBUILD_KEY = "risk_signatures_rebuild"
+
+# Seconds a rebuild may take before its token expires and its signatures are discarded
+REBUILD_TTL = 600
+
+# KEYS: signatures hash, version key, rebuild key
+# ARGV: rebuild token, then the risk id and signature of every risk
+REPLACE_SIGNATURES_SCRIPT = """
+if redis.call('get', KEYS[3]) ~= ARGV[1] then
+    return nil
+end
+redis.call('del', KEYS[1], KEYS[3])
+for i = 2, #ARGV, 2 do
+    redis.call('hset', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return redis.call('incr', KEYS[2])
+"""
+
+# KEYS: signatures hash, version key, rebuild key
+# ARGV: risk id and signature of every risk
+SET_SIGNATURES_SCRIPT = """
+if redis.call('exists', KEYS[2]) == 0 then
+    redis.call('del', KEYS[3])
+    return nil
+end
+for i = 1, #ARGV, 2 do
+    redis.call('hset', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return redis.call('incr', KEYS[2])
+"""
+
+# KEYS: signatures hash, version key, rebuild key
+# ARGV: risk ids
+DELETE_SIGNATURES_SCRIPT = """
+if redis.call('exists', KEYS[2]) == 0 then
+    redis.call('del', KEYS[3])
+    return nil
+end
+for i = 1, #ARGV do
+    redis.call('hdel', KEYS[1], ARGV[i])
+end
+return redis.call('incr', KEYS[2])
+"""
+
+
+class RiskSignatureRepository(IRiskSignatureGateway):
+    """
+    Implementation of the IRiskSignatureGateway interface using a Redis database. The signatures of a user are kept in
+    a hash of raw 32-bit values keyed by risk ID, next to a version counter whose existence marks the hash as complete.
+    A rebuild holds a random token in a third key, which every change to an incomplete hash deletes, so a rebuild only
+    stores its signatures if no risk changed while it read them. Redis errors are logged and reported by get_version as
+    SIGNATURES_UNAVAILABLE, and by the other methods as missing signatures.
+    """
+
+    def __init__(self):
+        """
+        Initialize the RiskSignatureRepository with a connection to the Redis database.
+        """
+        self.redis = redis_db
+        self.replace_script = self.redis.register_script(REPLACE_SIGNATURES_SCRIPT)
+        self.set_script = self.redis.register_script(SET_SIGNATURES_SCRIPT)
+        self.delete_script = self.redis.register_script(DELETE_SIGNATURES_SCRIPT)
+
+    def get_version(self, user_id):
+        """
+        Get the version of the signatures of a user.
+
+        :param user_id: The user identifier.
+
+        :return: The version, None if the signatures of the user are not stored, or SIGNATURES_UNAVAILABLE if Redis
+            failed.
+        """
+        try:
+            version = self.redis.get(f"{RISK_SIGNATURES_VERSION_KEY}:{user_id}")
+        except RedisError as e:
+            print(e)  # Log the signature store error.
+            return SIGNATURES_UNAVAILABLE
+        return int(version) if version is not None else None
+
+    def get_signatures(self, user_id):
+        """
+        Get the signatures of a user together with their version, read in a single transaction.
+
+        :param user_id: The user identifier.
+
+        :return: A tuple with a dictionary of signatures keyed by risk ID and the version, or None if the signatures
+            of the user are not stored.
+        """
+        try:
+            pipeline = self.redis.pipeline(transaction=True)
+            pipeline.get(f"{RISK_SIGNATURES_VERSION_KEY}:{user_id}")
+            pipeline.hgetall(f"{RISK_SIGNATURES_KEY}:{user_id}")
+            version, stored = pipeline.execute()
+        except RedisError as e:
+            print(e)  # Log the signature store error.
+            return None
+        if version is None:
+            return None
+        return {int(risk_id): np.frombuffer(signature, dtype=np.uint32) for risk_id, signature in stored.items()}, \
+            int(version)
+
+    def begin_rebuild(self, user_id):
+        """
+        Start a rebuild of the signatures of a user, replacing the token of any rebuild in progress.
+
+        :param user_id: The user identifier.
+
+        :return: The token of the rebuild, or None if it could not be started.
+        """
+        token = uuid.uuid4().hex
+        try:
+            self.redis.set(f"{RISK_SIGNATURES_REBUILD_KEY}:{user_id}", token, ex=REBUILD_TTL)
+        except RedisError as e:
+            print(e)  # Log the signature store error.
+            return None
+        return token
+
+    def replace_signatures(self, user_id, signatures, token):
+        """
+        Replace every signature of a user atomically, only if the token is still the one of the user rebuild.
+
+        :param user_id: The user identifier.
+        :param signatures: A dictionary of signatures keyed by risk ID.
+        :param token: The token returned by begin_rebuild.
+
+        :return: The new version, or None if the rebuild was cancelled or the signatures could not be stored.
+        """
+        if token is None:
+            return None
+        args = [token]
+        args.extend(value for risk_id, signature in signatures.items() for value in (risk_id, signature.tobytes()))
+        try:
+            return self.replace_script(keys=[f"{RISK_SIGNATURES_KEY}:{user_id}",
+                                             f"{RISK_SIGNATURES_VERSION_KEY}:{user_id}",
+                                             f"{RISK_SIGNATURES_REBUILD_KEY}:{user_id}"], args=args)
+        except RedisError as e:
+            print(e)  # Log the signature store error.
+            return None
+
+    def set_signatures(self, user_id, signatures):
+        """
+        Add or replace signatures of a user, only if the signatures of the user are stored. Otherwise, cancels any
+        rebuild of the signatures of the user.
+
+        :param user_id: The user identifier.
+        :param signatures: A dictionary of signatures keyed by risk ID.
+
+        :return: The new version, or None if the signatures of the user are not stored.
+        """
+        args = [value for risk_id, signature in signatures.items() for value in (risk_id, signature.tobytes())]
+        try:
+            return self.set_script(keys=[f"{RISK_SIGNATURES_KEY}:{user_id}",
+                                         f"{RISK_SIGNATURES_VERSION_KEY}:{user_id}",
+                                         f"{RISK_SIGNATURES_REBUILD_KEY}:{user_id}"], args=args)
+        except RedisError as e:
+            print(e)  # Log the signature store error.
+            return None
+
+    def delete_signatures(self, user_id, risk_ids):
+        """
+        Delete signatures of a user, only if the signatures of the user are stored. Otherwise, cancels any rebuild of
+        the signatures of the user.
+
+        :param user_id: The user identifier.
+        :param risk_ids: The risk IDs whose signatures are deleted.
+
+        :return: The new version, or None if the signatures of the user are not stored.
+        """
+        try:
+            return self.delete_script(keys=[f"{RISK_SIGNATURES_KEY}:{user_id}",
+                                            f"{RISK_SIGNATURES_VERSION_KEY}:{user_id}",
+                                            f"{RISK_SIGNATURES_REBUILD_KEY}:{user_id}"], args=list(risk_ids))
+        except RedisError as e:
+            print(e)  # Log the signature store error.
+            return None
+
+    def invalidate_user(self, user_id):
+        """
+        Drop every signature of a user, so they are rebuilt on the next use, and cancel any rebuild in progress.
+
+        :param user_id: The user identifier.
+        """
+        try:
+            self.redis.delete(f"{RISK_SIGNATURES_KEY}:{user_id}", f"{RISK_SIGNATURES_VERSION_KEY}:{user_id}",
+                              f"{RISK_SIGNATURES_REBUILD_KEY}:{user_id}")
+        except RedisError as e:
+            print(e)  # Log the signature store error.
@@ -0,0 +1,26 @@
+from flask_sqlalchemy.session import Session
+
+# Key of the session info holding the replica engine that serves the reads in progress
+REPLICA_BIND = 'replica_bind'
+
+
+class RoutingSession(Session):
+    """
+    Flask-SQLAlchemy session that sends its statements to a read replica while a replica engine is set in its info,
+    and to the engine of the bind key of the queried tables otherwise. Flushes always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        """
+        Select the engine of a statement: the replica set in the session info, if any, or the default engine.
+
+        :param mapper: The mapper or entity being queried.
+        :param clause: The statement being executed.
+        :param bind: An explicit engine or connection, which takes precedence.
+
+        :return: The engine or connection that runs the statement.
+        """
+        replica = self.info.get(REPLICA_BIND)
+        if replica is not None and bind is None and not self._flushing:
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,70 @@
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Key of the connection record info holding the timeouts already set on the connection
+TIMEOUTS_INFO = 'timeouts'
+
+
+class StatementTimeoutPolicy:
+    """
+    Sets the PostgreSQL statement_timeout and lock_timeout of every connection when it is checked out of the pool, with
+    the values of the endpoint that serves the request, so a slow query cannot hold a worker indefinitely. Connections
+    used outside a request, like migrations and jobs, have no timeouts. The values are kept in the connection record
+    and only sent again when they change.
+    """
+
+    def __init__(self, statement_timeout=30000, lock_timeout=5000, endpoints=None):
+        """
+        Initialize the StatementTimeoutPolicy.
+
+        :param statement_timeout: Default statement timeout of the requests in milliseconds, 0 disables it.
+        :param lock_timeout: Default lock timeout of the requests in milliseconds, 0 disables it.
+        :param endpoints: Optional dictionary keyed by endpoint name with the statement_timeout and lock_timeout of
+            the endpoint, each of them optional.
+        """
+        self.statement_timeout = statement_timeout
+        self.lock_timeout = lock_timeout
+        self.endpoints = endpoints or {}
+
+    def resolve(self):
+        """
+        Get the timeouts of the current context.
+
+        :return: A tuple with the statement and lock timeouts in milliseconds.
+        """
+        if not has_request_context():
+            return 0, 0
+        overrides = self.endpoints.get(request.endpoint, {})
+        return (int(overrides.get('statement_timeout', self.statement_timeout)),
+                int(overrides.get('lock_timeout', self.lock_timeout)))
+
+    def register(self, engine):
+        """
+        Apply the policy to the connections of a PostgreSQL engine.
+
+        :param engine: The SQLAlchemy engine.
+        """
+        if engine.dialect.name == 'postgresql':
+            event.listen(engine, 'checkout', self.on_checkout)
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        """
+        Set the timeouts of a connection checked out of the pool. The settings are committed right away so a rollback
+        of the request transaction keeps them.
+
+        :param dbapi_connection: The DBAPI connection.
+        :param connection_record: The pool record of the connection.
+        :param connection_proxy: The proxy returned to the caller.
+        """
+        timeouts = self.resolve()
+        if connection_record.info.get(TIMEOUTS_INFO) == timeouts:
+            return
+
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT set_config('statement_timeout', %s, false), set_config('lock_timeout', %s, false)",
+                           (f'{timeouts[0]}ms', f'{timeouts[1]}ms'))
+        finally:
+            cursor.close()
+        dbapi_connection.commit()
+        connection_record.info[TIMEOUTS_INFO] = timeouts
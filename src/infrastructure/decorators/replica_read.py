@@ -0,0 +1,33 @@
+from functools import wraps
+
+from src.infrastructure.adapters.databases.routing_session import REPLICA_BIND
+
+
+def replica_read(fn):
+    """
+    A decorator for repository methods that only read data, which sends their queries to a read replica when the
+    replica router of the repository allows it, and to the primary otherwise.
+
+    :param fn: The repository method. Its instance must have the db and replica_router attributes.
+
+    :return: The decorated function.
+    :rtype: function
+    """
+
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        session = self.db.session
+        if self.replica_router is None or REPLICA_BIND in session.info:
+            return fn(self, *args, **kwargs)
+
+        engine = self.replica_router.choose_engine(session)
+        if engine is None:
+            return fn(self, *args, **kwargs)
+
+        session.info[REPLICA_BIND] = engine
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            session.info.pop(REPLICA_BIND, None)
+
+    return wrapper
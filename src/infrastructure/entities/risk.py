@@ -4,7 +4,8 @@ from src.infrastructure.entities.provider import Provider
 
 class Risk(db.Model):
     """
-    Represents a risk entity in the database.
+    Represents a risk entity in the database. The risks table is hash partitioned by user_id, so its primary key is
+    (user_id, id); the entity is still identified by id alone, which is unique across partitions.
 
     :param id: The unique identifier of the risk.
     :param title: The title or name of the risk.
@@ -14,17 +15,25 @@ class Risk(db.Model):
     :param user_id: The user ID associated with the risk.
     :param country_code: The country code associated with the risk.
     :param provider_id: The provider ID associated with the risk.
+    :param archived_at: The time the risk was archived, None for active risks.
     :param provider: The relationship with the Provider entity.
     """
 
     __tablename__ = 'risks'
+    __table_args__ = (
+        db.PrimaryKeyConstraint('user_id', 'id'),
+        {'postgresql_partition_by': 'HASH (user_id)'}
+    )
 
-    id = db.Column(db.Integer, primary_key=True)
+    id = db.Column(db.Integer, autoincrement=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     impact = db.Column(db.Integer)
     probability = db.Column(db.Integer)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     country_code = db.Column(db.String(2), nullable=False)
     provider_id = db.Column(db.Integer, db.ForeignKey('providers.id'), nullable=False)
+    archived_at = db.Column(db.DateTime)
     provider = db.relationship(Provider, backref=db.backref('risks', lazy='dynamic'))
+
+    __mapper_args__ = {'primary_key': [id]}
@@ -0,0 +1,19 @@
+from src.application.app import db
+
+
+class RiskSummary(db.Model):
+    """
+    Represents a risk total of a user in the database, overall or broken down by provider or country.
+
+    :param user_id: The user ID that owns the risks.
+    :param dimension: The breakdown of the total: 'user', 'provider' or 'country'.
+    :param dimension_key: The provider ID or country code of the breakdown, empty for the user total.
+    :param total: The number of risks.
+    """
+
+    __tablename__ = 'risk_summaries'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    dimension = db.Column(db.String(20), primary_key=True)
+    dimension_key = db.Column(db.String(20), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
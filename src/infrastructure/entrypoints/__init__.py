@@ -1,13 +1,32 @@
+from src.application.app import app, db
 from src.infrastructure.adapters.clients.country_client import CountryClient
+from src.infrastructure.adapters.clients.country_snapshot_client import CountrySnapshotClient
 from src.infrastructure.adapters.databases.auth_repository import AuthRepository
 from src.infrastructure.adapters.databases.blacklist_repository import BlackListRepository
+from src.infrastructure.adapters.databases.country_cache_repository import CountryCacheRepository
 from src.infrastructure.adapters.databases.country_repository import CountryRepository
 from src.infrastructure.adapters.databases.provider_repository import ProviderRepository
+from src.infrastructure.adapters.databases.replica_router import ReplicaRouter
+from src.infrastructure.adapters.databases.risk_cache_repository import RiskCacheRepository
+from src.infrastructure.adapters.databases.risk_signature_repository import RiskSignatureRepository
 from src.infrastructure.adapters.databases.risk_repository import RiskRepository
+from src.infrastructure.adapters.databases.statement_timeouts import StatementTimeoutPolicy
+
+statement_timeout_policy = StatementTimeoutPolicy(app.config['DB_STATEMENT_TIMEOUT'], app.config['DB_LOCK_TIMEOUT'],
+                                                  app.config['DB_ENDPOINT_TIMEOUTS'])
+with app.app_context():
+    for engine in db.engines.values():
+        statement_timeout_policy.register(engine)
 
 country_client = CountryClient()
-country_gateway = CountryRepository()
-provider_gateway = ProviderRepository()
-risk_gateway = RiskRepository()
+country_snapshot_client = CountrySnapshotClient()
+country_gateway = CountryCacheRepository(CountryRepository(), app.config['COUNTRY_CACHE_TTL'])
+replica_router = ReplicaRouter(db, app.config['SQLALCHEMY_BINDS'], app.config['REPLICA_HEALTH_INTERVAL'],
+                               app.config['REPLICA_MAX_LAG'], app.config['REPLICA_STICKY_SECONDS'])
+app.after_request(replica_router.track_writes)
+provider_gateway = ProviderRepository(replica_router)
+risk_gateway = RiskRepository(app.config['GLOBAL_SEARCH_MODE'], replica_router)
+risk_cache_gateway = RiskCacheRepository(app.config['RISK_CACHE_TTL'])
+risk_signature_gateway = RiskSignatureRepository()
 auth_gateway = AuthRepository()
 blacklist_gateway = BlackListRepository()
@@ -2,14 +2,20 @@ from flask import Blueprint
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required
 
+from src.application.app import app
 from src.domain.usecases.country_use_case import CountryUseCase
 from src.infrastructure.decorators.role_required import role_required
-from src.infrastructure.entrypoints import country_client, country_gateway
+from src.infrastructure.entrypoints import country_client, country_gateway, country_snapshot_client
+from src.infrastructure.jobs.country_refresh_job import start_country_refresh_job
 from src.infrastructure.utils.responses import success_data_response
 
 bp = Blueprint('countries', __name__)
 
-country_use_case = CountryUseCase(country_client, country_gateway)
+country_use_case = CountryUseCase(country_client, country_gateway, country_snapshot_client)
+
+if app.config['COUNTRY_REFRESH_JOB_ENABLED']:
+    start_country_refresh_job(country_use_case, app.config['COUNTRY_REFRESH_INTERVAL'],
+                              app.config['COUNTRY_REFRESH_THRESHOLD'])
 
 
 @bp.route('/api/v1/countries/all', methods=['GET'])
@@ -44,3 +50,15 @@ def get_countries_by_codes():
 
     array = [value for value in api_data.values()]
     return jsonify(success_data_response(array)), 200
+
+
+@bp.route('/api/v1/countries/cache', methods=['GET'])
+@jwt_required()
+@role_required(['ADMIN'])
+def get_countries_cache_stats():
+    """
+    Retrieves the hit/miss counters of the in-process country cache. Only role ADMIN Authorized.
+
+    :return: The country cache counters.
+    """
+    return jsonify(success_data_response(country_gateway.get_stats())), 200
@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+
+from src.application.app import db
+from src.infrastructure.decorators.role_required import role_required
+from src.infrastructure.utils.responses import success_data_response
+
+bp = Blueprint('database', __name__)
+
+
+@bp.route('/api/v1/database/pool', methods=['GET'])
+@jwt_required()
+@role_required(['ADMIN'])
+def get_database_pool_stats():
+    """
+    Retrieves the state, checkouts and wait times of the connection pools of the worker, one per database engine.
+    Only role ADMIN Authorized.
+
+    :return: The pool counters by engine.
+    """
+    stats = {
+        bind_key or 'primary': engine.pool.get_stats()
+        for bind_key, engine in db.engines.items() if hasattr(engine.pool, 'get_stats')
+    }
+    return jsonify(success_data_response(stats)), 200
@@ -5,12 +5,12 @@ from flask_jwt_extended import jwt_required
 from src.domain.models.paginated_request_dto import PaginatedRequestDto
 from src.domain.usecases.provider_usecase import ProviderUseCase
 from src.infrastructure.decorators.role_required import role_required
-from src.infrastructure.entrypoints import provider_gateway, country_client, country_gateway
+from src.infrastructure.entrypoints import provider_gateway, country_client, country_gateway, country_snapshot_client
 from src.infrastructure.utils.responses import success_data_response, success_response, success_operation_response
 
 bp = Blueprint('providers', __name__)
 
-provider_use_case = ProviderUseCase(provider_gateway, country_client, country_gateway)
+provider_use_case = ProviderUseCase(provider_gateway, country_client, country_gateway, country_snapshot_client)
 
 
 @bp.route('/api/v1/providers', methods=['GET'])
@@ -43,6 +43,20 @@ def create_provider():
         201, new_provider, "Proveedor con ID " + provider_id + " creado exitosamente")), 201
 
 
+@bp.route('/api/v1/providers/bulk', methods=['PUT'])
+@jwt_required()
+@role_required(['ADMIN'])
+def upsert_providers():
+    """
+    Creates or updates a catalog of providers, matched by name. Only role ADMIN Authorized.
+
+    :return: A response with the number of created, updated and unchanged providers.
+    """
+    data = request.get_json()
+    result = provider_use_case.upsert_providers(data)
+    return jsonify(success_operation_response(200, result, "Proveedores sincronizados exitosamente")), 200
+
+
 @bp.route('/api/v1/providers/<int:provider_id>', methods=['PUT'])
 @jwt_required()
 @role_required(['ADMIN'])
@@ -1,16 +1,27 @@
-from flask import Blueprint
+from flask import Blueprint, Response, stream_with_context
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 
+from src.application.app import app
+from src.domain.exceptions.exceptions import ValidationException
 from src.domain.models.paginated_request_dto import PaginatedRequestDto
+from src.domain.models.risk_dto import IMPORT_COLUMNS
 from src.domain.usecases.risk_usecase import RiskUseCase
 from src.infrastructure.decorators.role_required import role_required
-from src.infrastructure.entrypoints import risk_gateway, provider_gateway, country_client, country_gateway
+from src.infrastructure.entrypoints import risk_gateway, provider_gateway, country_client, country_gateway, \
+    country_snapshot_client, risk_cache_gateway, risk_signature_gateway
+from src.infrastructure.jobs.risk_summary_job import start_risk_summary_job
+from src.infrastructure.utils.csv_rows import read_csv_rows
+from src.infrastructure.utils.export_formats import EXPORT_FORMATS, EXPORT_FORMAT_CSV
 from src.infrastructure.utils.responses import success_data_response, success_response, success_operation_response
 
 bp = Blueprint('risks', __name__)
 
-risk_use_case = RiskUseCase(risk_gateway, provider_gateway, country_client, country_gateway)
+risk_use_case = RiskUseCase(risk_gateway, provider_gateway, country_client, country_gateway, country_snapshot_client,
+                            risk_cache_gateway, risk_signature_gateway)
+
+if app.config['RISK_SUMMARY_JOB_ENABLED']:
+    start_risk_summary_job(app, risk_use_case, app.config['RISK_SUMMARY_RECONCILE_INTERVAL'])
 
 
 @bp.route('/api/v1/risks', methods=['GET'])
@@ -29,6 +40,113 @@ def get_risks():
     return jsonify(success_data_response(data)), 200
 
 
+@bp.route('/api/v1/risks/export', methods=['GET'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST', 'VIEWER'])
+def export_risks():
+    """
+    Exports every risk matching the filtering criteria, with the sorting of the risk list, as a streamed CSV, NDJSON,
+    Arrow IPC or Parquet file. Only role ADMIN, ANALYST and VIEWER Authorized.
+
+    :return: A streamed response with the risks.
+    :rtype: Response
+    """
+    export_format = request.args.get('format', EXPORT_FORMAT_CSV)
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationException("Error validating input data", [{"field": "format", "errors": "Formato inválido"}])
+    serialize, mimetype = EXPORT_FORMATS[export_format]
+
+    pagination_req = PaginatedRequestDto(request)
+    pagination_req.add_filter('user_id', get_jwt().get('user')['userId'])
+    risks = risk_use_case.export_risks(pagination_req)
+
+    return Response(stream_with_context(serialize(risks)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=risks.{export_format}'})
+
+
+@bp.route('/api/v1/risks/heatmap', methods=['GET'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST', 'VIEWER'])
+def get_risk_heatmap():
+    """
+    Retrieves the impact and probability heat map of the risks matching the filtering criteria, optionally broken down
+    by provider or country. Only role ADMIN, ANALYST and VIEWER Authorized.
+
+    :return: The risk heat map.
+    :rtype: Response
+    """
+    pagination_req = PaginatedRequestDto(request)
+    pagination_req.add_filter('user_id', get_jwt().get('user')['userId'])
+    data = risk_use_case.get_risk_heatmap(pagination_req, request.args.get('groupBy', None))
+    return jsonify(success_data_response(data)), 200
+
+
+@bp.route('/api/v1/risks/exposure', methods=['GET'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST', 'VIEWER'])
+def get_risk_exposure():
+    """
+    Retrieves the provider × country matrix of the added scores of the risks matching the filtering criteria. Only
+    role ADMIN, ANALYST and VIEWER Authorized.
+
+    :return: The risk exposure matrix.
+    :rtype: Response
+    """
+    user_id = get_jwt().get('user')['userId']
+    pagination_req = PaginatedRequestDto(request)
+    pagination_req.add_filter('user_id', user_id)
+    data = risk_use_case.get_risk_exposure(pagination_req, user_id)
+    return jsonify(success_data_response(data)), 200
+
+
+@bp.route('/api/v1/risks/duplicates', methods=['GET'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST', 'VIEWER'])
+def get_risk_duplicates():
+    """
+    Retrieves the groups of possible duplicates among the risks of the user. Only role ADMIN, ANALYST and VIEWER
+    Authorized.
+
+    :return: The groups of possible duplicate risks.
+    :rtype: Response
+    """
+    data = risk_use_case.get_risk_duplicates(get_jwt().get('user')['userId'], request.args.get('threshold', None))
+    return jsonify(success_data_response(data)), 200
+
+
+@bp.route('/api/v1/risks/simulation', methods=['POST'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST', 'VIEWER'])
+def simulate_risks():
+    """
+    Runs a Monte Carlo simulation of the losses of the risks matching the filtering criteria. Only role ADMIN, ANALYST
+    and VIEWER Authorized.
+
+    :return: The simulated loss percentiles, in total and by provider and country.
+    :rtype: Response
+    """
+    pagination_req = PaginatedRequestDto(request)
+    pagination_req.add_filter('user_id', get_jwt().get('user')['userId'])
+    data = risk_use_case.simulate_risks(pagination_req, request.get_json(silent=True) or {},
+                                        app.config['SIMULATION_MAX_WORKERS'])
+    return jsonify(success_data_response(data)), 200
+
+
+@bp.route('/api/v1/risks/summary', methods=['GET'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST', 'VIEWER'])
+def get_risk_summary():
+    """
+    Retrieves the risk totals of the user, overall and by provider and country. Only role ADMIN, ANALYST and VIEWER
+    Authorized.
+
+    :return: The risk summary of the user.
+    :rtype: Response
+    """
+    data = risk_use_case.get_risk_summary(get_jwt().get('user')['userId'])
+    return jsonify(success_data_response(data)), 200
+
+
 @bp.route('/api/v1/risks', methods=['POST'])
 @jwt_required()
 @role_required(['ADMIN', 'ANALYST'])
@@ -47,6 +165,82 @@ def create_risk():
         201, new_risk, "Riesgo con ID " + risk_id + " creado exitosamente")), 201
 
 
+@bp.route('/api/v1/risks/archive', methods=['POST'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST'])
+def archive_risks():
+    """
+    Archives the active risks matching the filtering criteria, or every active risk of the user with all=true. Only
+    role ADMIN and ANALYST Authorized.
+
+    :return: A response with the number of archived risks.
+    :rtype: Response
+    """
+    user_id = get_jwt().get('user')['userId']
+    archive_all = request.args.get('all', 'false').lower() == 'true'
+    pagination_req = PaginatedRequestDto(request)
+    pagination_req.add_filter('user_id', user_id)
+    result = risk_use_case.archive_risks(pagination_req, user_id, archive_all=archive_all)
+    return jsonify(success_operation_response(
+        200, result, str(result['archived']) + " riesgos archivados exitosamente")), 200
+
+
+@bp.route('/api/v1/risks/restore', methods=['POST'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST'])
+def restore_risks():
+    """
+    Restores the archived risks matching the filtering criteria. Only role ADMIN and ANALYST Authorized.
+
+    :return: A response with the number of restored risks.
+    :rtype: Response
+    """
+    user_id = get_jwt().get('user')['userId']
+    pagination_req = PaginatedRequestDto(request)
+    pagination_req.add_filter('user_id', user_id)
+    result = risk_use_case.archive_risks(pagination_req, user_id, archive=False)
+    return jsonify(success_operation_response(
+        200, result, str(result['restored']) + " riesgos restaurados exitosamente")), 200
+
+
+@bp.route('/api/v1/risks/bulk', methods=['POST'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST'])
+def create_risks():
+    """
+    Creates a batch of risks. Only role ADMIN and ANALYST Authorized.
+
+    :return: A response with the created risks and the errors of the skipped items.
+    :rtype: Response
+    """
+    data = request.get_json()
+    user_id = get_jwt().get('user')['userId']
+    result = risk_use_case.create_risks(data, user_id)
+    return jsonify(success_operation_response(
+        201, result, str(len(result['created'])) + " riesgos creados exitosamente")), 201
+
+
+@bp.route('/api/v1/risks/import', methods=['POST'])
+@jwt_required()
+@role_required(['ADMIN', 'ANALYST'])
+def import_risks():
+    """
+    Imports the risks of an uploaded CSV file, streaming it without loading it in memory. Only role ADMIN and ANALYST
+    Authorized.
+
+    :return: A response with the number of processed, imported and rejected rows.
+    :rtype: Response
+    """
+    file = request.files.get('file')
+    if file is None:
+        raise ValidationException("Error validating input data", [{"field": "file", "errors": "Archivo requerido"}])
+
+    user_id = get_jwt().get('user')['userId']
+    result = risk_use_case.import_risks(read_csv_rows(file.stream, IMPORT_COLUMNS), user_id)
+    return jsonify(success_operation_response(
+        201, result, str(result['imported']) + " riesgos importados exitosamente")), 201
+
+
 @bp.route('/api/v1/risks/<int:risk_id>', methods=['PUT'])
 @jwt_required()
 @role_required(['ADMIN', 'ANALYST'])
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from src.domain.usecases.country_use_case import CountryUseCase
+
+
+def run_country_refresh(country_use_case: CountryUseCase, interval, threshold):
+    """
+    Periodically refresh country data before its flag expires. Runs forever; errors are logged and retried on the
+    next interval.
+
+    :param country_use_case: The country use case that performs the refresh.
+    :param interval: Seconds between checks.
+    :param threshold: Seconds before the flag expiration in which the refresh is triggered.
+    """
+    while True:
+        try:
+            country_use_case.refresh_countries_if_expiring(threshold)
+        except Exception as e:
+            print(e)  # Log the refresh error, the next interval retries.
+        time.sleep(interval)
+
+
+def start_country_refresh_job(country_use_case: CountryUseCase, interval, threshold):
+    """
+    Start the country refresh job in a daemon thread of the current worker. Every worker may run it; the refresh lock
+    makes sure only one of them calls the country client.
+
+    :param country_use_case: The country use case that performs the refresh.
+    :param interval: Seconds between checks.
+    :param threshold: Seconds before the flag expiration in which the refresh is triggered.
+
+    :return: The started thread.
+    """
+    thread = threading.Thread(target=run_country_refresh, args=(country_use_case, interval, threshold), daemon=True)
+    thread.start()
+    return thread
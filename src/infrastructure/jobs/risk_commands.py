@@ -0,0 +1,52 @@
+import click
+from flask import current_app, request
+from flask.cli import AppGroup
+
+from src.domain.exceptions.exceptions import ValidationException
+from src.domain.models.paginated_request_dto import PaginatedRequestDto
+from src.infrastructure.entrypoints.risk_entry_point import risk_use_case
+
+risks_cli = AppGroup('risks', help='Run maintenance jobs over the risks.')
+
+
+def build_request(user_id, query_string):
+    """
+    Build the request of a risk job from the query string of the equivalent API request.
+
+    :param user_id: The user whose risks are processed.
+    :param query_string: The query string with the filters of the risk list.
+
+    :return: The PaginatedRequestDto of the job.
+    """
+    with current_app.test_request_context(query_string=query_string):
+        req = PaginatedRequestDto(request)
+    req.add_filter('user_id', user_id)
+    return req
+
+
+@risks_cli.command('archive')
+@click.option('--user-id', type=int, required=True, help='User whose risks are archived.')
+@click.option('--query', 'query_string', default='', help='Filters of the risk list, e.g. "provider.id=3".')
+@click.option('--all', 'archive_all', is_flag=True, help='Archive every active risk of the user.')
+def archive(user_id, query_string, archive_all):
+    """
+    Archive every active risk of a user matching the filters, without the batch limit of the API.
+    """
+    try:
+        result = risk_use_case.archive_risks(build_request(user_id, query_string), user_id, archive_all=archive_all,
+                                             max_batches=None)
+    except ValidationException as e:
+        raise click.ClickException('; '.join(error['errors'] for error in e.errors))
+    click.echo(f'Archived {result["archived"]} risks')
+
+
+@risks_cli.command('restore')
+@click.option('--user-id', type=int, required=True, help='User whose risks are restored.')
+@click.option('--query', 'query_string', default='', help='Filters of the risk list, e.g. "provider.id=3".')
+def restore(user_id, query_string):
+    """
+    Restore every archived risk of a user matching the filters, without the batch limit of the API.
+    """
+    result = risk_use_case.archive_risks(build_request(user_id, query_string), user_id, archive=False,
+                                         max_batches=None)
+    click.echo(f'Restored {result["restored"]} risks')
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from src.domain.usecases.risk_usecase import RiskUseCase
+
+
+def run_risk_summary_reconciliation(app, risk_use_case: RiskUseCase, interval):
+    """
+    Periodically rebuild the risk summaries from the risks table. Runs forever; errors are logged and retried on the
+    next interval.
+
+    :param app: The Flask application, whose context gives access to the database session.
+    :param risk_use_case: The risk use case that performs the reconciliation.
+    :param interval: Seconds between reconciliations.
+    """
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                risk_use_case.reconcile_risk_summaries()
+            except Exception as e:
+                print(e)  # Log the reconciliation error, the next interval retries.
+
+
+def start_risk_summary_job(app, risk_use_case: RiskUseCase, interval):
+    """
+    Start the risk summary reconciliation job in a daemon thread of the current worker. Every worker may run it; an
+    advisory lock makes sure only one rebuild runs at a time.
+
+    :param app: The Flask application.
+    :param risk_use_case: The risk use case that performs the reconciliation.
+    :param interval: Seconds between reconciliations.
+
+    :return: The started thread.
+    """
+    thread = threading.Thread(target=run_risk_summary_reconciliation, args=(app, risk_use_case, interval),
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    from src.application.app import app as flask_app
+    from src.infrastructure.entrypoints.risk_entry_point import risk_use_case as use_case
+
+    with flask_app.app_context():
+        if use_case.reconcile_risk_summaries():
+            print('Risk summaries rebuilt')
+        else:
+            print('Another reconciliation is running, risk summaries not rebuilt')
@@ -0,0 +1,81 @@
+import json
+
+import click
+from flask import current_app, request
+from flask.cli import AppGroup
+
+from src.application.app import db
+from src.domain.models.paginated_request_dto import PaginatedRequestDto
+from src.domain.models.risk_dto import GET_ALL_FILTER_REGISTRY, get_allowed_get_all_sort, get_allowed_search_sort
+from src.infrastructure.adapters.databases.risk_repository import RiskRepository
+from src.infrastructure.migrations.migration_runner import MigrationRunner
+from src.infrastructure.migrations.partition_pruning import check_partition_pruning
+
+migrations_cli = AppGroup('migrations', help='Manage the versioned database migrations.')
+
+
+@migrations_cli.command('upgrade')
+@click.option('--target', type=int, default=None, help='Last version to apply, defaults to the latest.')
+def upgrade(target):
+    """
+    Apply the pending migrations.
+    """
+    applied = MigrationRunner(db.engine).upgrade(target)
+    for migration in applied:
+        click.echo(f'Applied {migration.version:04d}_{migration.name}')
+    if not applied:
+        click.echo('No pending migrations')
+
+
+@migrations_cli.command('downgrade')
+@click.option('--target', type=int, required=True, help='Last version to keep, 0 reverts every migration.')
+def downgrade(target):
+    """
+    Revert the migrations newer than the target version.
+    """
+    reverted = MigrationRunner(db.engine).downgrade(target)
+    for migration in reverted:
+        click.echo(f'Reverted {migration.version:04d}_{migration.name}')
+    if not reverted:
+        click.echo('No migrations to revert')
+
+
+@migrations_cli.command('status')
+def status():
+    """
+    Show the state of every migration.
+    """
+    for migration, applied in MigrationRunner(db.engine).get_status():
+        click.echo(f'{"applied" if applied else "pending":8} {migration.version:04d}_{migration.name}')
+
+
+@migrations_cli.command('check-pruning')
+@click.option('--user-id', type=int, required=True, help='User whose risk list is explained.')
+@click.option('--query', 'query_string', default='', help='Query string of the risk list, e.g. "orderBy=title".')
+@click.option('--analyze', is_flag=True, help='Execute the queries while explaining them.')
+@click.option('--plan', 'show_plan', is_flag=True, help='Print the plan of every query.')
+def check_pruning(user_id, query_string, analyze, show_plan):
+    """
+    Explain the list and count queries of the risk list of a user and check that each one reads a single partition
+    of the risks table.
+    """
+    with current_app.test_request_context(query_string=query_string):
+        req = PaginatedRequestDto(request)
+    req.add_filter('user_id', user_id)
+    req.build_filter_values(GET_ALL_FILTER_REGISTRY)
+    req.build_archived_mode()
+    req.build_order_by('id', get_allowed_search_sort() if req.global_filter else get_allowed_get_all_sort())
+    req.build_count_mode()
+
+    total, results = check_partition_pruning(RiskRepository(current_app.config['GLOBAL_SEARCH_MODE']), req, analyze)
+    if not total:
+        raise click.ClickException('The risks table is not partitioned')
+
+    pruned = True
+    for name, (partitions, plan) in results.items():
+        click.echo(f'{name:8} {len(partitions)} of {total} partitions: {", ".join(partitions) or "-"}')
+        if show_plan:
+            click.echo(json.dumps(plan, indent=2))
+        pruned = pruned and len(partitions) <= 1
+    if not pruned:
+        raise click.ClickException('Partition pruning did not restrict every query to a single partition')
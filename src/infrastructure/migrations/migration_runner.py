@@ -0,0 +1,158 @@
+import os
+import re
+from collections import namedtuple
+
+from sqlalchemy import text
+
+MIGRATIONS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'application', 'static', 'migrations')
+
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.(up|down)\.sql$')
+
+# Key of the advisory lock that serializes concurrent migration runs.
+MIGRATION_LOCK_KEY = 4726101
+
+CREATE_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT now()
+)
+"""
+
+Migration = namedtuple('Migration', ['version', 'name', 'up_path', 'down_path'])
+
+
+def load_migrations(path=MIGRATIONS_PATH):
+    """
+    Load the migrations found in a directory. Each migration is a pair of files named <version>_<name>.up.sql and
+    <version>_<name>.down.sql.
+
+    :param path: The directory containing the migration scripts.
+
+    :return: A list of Migration sorted by version.
+    """
+    scripts = {}
+    for file_name in os.listdir(path):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if not match:
+            continue
+        version, name, direction = int(match.group(1)), match.group(2), match.group(3)
+        scripts.setdefault((version, name), {})[direction] = os.path.join(path, file_name)
+
+    migrations = []
+    for (version, name), paths in sorted(scripts.items()):
+        if 'up' not in paths or 'down' not in paths:
+            raise ValueError(f'Migration {version}_{name} must have both an up and a down script')
+        if migrations and migrations[-1].version == version:
+            raise ValueError(f'Migration version {version} is duplicated')
+        migrations.append(Migration(version, name, paths['up'], paths['down']))
+    return migrations
+
+
+def read_script(path):
+    """
+    Read a migration script.
+
+    :param path: The script file.
+
+    :return: The SQL contained in the script.
+    """
+    with open(path, encoding='utf-8') as file:
+        return file.read()
+
+
+class MigrationRunner:
+    """
+    Apply and revert the versioned SQL migrations of the service, recording the applied versions in the
+    schema_migrations table. Each migration runs in its own transaction together with its version record.
+    """
+
+    def __init__(self, engine, path=MIGRATIONS_PATH):
+        """
+        Initialize the MigrationRunner.
+
+        :param engine: The SQLAlchemy engine of the database to migrate.
+        :param path: The directory containing the migration scripts.
+        """
+        self.engine = engine
+        self.migrations = load_migrations(path)
+
+    def get_applied_versions(self, connection):
+        """
+        Get the versions already applied, creating the version table if needed.
+
+        :param connection: An open connection.
+
+        :return: A set with the applied versions.
+        """
+        connection.execute(text(CREATE_VERSION_TABLE))
+        return set(connection.execute(text('SELECT version FROM schema_migrations')).scalars())
+
+    def get_status(self):
+        """
+        Get the state of every known migration.
+
+        :return: A list of tuples with the migration and whether it is applied.
+        """
+        with self.engine.begin() as connection:
+            applied = self.get_applied_versions(connection)
+        return [(migration, migration.version in applied) for migration in self.migrations]
+
+    def upgrade(self, target=None):
+        """
+        Apply the pending migrations up to the target version.
+
+        :param target: The last version to apply, or None to apply every pending migration.
+
+        :return: The list of applied migrations.
+        """
+        applied_now = []
+        for migration in self.migrations:
+            if target is not None and migration.version > target:
+                break
+            if self.run(migration, upgrade=True):
+                applied_now.append(migration)
+        return applied_now
+
+    def downgrade(self, target):
+        """
+        Revert the applied migrations newer than the target version, from the newest to the oldest.
+
+        :param target: The last version to keep, 0 reverts every migration.
+
+        :return: The list of reverted migrations.
+        """
+        reverted_now = []
+        for migration in reversed(self.migrations):
+            if migration.version <= target:
+                break
+            if self.run(migration, upgrade=False):
+                reverted_now.append(migration)
+        return reverted_now
+
+    def run(self, migration, upgrade):
+        """
+        Apply or revert a single migration. An advisory lock makes concurrent runs wait for each other, and the
+        version table is checked under that lock so a migration is never run twice. Scripts are sent without
+        parameters, so the driver leaves their % characters untouched.
+
+        :param migration: The migration to run.
+        :param upgrade: True to apply the migration, False to revert it.
+
+        :return: True if the migration was run, False if it was already in the requested state.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+            applied = migration.version in self.get_applied_versions(connection)
+            if applied == upgrade:
+                return False
+
+            connection.exec_driver_sql(read_script(migration.up_path if upgrade else migration.down_path),
+                                       execution_options={'no_parameters': True})
+            if upgrade:
+                connection.execute(text('INSERT INTO schema_migrations (version, name) VALUES (:version, :name)'),
+                                   {'version': migration.version, 'name': migration.name})
+            else:
+                connection.execute(text('DELETE FROM schema_migrations WHERE version = :version'),
+                                   {'version': migration.version})
+        return True
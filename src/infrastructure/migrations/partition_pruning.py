@@ -0,0 +1,82 @@
+from sqlalchemy import func, text
+
+from src.domain.models.paginated_request_dto import COUNT_MODE_EXACT
+from src.infrastructure.adapters.databases.risk_repository import get_unfiltered_user_id
+
+PARTITIONED_TABLE = 'risks'
+
+LIST_PARTITIONS = """
+SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table) ORDER BY 1
+"""
+
+
+def find_relations(plan):
+    """
+    Find the tables read by a query plan.
+
+    :param plan: A plan node of the JSON output of EXPLAIN.
+
+    :return: A set with the names of the relations scanned by the node and its children.
+    """
+    relations = {plan['Relation Name']} if 'Relation Name' in plan else set()
+    for child in plan.get('Plans', []):
+        relations |= find_relations(child)
+    return relations
+
+
+def explain_query(query, analyze=False):
+    """
+    Get the plan of a SQLAlchemy query.
+
+    :param query: The SQLAlchemy query to explain.
+    :param analyze: True to execute the query and include the actual rows and times in the plan.
+
+    :return: The root node of the plan.
+    """
+    connection = query.session.connection()
+    compiled = query.statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    options = 'ANALYZE, FORMAT JSON' if analyze else 'FORMAT JSON'
+    plan = connection.exec_driver_sql(f"EXPLAIN ({options}) {compiled}", compiled.params).scalar()
+    return plan[0]['Plan']
+
+
+def build_list_queries(risk_repository, req):
+    """
+    Build the queries run by an offset paginated risk list: the page, with the count(*) OVER() total when the exact
+    total is not read from the risk summaries, and the count of the filtered risks used when the page is past the
+    last record.
+
+    :param risk_repository: The risk repository that builds the list query.
+    :param req: A request object containing filtering criteria, sorting and pagination.
+
+    :return: A dictionary of SQLAlchemy queries keyed by name.
+    """
+    query = risk_repository.build_list_query(req)
+    page = query
+    if req.count_mode == COUNT_MODE_EXACT and get_unfiltered_user_id(req) is None:
+        page = page.add_columns(func.count().over().label('total_count'))
+    page = page.limit(req.per_page).offset((max(req.page, 1) - 1) * req.per_page)
+    count = query.session.query(func.count()).select_from(query.order_by(None).subquery())
+    return {'list': page, 'count': count}
+
+
+def check_partition_pruning(risk_repository, req, analyze=False):
+    """
+    Explain the queries of a risk list and find the partitions of the risks table each one reads. With the table
+    partitioned by user_id, a list scoped to a user must read a single partition.
+
+    :param risk_repository: The risk repository that builds the list query.
+    :param req: A request object containing filtering criteria, sorting and pagination.
+    :param analyze: True to execute the queries while explaining them.
+
+    :return: A tuple with the number of partitions of the risks table and a dictionary keyed by query name with the
+        sorted partitions read and the plan of the query.
+    """
+    session = risk_repository.db.session
+    partitions = set(session.execute(text(LIST_PARTITIONS), {'table': PARTITIONED_TABLE}).scalars())
+
+    results = {}
+    for name, query in build_list_queries(risk_repository, req).items():
+        plan = explain_query(query, analyze)
+        results[name] = (sorted(find_relations(plan) & partitions), plan)
+    return len(partitions), results
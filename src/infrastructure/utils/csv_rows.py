@@ -0,0 +1,25 @@
+import codecs
+import csv
+
+from src.domain.exceptions.exceptions import ValidationException
+
+
+def read_csv_rows(stream, columns):
+    """
+    Read the rows of an uploaded CSV file lazily, one at a time, keeping only the given columns.
+
+    :param stream: The binary stream of the uploaded file.
+    :param columns: The columns every row must have.
+
+    :raises ValidationException: If the header of the file lacks any of the columns.
+
+    :return: An iterator of dictionaries keyed by column.
+    """
+    reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig', errors='replace'))
+
+    missing = [column for column in columns if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValidationException("Error validating input data",
+                                  [{"field": "file", "errors": "Columnas faltantes: " + ", ".join(missing)}])
+
+    return ({column: row[column] for column in columns} for row in reader)
@@ -0,0 +1,197 @@
+import csv
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+EXPORT_FORMAT_CSV = 'csv'
+EXPORT_FORMAT_NDJSON = 'ndjson'
+EXPORT_FORMAT_ARROW = 'arrow'
+EXPORT_FORMAT_PARQUET = 'parquet'
+
+# Rows serialized together in every chunk of a streamed export
+EXPORT_CHUNK_ROWS = 500
+
+# Columns of the CSV export of risks
+RISK_CSV_COLUMNS = ['id', 'title', 'description', 'impact', 'probability', 'countryCode', 'countryName', 'providerId',
+                    'providerName']
+
+# Rows per record batch (and Parquet row group) of the columnar exports
+EXPORT_BATCH_ROWS = 10000
+
+# Typed columns of the Arrow and Parquet exports of risks, in the order of RISK_CSV_COLUMNS
+RISK_ARROW_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('title', pa.string()),
+    ('description', pa.string()),
+    ('impact', pa.int8()),
+    ('probability', pa.int8()),
+    ('countryCode', pa.string()),
+    ('countryName', pa.string()),
+    ('providerId', pa.int64()),
+    ('providerName', pa.string())
+])
+
+
+class ChunkSink(io.RawIOBase):
+    """
+    Write-only file that keeps the bytes written since they were last taken, so a file format writer can be streamed
+    in chunks.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty ChunkSink.
+        """
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        """
+        :return: True, the sink accepts writes.
+        """
+        return True
+
+    def write(self, data):
+        """
+        Keep a copy of the written bytes.
+
+        :param data: The bytes to write.
+
+        :return: The number of bytes written.
+        """
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        """
+        :return: The total number of bytes written.
+        """
+        return self.position
+
+    def take(self):
+        """
+        Take the bytes written since the last call.
+
+        :return: The written bytes.
+        """
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def flatten_risk(risk):
+    """
+    Flatten a risk DTO into a CSV row.
+
+    :param risk: A risk DTO, as built by build_item_dto.
+
+    :return: A list with the values of RISK_CSV_COLUMNS.
+    """
+    return [risk['id'], risk['title'], risk['description'], risk['impact'], risk['probability'],
+            risk['country']['code'], risk['country']['name'], risk['provider']['id'], risk['provider']['name']]
+
+
+def stream_csv(risks):
+    """
+    Serialize risk DTOs as CSV, in chunks of EXPORT_CHUNK_ROWS rows.
+
+    :param risks: An iterable of risk DTOs.
+
+    :return: A generator of CSV text chunks.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(RISK_CSV_COLUMNS)
+    for rows, risk in enumerate(risks, start=1):
+        writer.writerow(flatten_risk(risk))
+        if rows % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def stream_ndjson(risks):
+    """
+    Serialize risk DTOs as newline-delimited JSON, in chunks of EXPORT_CHUNK_ROWS risks.
+
+    :param risks: An iterable of risk DTOs.
+
+    :return: A generator of NDJSON text chunks.
+    """
+    lines = []
+    for risk in risks:
+        lines.append(json.dumps(risk, ensure_ascii=False) + '\n')
+        if len(lines) == EXPORT_CHUNK_ROWS:
+            yield ''.join(lines)
+            lines = []
+
+    if lines:
+        yield ''.join(lines)
+
+
+def build_record_batches(risks):
+    """
+    Group risk DTOs into typed record batches of EXPORT_BATCH_ROWS rows, with provider and country attributes as
+    flat columns.
+
+    :param risks: An iterable of risk DTOs.
+
+    :return: A generator of record batches with the RISK_ARROW_SCHEMA schema.
+    """
+    rows = []
+    for risk in risks:
+        rows.append(flatten_risk(risk))
+        if len(rows) == EXPORT_BATCH_ROWS:
+            yield pa.RecordBatch.from_arrays([pa.array(column) for column in zip(*rows)], schema=RISK_ARROW_SCHEMA)
+            rows = []
+
+    if rows:
+        yield pa.RecordBatch.from_arrays([pa.array(column) for column in zip(*rows)], schema=RISK_ARROW_SCHEMA)
+
+
+def stream_arrow(risks):
+    """
+    Serialize risk DTOs in the Arrow IPC streaming format, one chunk per record batch.
+
+    :param risks: An iterable of risk DTOs.
+
+    :return: A generator of binary chunks.
+    """
+    sink = ChunkSink()
+    with pa.ipc.new_stream(sink, RISK_ARROW_SCHEMA) as writer:
+        for batch in build_record_batches(risks):
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+def stream_parquet(risks):
+    """
+    Serialize risk DTOs as a Parquet file, one chunk per row group.
+
+    :param risks: An iterable of risk DTOs.
+
+    :return: A generator of binary chunks.
+    """
+    sink = ChunkSink()
+    with pq.ParquetWriter(sink, RISK_ARROW_SCHEMA) as writer:
+        for batch in build_record_batches(risks):
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+# Serializer and mimetype of each export format
+EXPORT_FORMATS = {
+    EXPORT_FORMAT_CSV: (stream_csv, 'text/csv'),
+    EXPORT_FORMAT_NDJSON: (stream_ndjson, 'application/x-ndjson'),
+    EXPORT_FORMAT_ARROW: (stream_arrow, 'application/vnd.apache.arrow.stream'),
+    EXPORT_FORMAT_PARQUET: (stream_parquet, 'application/vnd.apache.parquet')
+}
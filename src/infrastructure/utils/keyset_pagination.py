@@ -0,0 +1,105 @@
+from sqlalchemy import and_, or_, tuple_
+
+from src.domain.models.paginated_request_dto import encode_cursor
+
+
+class KeysetPage:
+    """
+    A page of records read with keyset (cursor) pagination. Exposes the same 'items', 'total' and 'pages' attributes
+    as an offset pagination; the totals are not computed in this mode.
+    """
+
+    def __init__(self, items, next_cursor, prev_cursor):
+        """
+        Initialize a KeysetPage.
+
+        :param items: The records of the page.
+        :param next_cursor: The cursor of the following page, or None if this is the last page.
+        :param prev_cursor: The cursor of the preceding page, or None if this is the first page.
+        """
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = None
+        self.pages = None
+
+
+def build_seek_condition(column, identifier, value, cursor_id, ascending):
+    """
+    Build the condition that selects the records after a cursor in the scan order. NULL sorting values are placed
+    after every other value, as PostgreSQL sorts them by default: last when ascending, first when descending.
+
+    :param column: The sorting column.
+    :param identifier: The id column, used to break ties.
+    :param value: The value of the sorting field in the cursor, possibly None.
+    :param cursor_id: The id of the cursor.
+    :param ascending: True if the records are scanned in ascending order.
+
+    :return: The SQLAlchemy condition.
+    """
+    if not column.expression.nullable:
+        key, bound = tuple_(column, identifier), tuple_(value, cursor_id)
+        return key > bound if ascending else key < bound
+
+    if value is None:
+        if ascending:
+            return and_(column.is_(None), identifier > cursor_id)
+        return or_(column.isnot(None), and_(column.is_(None), identifier < cursor_id))
+
+    if ascending:
+        return or_(tuple_(column, identifier) > tuple_(value, cursor_id), column.is_(None))
+    return tuple_(column, identifier) < tuple_(value, cursor_id)
+
+
+def paginate_keyset(query, entity, order_by, order_type, cursor, per_page, get_record=lambda row: row):
+    """
+    Paginate a SQLAlchemy query by seeking past the cursor instead of using OFFSET, so every page costs the same as
+    the first one. Records are ordered by the sorting field and then by id to break ties, with NULL sorting values
+    last in ascending order and first in descending order, as in offset pagination.
+
+    :param query: The SQLAlchemy query to paginate, already filtered.
+    :param entity: The model that holds the sorting field and the id.
+    :param order_by: The attribute to order by.
+    :param order_type: The order type ('asc' or 'desc').
+    :param cursor: The decoded cursor, or None for the first page.
+    :param per_page: Number of records per page.
+    :param get_record: Function that returns the entity instance of a result row.
+
+    :return: A KeysetPage.
+    """
+    direction = cursor['direction'] if cursor is not None else 'next'
+    ascending = (order_type == 'asc') == (direction == 'next')
+
+    if order_by == 'id':
+        if cursor is not None:
+            query = query.filter(entity.id > cursor['id'] if ascending else entity.id < cursor['id'])
+        query = query.order_by(entity.id if ascending else entity.id.desc())
+    else:
+        column = getattr(entity, order_by)
+        if cursor is not None:
+            query = query.filter(build_seek_condition(column, entity.id, cursor['value'], cursor['id'], ascending))
+        if ascending:
+            query = query.order_by(column.asc().nulls_last(), entity.id)
+        else:
+            query = query.order_by(column.desc().nulls_first(), entity.id.desc())
+
+    rows = query.limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'prev':
+        rows.reverse()
+
+    has_next = has_more if direction == 'next' else True
+    has_prev = cursor is not None if direction == 'next' else has_more
+
+    next_cursor = None
+    prev_cursor = None
+    if rows and has_next:
+        record = get_record(rows[-1])
+        next_cursor = encode_cursor(order_by, order_type, getattr(record, order_by), record.id, 'next')
+    if rows and has_prev:
+        record = get_record(rows[0])
+        prev_cursor = encode_cursor(order_by, order_type, getattr(record, order_by), record.id, 'prev')
+
+    return KeysetPage(rows, next_cursor, prev_cursor)
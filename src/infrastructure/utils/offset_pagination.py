@@ -0,0 +1,94 @@
+import math
+
+from sqlalchemy import func
+
+from src.domain.models.paginated_request_dto import COUNT_MODE_ESTIMATED, COUNT_MODE_NONE
+
+
+class OffsetPage:
+    """
+    A page of records read with LIMIT/OFFSET pagination, with the total computed according to a count mode.
+    """
+
+    def __init__(self, items, page, per_page, total, has_next, count_mode):
+        """
+        Initialize an OffsetPage.
+
+        :param items: The records of the page.
+        :param page: The page number.
+        :param per_page: Number of records per page.
+        :param total: Total number of records, or None if it was not computed.
+        :param has_next: True if there are records after this page.
+        :param count_mode: The count mode used to compute the total.
+        """
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = math.ceil(total / per_page) if total is not None else None
+        self.has_next = has_next
+        self.count_mode = count_mode
+
+
+def estimate_count(query):
+    """
+    Estimate the number of rows of a query from the planner statistics, without executing it.
+
+    :param query: The SQLAlchemy query to estimate.
+
+    :return: The estimated number of rows.
+    """
+    connection = query.session.connection()
+    compiled = query.order_by(None).statement.compile(dialect=connection.dialect,
+                                                    compile_kwargs={"render_postcompile": True})
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def paginate_offset(query, page, per_page, count_mode, total=None):
+    """
+    Paginate a sorted SQLAlchemy query with LIMIT/OFFSET.
+
+    - exact: the total comes with the page through count(*) OVER(), in a single query.
+    - estimated: the total is the planner row estimate of the filtered query, or the exact total when the page is the
+      last one.
+    - none: no total is computed; one extra row is read to know if there is a next page.
+
+    :param query: The SQLAlchemy query to paginate, already filtered and sorted.
+    :param page: The page number, starting at 1.
+    :param per_page: Number of records per page.
+    :param count_mode: The count mode.
+    :param total: Optional total already known by the caller, used instead of counting in exact mode.
+
+    :return: An OffsetPage.
+    """
+    page = page if page > 0 else 1
+    per_page = per_page if per_page > 0 else 20
+    offset = (page - 1) * per_page
+
+    if total is not None and count_mode not in (COUNT_MODE_NONE, COUNT_MODE_ESTIMATED):
+        rows = query.limit(per_page).offset(offset).all()
+        return OffsetPage(rows, page, per_page, total, offset + len(rows) < total, count_mode)
+
+    if count_mode == COUNT_MODE_NONE:
+        rows = query.limit(per_page + 1).offset(offset).all()
+        return OffsetPage(rows[:per_page], page, per_page, None, len(rows) > per_page, count_mode)
+
+    if count_mode == COUNT_MODE_ESTIMATED:
+        rows = query.limit(per_page).offset(offset).all()
+        if len(rows) < per_page and (rows or not offset):
+            total = offset + len(rows)
+        else:
+            total = max(estimate_count(query), offset + len(rows))
+        return OffsetPage(rows, page, per_page, total, offset + len(rows) < total, count_mode)
+
+    single_entity = len(query.column_descriptions) == 1
+    rows = query.add_columns(func.count().over().label('total_count')).limit(per_page).offset(offset).all()
+
+    if rows:
+        total = rows[0].total_count
+        rows = [row[0] for row in rows] if single_entity else rows
+    else:
+        total = query.order_by(None).count() if offset else 0
+
+    return OffsetPage(rows, page, per_page, total, offset + len(rows) < total, count_mode)
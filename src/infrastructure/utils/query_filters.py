@@ -1,13 +1,58 @@
+from functools import lru_cache
+
+from sqlalchemy import cast
+from sqlalchemy.dialects.postgresql import ARRAY, array
+
+
+def array_value(column, values):
+    """
+    Build an array literal with the element type of an array column, so comparisons against it can use the column
+    index. The element type is used without its length, so longer values are compared whole instead of truncated.
+
+    :param column: The array column.
+    :param values: The items of the array.
+
+    :return: The array literal cast to an array of the column element type.
+    """
+    return cast(array(values), ARRAY(type(column.type.item_type)()))
+
+
+# Filter operators and the condition each one builds. Values arrive already converted to the filter type (lists for
+# 'in', 'between', 'hasAll' and 'hasAny'), so every comparison binds typed parameters. The array operators compile to
+# the Postgres @> and && operators, which are served by a GIN index on the array column.
+FILTER_OPERATORS = {
+    'equals': lambda column, value: column == value,
+    'contains': lambda column, value: column.ilike(f'%{value}%'),
+    'gte': lambda column, value: column >= value,
+    'lte': lambda column, value: column <= value,
+    'between': lambda column, value: column.between(value[0], value[1]),
+    'in': lambda column, value: column.in_(value),
+    'has': lambda column, value: column.op('@>')(array_value(column, [value])),
+    'hasAll': lambda column, value: column.op('@>')(array_value(column, value)),
+    'hasAny': lambda column, value: column.op('&&')(array_value(column, value)),
+}
+
+
 def get_filter_operators():
     """
     Get the available filter operators and their corresponding lambda functions.
 
     :return: A dictionary of filter operators and lambda functions.
     """
-    return {
-        'equals': lambda column, search_string: column == search_string,
-        'contains': lambda column, search_string: column.ilike(f'%{search_string}%'),
-    }
+    return FILTER_OPERATORS
+
+
+@lru_cache(maxsize=None)
+def resolve_column(entity, column_name):
+    """
+    Resolve a mapped column of an entity. Resolved columns are cached for the life of the process.
+
+    :param entity: The mapped entity.
+    :param column_name: The name of the column attribute.
+
+    :return: The column attribute.
+    """
+    return entity.__dict__[column_name]
 
 
 def filter_entities(filters, model_mapping):
@@ -41,29 +86,6 @@ def build_condition_filter(item, model_mapping):
     if entity:
         column_name = item['field']
         operator = item['operator']
-        search_string = item['value']
-        column = entity.__dict__[column_name]
-        return get_filter_operators()[operator](column, search_string)
+        column = resolve_column(entity, column_name)
+        return FILTER_OPERATORS[operator](column, item['value'])
     return None
-
-
-def build_filter_values(filters, params_allowed):
-    """
-    Build filter conditions based on allowed parameters.
-
-    :param filters: A dictionary of filters provided in the request.
-    :param params_allowed: A list of allowed filter parameters and their details.
-
-    :return: A list of filter conditions as dictionaries.
-    """
-    allowed_filters = []
-    for field, search_string in filters.items():
-        filter_param = next((param for param in params_allowed if param['param'] == field), None)
-        if filter_param:
-            allowed_filters.append({
-                'value': search_string,
-                'operator': filter_param['operator'],
-                'entity': filter_param['entity'],
-                'field': filter_param['field']
-            })
-    return allowed_filters